@@ -0,0 +1,178 @@
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from core import config, storage_stats
+from core.database import Database
+from benchmarks.query_plans import generate
+
+
+# python -m benchmarks.directory_table [--rows 1000000] [--runs 5]
+#
+# Writes a files table in the layout from before the directories table
+# (full path, full parent path and a uuid id on every row), measures it,
+# lets Database migrate it and measures again: size on disk and the
+# per-folder GROUP BY that the summaries and the rollup are built from.
+
+LEGACY_SCHEMA = """
+CREATE TABLE files (
+    id TEXT PRIMARY KEY,
+    absolute_path TEXT UNIQUE,
+    name TEXT,
+    extension TEXT,
+    size_bytes INTEGER,
+    created_at TEXT,
+    modified_at TEXT,
+    last_seen TEXT,
+    last_accessed TEXT,
+    parent_directory TEXT,
+    is_directory INTEGER,
+    hash TEXT,
+    depth INTEGER,
+    app_id INTEGER
+);
+
+CREATE INDEX idx_parent_directory ON files(parent_directory);
+CREATE INDEX idx_size_bytes ON files(size_bytes);
+CREATE INDEX idx_modified_at ON files(modified_at);
+CREATE INDEX idx_kind_size ON files(is_directory, size_bytes);
+CREATE INDEX idx_hash ON files(hash, size_bytes, absolute_path) WHERE hash IS NOT NULL;
+"""
+
+LEGACY_GROUP_BY = """
+    SELECT parent_directory, COUNT(*), SUM(size_bytes)
+    FROM files
+    WHERE is_directory = 0
+    GROUP BY parent_directory
+"""
+
+GROUP_BY = """
+    SELECT dir_id, COUNT(*), SUM(size_bytes)
+    FROM files
+    WHERE is_directory = 0
+    GROUP BY dir_id
+"""
+
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA cache_size={int(config.DB_CACHE_SIZE)};")
+    conn.execute(f"PRAGMA mmap_size={int(config.DB_MMAP_SIZE)};")
+    return conn
+
+
+def build_legacy(source, path):
+
+    # the same synthetic tree, written out the old way
+    conn = connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.create_function(
+        "file_id", 1, lambda p: str(uuid.uuid5(uuid.NAMESPACE_URL, p)), deterministic=True
+    )
+
+    conn.execute("ATTACH DATABASE ? AS source", (str(source),))
+    with conn:
+        conn.execute("""
+            INSERT INTO files
+            SELECT file_id(absolute_path), absolute_path, name, extension,
+                   size_bytes, created_at, modified_at, last_seen,
+                   last_accessed, parent_directory, is_directory, hash,
+                   depth, app_id
+            FROM source.file_paths
+            ORDER BY id
+        """)
+    conn.execute("DETACH DATABASE source")
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def table_bytes(conn, tables):
+    # pages held by the tables and their indexes, None without dbstat
+    try:
+        return conn.execute(f"""
+            SELECT SUM(s.pgsize)
+            FROM dbstat s
+            JOIN sqlite_master m ON m.name = s.name
+            WHERE m.tbl_name IN ({", ".join("?" * len(tables))})
+        """, tables).fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+
+
+def file_bytes(conn):
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    return page_count * page_size
+
+
+def median_ms(conn, query, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        conn.execute(query).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def megabytes(size):
+    return f"{size / 1024**2:.1f} MB" if size is not None else "-"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="directories table before / after")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    workdir = Path(tempfile.mkdtemp(prefix="aegis-bench-"))
+    source = workdir / "source.db"
+    legacy = workdir / "legacy.db"
+
+    print(f"Generating {args.rows} files")
+    generate(Database(source), str(workdir), args.rows)
+    build_legacy(source, legacy)
+
+    conn = connect(legacy)
+    before = {
+        "files tables": table_bytes(conn, ("files",)),
+        "database file": file_bytes(conn),
+        "GROUP BY folder": median_ms(conn, LEGACY_GROUP_BY, args.runs)
+    }
+    conn.close()
+
+    # the migration runs on open
+    started = time.perf_counter()
+    Database(legacy)
+    migrated_in = time.perf_counter() - started
+
+    conn = connect(legacy)
+    after = {
+        "files tables": table_bytes(conn, ("files", "directories")),
+        "database file": file_bytes(conn),
+        "GROUP BY folder": median_ms(conn, GROUP_BY, args.runs)
+    }
+    with_paths = median_ms(conn, storage_stats.FRESH_QUERIES["stats_directory"], args.runs)
+    conn.close()
+
+    print(f"Migrated in {migrated_in:.1f}s (search index and summaries included)\n")
+    print(f"{'':<20}{'before':>14}{'after':>14}")
+    for key in ("files tables", "database file"):
+        print(f"{key:<20}{megabytes(before[key]):>14}{megabytes(after[key]):>14}")
+    print(
+        f"{'GROUP BY folder':<20}{before['GROUP BY folder']:>11.1f} ms"
+        f"{after['GROUP BY folder']:>11.1f} ms"
+    )
+    print(f"{'  ... with paths':<20}{'':>14}{with_paths:>11.1f} ms")
+    print("\nThe database file after also holds the search index and the summaries.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+from core.file_index import FileIndex
+from core.organization_engine import OrganizationEngine
+from benchmarks.query_plans import EXTENSIONS
+
+
+# python -m benchmarks.file_index [--rows 5000000] [--runs 5] [--target-ms 1000]
+#
+# Streams synthetic DriveIndexer records into a FileIndex, compares its
+# size with the dict list it replaces and times the OrganizationEngine
+# analyses on it. Duplicate detection is left out: past the size filter
+# it hashes real files.
+
+DEFAULT_TARGET_MS = 1000
+
+# records measured to estimate what the dict list would take
+DICT_SAMPLE = 10_000
+
+
+# -------------------------
+# SYNTHETIC DATA
+# -------------------------
+
+def records(rows, seed=42):
+    rng = random.Random(seed)
+    names, weights = zip(*EXTENSIONS)
+
+    dirs = [os.path.join(os.sep, "data", f"d{i}") for i in range(max(rows // 20, 50))]
+
+    for i in range(rows):
+        extension = rng.choices(names, weights)[0]
+        name = f"f{i}{extension}"
+
+        yield {
+            "name": name,
+            "path": os.path.join(dirs[rng.randrange(len(dirs))], name),
+            "size": int(rng.lognormvariate(11, 2.5)),
+            "extension": extension
+        }
+
+
+def dict_list_bytes(rows):
+
+    # a dict and its values per record, the strings included
+    sample = list(records(DICT_SAMPLE))
+    per_record = statistics.mean(
+        sys.getsizeof(record) + sum(sys.getsizeof(value) for value in record.values())
+        for record in sample
+    )
+    # plus the list's own pointer per record
+    return int((per_record + 8) * rows)
+
+
+# -------------------------
+# ANALYSES UNDER TEST
+# -------------------------
+
+def suite():
+    # (method, args)
+    return [
+        ("extension_breakdown", ()),
+        ("extension_rows", ()),
+        ("find_large_files", ()),
+        ("find_large_files", (50,)),
+    ]
+
+
+def run(engine, runs, target_ms):
+    failures = 0
+    print(f"{'analysis':<40}{'median ms':>12}{'target':>10}  result")
+
+    for method, args in suite():
+        func = getattr(engine, method)
+
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            result = func(*args)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        median = statistics.median(timings)
+        slow = median > target_ms
+        if slow:
+            failures += 1
+
+        label = f"{method}{args if args else ''}"[:39]
+        print(
+            f"{label:<40}{median:>12.2f}{target_ms:>10.0f}  "
+            f"{len(result)} entries{' | over target' if slow else ''}"
+        )
+
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="in-memory file index benchmark")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=DEFAULT_TARGET_MS)
+    args = parser.parse_args(argv)
+
+    print(f"Indexing {args.rows} synthetic files")
+    started = time.perf_counter()
+    index = FileIndex.from_records(records(args.rows))
+    print(f"Built in {time.perf_counter() - started:.1f}s")
+
+    columns = index.nbytes()
+    dicts = dict_list_bytes(args.rows)
+    print(
+        f"FileIndex {columns / 1024**2:.0f} MB, dict list about "
+        f"{dicts / 1024**2:.0f} MB ({dicts / columns:.1f}x)\n"
+    )
+
+    failures = run(OrganizationEngine(index), args.runs, args.target_ms)
+
+    print(f"{failures} analyses failed" if failures else "All analyses within target")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from core import libraries, storage_stats
+from core.database import Database
+from core.directories import split_path
+from core.file_manager import FileManager
+
+
+# python -m benchmarks.query_plans [--rows 1000000] [--db path] [--runs 5]
+#
+# Loads a synthetic files table, times every FileManager query method and
+# checks EXPLAIN QUERY PLAN, so a query that falls back to scanning a big
+# table is caught before it reaches a 10M row index.
+
+EXTENSIONS = [
+    (".jpg", 20), (".png", 10), (".txt", 10), (".dll", 8), (".mp4", 3),
+    (".pdf", 5), (".py", 6), (".json", 6), (".zip", 2), (".exe", 2),
+    (".mp3", 4), (".iso", 1), (".pak", 2), ("", 5)
+]
+
+# tables big enough that a full scan is a bug, not a shortcut
+LARGE_TABLES = ("files", "dir_rollup", "stats_directory", "hash_cache")
+
+DEFAULT_TARGET_MS = 50
+
+# a key halfway through the generated timestamps, for deep pages
+MID_EPOCH = int(datetime(2020, 1, 1).timestamp())
+
+
+# -------------------------
+# SYNTHETIC DATA
+# -------------------------
+
+def generate(db, root, rows, seed=42):
+    rng = random.Random(seed)
+    # timestamps in epoch seconds, spread from 2015 up to now
+    start = int(datetime(2015, 1, 1).timestamp())
+    end = int(time.time())
+    now = datetime.now().isoformat()
+
+    names, weights = zip(*EXTENSIONS)
+
+    # folder tree: each folder hangs under a random earlier one
+    dirs = [root]
+    for i in range(max(rows // 20, 50)):
+        parent = dirs[rng.randrange(len(dirs))]
+        dirs.append(os.path.join(parent, f"d{i}"))
+
+    # plus a Steam library holding about 1% of the folders
+    steam = os.path.join(root, "Steam", "steamapps", "common")
+    games = [os.path.join(steam, f"Game{g}") for g in range(40)]
+    dirs.extend([os.path.join(root, "Steam"), os.path.dirname(steam), steam])
+    dirs.extend(games)
+
+    for i in range(len(dirs) // 100):
+        parent = games[rng.randrange(len(games))]
+        games.append(os.path.join(parent, f"g{i}"))
+        dirs.append(games[-1])
+
+    # every folder once, files point at them by id
+    folder_ids = {}
+    for path in [os.path.dirname(root)] + dirs:
+        folder_ids[path] = len(folder_ids) + 1
+
+    def folder_rows():
+        for path, folder_id in folder_ids.items():
+            yield folder_id, folder_ids.get(split_path(path)[0]), path
+
+    def dir_rows():
+        for path in dirs:
+            parent, name = split_path(path)
+            yield (
+                folder_ids[parent], name, "", 0,
+                rng.randrange(start, end), rng.randrange(start, end), now,
+                1, None, path.count(os.sep)
+            )
+
+    # about 2% of files carry a content hash, in groups of duplicates
+    hash_pool = max(rows // 150, 1)
+
+    def file_rows():
+        for i in range(rows):
+            parent = dirs[rng.randrange(len(dirs))]
+            extension = rng.choices(names, weights)[0]
+            name = f"f{i}{extension}"
+            path = os.path.join(parent, name)
+            size = int(rng.lognormvariate(11, 2.5))
+            digest = f"h{rng.randrange(hash_pool)}" if rng.random() < 0.02 else None
+
+            yield (
+                folder_ids[parent], name, extension, size,
+                rng.randrange(start, end), rng.randrange(start, end), now,
+                0, digest, path.count(os.sep)
+            )
+
+    with db.transaction() as cur:
+        cur.executemany(
+            "INSERT INTO directories (id, parent_id, path) VALUES (?, ?, ?)",
+            folder_rows()
+        )
+
+        for records in (dir_rows(), file_rows()):
+            cur.executemany("""
+                INSERT INTO files (
+                    dir_id, name, extension, size_bytes,
+                    modified_at, last_accessed, last_seen,
+                    is_directory, hash, depth
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, records)
+
+        cur.execute("""
+            INSERT INTO scan_history (scan_time, total_files, total_size, root, total_dirs)
+            VALUES (?, ?, 0, ?, ?)
+        """, (now, rows, root, len(dirs)))
+
+    # the file writer keeps these current, a raw load has to build them
+    storage_stats.rebuild(db)
+    storage_stats.rebuild_rollup(db)
+    libraries.tag_existing(db)
+    db.rebuild_search_index()
+
+
+# -------------------------
+# QUERIES UNDER TEST
+# -------------------------
+
+class RecordingDatabase(Database):
+
+    # remembers every read so its plan can be explained afterwards
+    def __init__(self, path):
+        self.recorded = []
+        super().__init__(path)
+
+    def fetchall(self, query, params=()):
+        self.recorded.append((query, params))
+        return super().fetchall(query, params)
+
+    def iterate(self, query, params=(), chunk_size=10000):
+        self.recorded.append((query, params))
+        return super().iterate(query, params, chunk_size)
+
+
+def query_suite(root):
+    # (method, args, target in ms or None for no target, tables allowed to be scanned)
+    return [
+        ("get_indexed_file_count", (), DEFAULT_TARGET_MS, ()),
+        ("get_total_storage_used", (), DEFAULT_TARGET_MS, ()),
+        ("get_extension_breakdown", (), DEFAULT_TARGET_MS, ()),
+        ("get_filetype_storage", (), DEFAULT_TARGET_MS, ()),
+        ("get_largest_files", (10,), DEFAULT_TARGET_MS, ()),
+        ("get_storage_by_folder", (10,), DEFAULT_TARGET_MS, ()),
+        ("get_top_folders", (), DEFAULT_TARGET_MS, ()),
+        ("get_heaviest_subtrees", (20,), DEFAULT_TARGET_MS, ()),
+        ("get_heaviest_subtrees", (20, 3), DEFAULT_TARGET_MS, ()),
+        ("get_subtree_children", (root,), DEFAULT_TARGET_MS, ()),
+        ("get_children_paths", (root,), DEFAULT_TARGET_MS, ()),
+        ("get_duplicate_files", (20,), DEFAULT_TARGET_MS, ()),
+        ("get_cleanup_suggestions", (), DEFAULT_TARGET_MS, ()),
+        ("get_stale_files", (365, 100 * 1024**2), DEFAULT_TARGET_MS, ()),
+        ("get_stale_files", (30, 0, 100, "modified"), DEFAULT_TARGET_MS, ()),
+        # first pages and pages deep into the result tables
+        ("get_largest_files_page", (), DEFAULT_TARGET_MS, ()),
+        ("get_largest_files_page", ("size", True, (1024, 0)), DEFAULT_TARGET_MS, ()),
+        ("get_largest_files_page", ("modified", False), DEFAULT_TARGET_MS, ()),
+        ("get_largest_files_page", ("modified", True, (MID_EPOCH, 0, 0)), DEFAULT_TARGET_MS, ()),
+        ("get_folders_page", (), DEFAULT_TARGET_MS, ()),
+        ("get_folders_page", ("size", True, (1024**2, 0)), DEFAULT_TARGET_MS, ()),
+        ("get_folders_page", ("path", False, (root,)), DEFAULT_TARGET_MS, ()),
+        ("get_duplicate_groups_page", (), DEFAULT_TARGET_MS, ()),
+        ("get_duplicate_groups_page", ("copies", False), DEFAULT_TARGET_MS, ()),
+        ("get_cleanup_page", (), DEFAULT_TARGET_MS, ()),
+        ("get_cleanup_page", ("accessed", False), DEFAULT_TARGET_MS, ()),
+        ("get_steam_games_usage", (), DEFAULT_TARGET_MS, ()),
+        ("get_game_library_usage", (), DEFAULT_TARGET_MS, ()),
+        ("search", ("f1234",), DEFAULT_TARGET_MS, ()),
+        ("search", ("game",), DEFAULT_TARGET_MS, ()),
+        ("search", ("f12", 50, 0, ".iso"), DEFAULT_TARGET_MS, ()),
+        ("search", ("d12", 50, 0, None, 1024**3), DEFAULT_TARGET_MS, ()),
+        ("search", ("f99 .mp4", 50, 0, None, None, None, True), DEFAULT_TARGET_MS, ()),
+        # nothing for the trigram index: the filters and a per-row check
+        ("search", ("d1", 50, 0, ".iso"), DEFAULT_TARGET_MS, ("files",)),
+        ("search", ("", 50, 0, None, 1024**3), DEFAULT_TARGET_MS, ()),
+        ("search", ("zq",), None, ("files",)),
+        ("get_scanned_roots", (), DEFAULT_TARGET_MS, ()),
+        ("has_checkpoint", (), DEFAULT_TARGET_MS, ()),
+        # read everything by design, timed but not held to the target
+        ("get_duplicate_files", (), None, ()),
+        ("get_directory_index", (), None, ()),
+        ("get_age_breakdown", (), None, ()),
+        ("get_age_breakdown", ("modified",), None, ()),
+    ]
+
+
+def explain(db, query, params):
+    return [
+        row[3] for row in db.reader.execute(f"EXPLAIN QUERY PLAN {query}", params)
+    ]
+
+
+def plan_problems(plan, allowed):
+    problems = []
+
+    for detail in plan:
+        words = detail.split()
+
+        # "SCAN files" without "USING ... INDEX" reads the whole table
+        if (
+            len(words) >= 2
+            and words[0] == "SCAN"
+            and words[1] in LARGE_TABLES
+            and words[1] not in allowed
+            and "INDEX" not in words
+        ):
+            problems.append(detail)
+
+    return problems
+
+
+def run(db, runs, target_scale=1.0):
+    root = db.fetchall("SELECT root FROM scan_history ORDER BY id DESC LIMIT 1")[0][0]
+    manager = FileManager(db)
+
+    failures = 0
+    print(f"{'query':<40}{'median ms':>12}{'target':>10}  plan")
+
+    for method, args, target, allowed in query_suite(root):
+        func = getattr(manager, method)
+
+        timings = []
+        for _ in range(runs):
+            db.recorded.clear()
+            started = time.perf_counter()
+            result = func(*args)
+            if hasattr(result, "__next__"):
+                for _ in result:
+                    pass
+            timings.append((time.perf_counter() - started) * 1000)
+
+        problems = []
+        for query, params in db.recorded:
+            problems.extend(plan_problems(explain(db, query, params), allowed))
+
+        median = statistics.median(timings)
+        limit = target * target_scale if target else None
+        slow = limit is not None and median > limit
+
+        if problems or slow:
+            failures += 1
+
+        label = f"{method}{args if args else ''}"[:39]
+        status = "; ".join(problems) if problems else "ok"
+        if slow:
+            status += " | over target"
+
+        print(
+            f"{label:<40}{median:>12.2f}"
+            f"{(f'{limit:.0f}' if limit else '-'):>10}  {status}"
+        )
+
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FileManager query benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", help="reuse or create this database file")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--target-scale",
+        type=float,
+        default=1.0,
+        help="multiply every latency target, e.g. for slow machines"
+    )
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="aegis-bench-")
+    path = Path(args.db) if args.db else Path(workdir) / "bench.db"
+
+    db = RecordingDatabase(path)
+
+    if not db.fetchall("SELECT 1 FROM files LIMIT 1"):
+        print(f"Generating {args.rows} files in {path}")
+        started = time.perf_counter()
+        generate(db, workdir, args.rows)
+        print(f"Generated in {time.perf_counter() - started:.1f}s")
+
+    failures = run(db, args.runs, args.target_scale)
+
+    print(f"{failures} queries failed" if failures else "All queries within target")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
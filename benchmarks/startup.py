@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+# python -m benchmarks.startup [--rows 1000000] [--db path] [--runs 3] [--target-ms 2000]
+#
+# Launches the app headless (offscreen Qt platform) against a large fixture
+# database and lets it run until its startup trace says it finished: window
+# painted and the preloaded pages built. Each run starts cold, with the
+# database evicted from the OS page cache, then once more warm. The phases
+# from core/startup.py are compared, and a first paint over the target fails.
+
+REPO = Path(__file__).resolve().parent.parent
+
+TRACE_PREFIX = "STARTUP TRACE "
+
+# a launch that never finishes is cut off here, in seconds
+CHILD_TIMEOUT = 120
+
+
+# -------------------------
+# ONE LAUNCH
+# -------------------------
+
+def child(path):
+
+    # runs in the launched process: main.py as the user starts it, but on
+    # the fixture and closing itself once startup is done
+    import main as app
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    from core import database, startup
+
+    database.DB_PATH = Path(path)
+
+    startup.when_finished(lambda: QApplication.instance().quit())
+    QTimer.singleShot(CHILD_TIMEOUT * 1000, lambda: QApplication.instance().quit())
+
+    try:
+        app.main()
+    except SystemExit:
+        pass
+
+    print(TRACE_PREFIX + json.dumps({
+        "finished": startup.finished,
+        "phases": startup.phases
+    }), flush=True)
+
+    # skip interpreter teardown, the pool and watcher threads included
+    os._exit(0)
+
+
+def evict(path):
+
+    # drop the database from the OS page cache; without posix_fadvise
+    # (Windows, macOS) a cold run is only a fresh process
+    if not hasattr(os, "posix_fadvise"):
+        return
+
+    for name in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+        if not name.exists():
+            continue
+
+        fd = os.open(name, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def launch(path):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", str(path)],
+        cwd=REPO,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=CHILD_TIMEOUT + 30
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+
+    for line in result.stdout.splitlines():
+        if line.startswith(TRACE_PREFIX):
+            trace = json.loads(line[len(TRACE_PREFIX):])
+            trace["process"] = elapsed
+            return trace
+
+    raise RuntimeError(
+        f"no startup trace from the app (exit {result.returncode}):\n"
+        f"{result.stdout[-2000:]}{result.stderr[-2000:]}"
+    )
+
+
+# -------------------------
+# REPORT
+# -------------------------
+
+def timings(traces):
+
+    # phase -> ms per launch; a span reports its length, a moment its time
+    by_phase = {}
+    for trace in traces:
+        for name, started, spent in trace["phases"]:
+            by_phase.setdefault(name, []).append(spent if spent is not None else started)
+        by_phase.setdefault("process (spawn to exit)", []).append(trace["process"])
+    return by_phase
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="cold and warm start benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", help="reuse or create this fixture database")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=2000,
+        help="longest acceptable median time to first paint, cold or warm"
+    )
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.child)
+        return 0
+
+    # only the parent needs these; the launched app imports core itself,
+    # inside its own traced import phase
+    from core.database import Database
+    from benchmarks.query_plans import generate
+
+    workdir = tempfile.mkdtemp(prefix="aegis-bench-")
+    path = Path(args.db) if args.db else Path(workdir) / "bench.db"
+
+    db = Database(path)
+    if not db.fetchall("SELECT 1 FROM files LIMIT 1"):
+        print(f"Generating {args.rows} files in {path}")
+        generate(db, workdir, args.rows)
+    files = db.fetchall("SELECT file_count FROM stats_global")[0][0]
+    db.reader.close()
+    db.conn.close()
+
+    if not hasattr(os, "posix_fadvise"):
+        print("No posix_fadvise here: cold runs are fresh processes on a warm OS cache")
+
+    cold = []
+    warm = []
+    for run in range(args.runs):
+        evict(path)
+        cold.append(launch(path))
+        warm.append(launch(path))
+        print(f"Run {run + 1}/{args.runs} done")
+
+    cold_ms = timings(cold)
+    warm_ms = timings(warm)
+
+    print(f"\nStartup against {files} indexed files, median of {args.runs}\n")
+    print(f"{'phase':<32}{'cold ms':>12}{'warm ms':>12}")
+    for name in cold_ms:
+        warm_value = statistics.median(warm_ms[name]) if name in warm_ms else None
+        print(
+            f"{name:<32}{statistics.median(cold_ms[name]):>12.0f}"
+            f"{(f'{warm_value:.0f}' if warm_value is not None else '-'):>12}"
+        )
+
+    failures = 0
+
+    unfinished = sum(not trace["finished"] for trace in cold + warm)
+    if unfinished:
+        print(f"\n{unfinished} launches never finished starting up")
+        failures += 1
+
+    for label, values in (("cold", cold_ms), ("warm", warm_ms)):
+        painted = values.get("first paint")
+        if not painted:
+            print(f"{label}: the window never painted")
+            failures += 1
+        elif statistics.median(painted) > args.target_ms:
+            print(f"{label}: first paint over the {args.target_ms:.0f} ms target")
+            failures += 1
+
+    print("Startup within target" if not failures else f"{failures} startup checks failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
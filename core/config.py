@@ -0,0 +1,185 @@
+# -------------------------
+# DATABASE
+# -------------------------
+
+# WAL keeps the database consistent with NORMAL; FULL also survives power loss
+DB_SYNCHRONOUS = "NORMAL"
+
+# page cache per connection, negative values are KiB
+DB_CACHE_SIZE = -64000
+
+# bytes of the database file read through a memory map
+DB_MMAP_SIZE = 256 * 1024 * 1024
+
+# temp tables and sort spills: MEMORY, FILE or DEFAULT
+DB_TEMP_STORE = "MEMORY"
+
+# milliseconds a connection waits on a lock before giving up
+DB_BUSY_TIMEOUT = 5000
+
+# -------------------------
+# SCANNING
+# -------------------------
+
+# file records buffered before a single transaction is committed
+SCAN_BATCH_SIZE = 2000
+
+# traversal threads; 1 keeps the single-threaded walk
+SCAN_WORKERS = 1
+
+# chunks of file records the traversal threads may queue ahead of the writer
+SCAN_RECORD_QUEUE_SIZE = 64
+
+# seconds between saving the traversal frontier of a running scan
+SCAN_CHECKPOINT_INTERVAL = 30
+
+# worker counts offered in the Files view, tuned per storage type
+SCAN_WORKER_PRESETS = {
+    "Single thread": 1,
+    "HDD": 2,
+    "SSD / NVMe": 8,
+    "Network share": 16
+}
+
+# -------------------------
+# DUPLICATE DETECTION
+# -------------------------
+
+# smaller files are ignored when looking for duplicates
+DUPLICATE_MIN_SIZE = 1024
+
+# head and tail block read for the partial hash
+HASH_BLOCK_SIZE = 64 * 1024
+
+# read size for full hashes
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# files at least this large are hashed through mmap
+HASH_MMAP_THRESHOLD = 16 * 1024 * 1024
+
+# hashing processes; None uses every core
+HASH_WORKERS = None
+
+# below this many files hashing stays in-process
+HASH_POOL_MIN_FILES = 64
+
+# -------------------------
+# PATH RULES
+# -------------------------
+
+# folders never scanned: path prefixes, exact names and name globs
+SCAN_EXCLUDED_PREFIXES = [
+    "C:\\Windows",
+    "C:\\Program Files\\WindowsApps",
+    "C:\\ProgramData\\Microsoft"
+]
+
+SCAN_EXCLUDED_NAMES = [
+    "Windows",
+    "System Volume Information",
+    "$Recycle.Bin",
+    "PerfLogs"
+]
+
+SCAN_EXCLUDED_GLOBS = [
+    ".*"
+]
+
+# walked even where a rule above would prune them, together with the
+# folders leading to them; inside them the name and glob rules still apply
+SCAN_INCLUDED_PATHS = [
+    "~/.local/share/Steam",
+    "~/.var/app/com.valvesoftware.Steam/.local/share/Steam"
+]
+
+# indexed, but never offered as cleanup candidates
+PROTECTED_KEYWORDS = [
+    "windows",
+    "program files",
+    "programdata",
+    "steamapps",
+    "$recycle.bin",
+    "system volume information",
+    "virtualbox",
+    "vmware"
+]
+
+PROTECTED_EXTENSIONS = [
+    ".sys",
+    ".dll",
+    ".exe",
+    ".vmdk",
+    ".vdi",
+    ".iso"
+]
+
+# game libraries: launcher -> folders whose subfolders are single games
+GAME_LIBRARIES = {
+    "Steam": ["steamapps/common"],
+    "Epic Games": ["Epic Games"],
+    "GOG": ["GOG Galaxy/Games", "GOG Games"],
+    "Ubisoft": ["Ubisoft Game Launcher/games"],
+    "EA": ["EA Games"],
+    "Xbox": ["XboxGames"],
+    "Heroic": ["Games/Heroic"]
+}
+
+# cleanup suggestions are limited to these user folders
+USER_FOLDER_KEYWORDS = [
+    "downloads",
+    "desktop",
+    "documents",
+    "videos",
+    "pictures"
+]
+
+# -------------------------
+# FILE WATCHER
+# -------------------------
+
+# keep the index current after a scan instead of rescanning
+WATCHER_ENABLED = True
+
+# inotify watches we allow ourselves; folders beyond this are polled
+WATCHER_MAX_WATCHES = 100000
+
+# seconds between mtime checks of polled folders
+WATCHER_POLL_INTERVAL = 30
+
+# most polled folders stat'ed per second; past this many folders a full
+# pass takes longer than WATCHER_POLL_INTERVAL instead of sweeping the disk
+WATCHER_POLL_RATE = 2000
+
+# quiet period that ends a burst of events, in seconds
+WATCHER_DEBOUNCE = 1.0
+
+# longest a change may wait while a burst keeps going, in seconds
+WATCHER_MAX_LATENCY = 5.0
+
+# -------------------------
+# SEARCH
+# -------------------------
+
+# pause in typing before the search box queries, in milliseconds
+SEARCH_DEBOUNCE_MS = 150
+
+# results shown for one search
+SEARCH_RESULT_LIMIT = 200
+
+# -------------------------
+# BACKGROUND QUERIES
+# -------------------------
+
+# threads running dashboard and search reads off the GUI thread, each
+# with its own read connection
+QUERY_THREADS = 4
+
+# rows a result table reads per page as it is scrolled
+RESULT_PAGE_SIZE = 200
+
+# -------------------------
+# STARTUP
+# -------------------------
+
+# wait after the window first shows before building the other pages, in ms
+PAGE_PRELOAD_DELAY_MS = 500
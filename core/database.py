@@ -1,78 +1,155 @@
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
+from core import config, migrations, startup
+
 
 DB_PATH = Path("aegis.db")
 
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_database():
+
+    # one Database per process: a single writer shared by every thread
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Database()
+        return _shared
+
 
 class Database:
-    def __init__(self):
-        self.conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-        self.conn.execute("PRAGMA journal_mode=WAL;")
-        self.create_tables()
-        self._ensure_columns()
-
-    def create_tables(self):
-        self.conn.execute("""
-        CREATE TABLE IF NOT EXISTS files (
-            id TEXT PRIMARY KEY,
-            absolute_path TEXT UNIQUE,
-            name TEXT,
-            extension TEXT,
-            size_bytes INTEGER,
-            created_at TEXT,
-            modified_at TEXT,
-            last_seen TEXT,
-            last_accessed TEXT,
-            parent_directory TEXT,
-            is_directory INTEGER,
-            hash TEXT,
-            depth INTEGER
-        );
-        """)
-
-        self.conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_parent_directory
-        ON files(parent_directory);
-        """)
-
-        self.conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_size_bytes
-        ON files(size_bytes);
-        """)
-
-        self.conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_modified_at
-        ON files(modified_at);
-        """)
-
-        self.execute("""
-        CREATE TABLE IF NOT EXISTS scan_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            scan_time TEXT,
-            total_files INTEGER,
-            total_size INTEGER
+    def __init__(self, path=None):
+        self.path = path or DB_PATH
+
+        # the only connection that writes; callers take write_lock around it
+        self.conn = self._connect(check_same_thread=False)
+        self.write_lock = threading.RLock()
+
+        # one read connection per thread, each reading its own WAL snapshot
+        self._local = threading.local()
+
+        # schema changes live in core/migrations.py, keyed on user_version
+        with self.write_lock, startup.phase("migrations"):
+            migrations.migrate(self)
+
+    def _connect(self, **kwargs):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=config.DB_BUSY_TIMEOUT / 1000,
+            **kwargs
         )
-        """)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute(f"PRAGMA synchronous={config.DB_SYNCHRONOUS};")
+        conn.execute(f"PRAGMA cache_size={int(config.DB_CACHE_SIZE)};")
+        conn.execute(f"PRAGMA mmap_size={int(config.DB_MMAP_SIZE)};")
+        conn.execute(f"PRAGMA temp_store={config.DB_TEMP_STORE};")
+        conn.execute(f"PRAGMA busy_timeout={int(config.DB_BUSY_TIMEOUT)};")
+        return conn
 
-        self.conn.commit()
+    @property
+    def reader(self):
+        conn = getattr(self._local, "conn", None)
+
+        if conn is None:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=ON;")
+            self._local.conn = conn
+
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        # serialized with every other write, committed or rolled back on exit
+        with self.write_lock:
+            with self.conn:
+                yield self.conn.cursor()
+
+    def rebuild_search_index(self):
+        with self.transaction() as cur:
+            cur.execute("INSERT INTO files_fts (files_fts) VALUES ('rebuild')")
 
     def execute(self, query, params=()):
-        cur = self.conn.cursor()
-        cur.execute(query, params)
-        self.conn.commit()
+        with self.transaction() as cur:
+            cur.execute(query, params)
         return cur
 
+    def executemany(self, query, seq_of_params):
+        # one transaction for the whole batch instead of a commit per row
+        with self.transaction() as cur:
+            cur.executemany(query, seq_of_params)
+        return cur
+
+    def bulk_writer(self, query, batch_size=None):
+        return BulkWriter(self, query, batch_size)
+
     def fetchall(self, query, params=()):
-        cur = self.conn.cursor()
+        cur = self.reader.cursor()
         cur.execute(query, params)
         return cur.fetchall()
-    
-    def _ensure_columns(self):
-        cur = self.conn.cursor()
-        cur.execute("PRAGMA table_info(files)")
-        columns = [row[1] for row in cur.fetchall()]
-
-        if "last_accessed" not in columns:
-            cur.execute("ALTER TABLE files ADD COLUMN last_accessed TEXT")
-            self.conn.commit()
\ No newline at end of file
+
+    def iterate(self, query, params=(), chunk_size=10000):
+        cur = self.reader.cursor()
+        cur.execute(query, params)
+
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield from rows
+
+
+class BulkWriter:
+    def __init__(self, db, query, batch_size=None):
+        self.db = db
+        self.query = query
+        self.batch_size = batch_size or config.SCAN_BATCH_SIZE
+        self.buffer = []
+        self.written = 0
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # -------------------------
+
+    def add(self, params):
+        self.buffer.append(params)
+
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+
+        self.db.executemany(self.query, self.buffer)
+        self.written += len(self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+
+        if self.finished_at is None:
+            self.finished_at = time.perf_counter()
+
+        return self.written
+
+    # -------------------------
+
+    def elapsed(self):
+        end = self.finished_at or time.perf_counter()
+        return end - self.started_at
+
+    def throughput(self):
+        elapsed = self.elapsed()
+        return self.written / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,62 @@
+import os
+from typing import Iterable, Tuple
+
+
+# separators os.path.join will not add a second one after
+_SEPARATORS = [sep for sep in (os.sep, os.altsep) if sep]
+
+
+DIRECTORY_QUERY = """
+    INSERT INTO directories (path, parent_id)
+    VALUES (?, (SELECT id FROM directories WHERE path = ?))
+    ON CONFLICT(path) DO UPDATE SET parent_id = excluded.parent_id
+    WHERE directories.parent_id IS NULL AND excluded.parent_id IS NOT NULL
+"""
+
+
+def split_path(path: str) -> Tuple[str, str]:
+    # (folder, name) as stored in files; a drive root has no folder and
+    # keeps its whole path as its name
+    parent = os.path.dirname(path)
+    if parent == path:
+        return "", path
+    return parent, os.path.basename(path)
+
+
+def path_sql(folder: str, name: str) -> str:
+    # absolute_path rebuilt in SQL the way os.path.join(folder, name) does
+    separators = ", ".join(f"'{sep}'" for sep in _SEPARATORS)
+
+    return f"""(CASE
+        WHEN {folder} = '' THEN {name}
+        WHEN substr({folder}, -1) IN ({separators}) THEN {folder} || {name}
+        ELSE {folder} || '{os.sep}' || {name}
+    END)"""
+
+
+def register(cur, paths: Iterable[str]):
+
+    # shortest first, so a folder's parent has its row before the folder
+    cur.executemany(DIRECTORY_QUERY, (
+        (path, split_path(path)[0] if path else None)
+        for path in sorted(set(paths), key=len)
+    ))
+
+
+def link_parents(cur):
+
+    # parent ids for rows registered before their parent folder was
+    cur.execute("SELECT id, path FROM directories WHERE parent_id IS NULL")
+    rows = cur.fetchall()
+
+    cur.execute("SELECT path, id FROM directories")
+    ids = dict(cur.fetchall())
+
+    cur.executemany(
+        "UPDATE directories SET parent_id = ? WHERE id = ?",
+        (
+            (ids[split_path(path)[0]], rowid)
+            for rowid, path in rows
+            if path and split_path(path)[0] in ids
+        )
+    )
@@ -1,68 +1,208 @@
 import os
 import sys
-from typing import List, Dict
+from datetime import datetime
+from typing import List, Dict, Iterator, Optional
+
+from core import storage_stats
+from core.directories import split_path
+from core.path_rules import scan_exclusions
+
+
+def build_file_record(path: str, name: str, stat, parent_directory: str) -> Dict:
+    return {
+        "absolute_path": path,
+        "name": name,
+        "extension": os.path.splitext(name)[1],
+        "size_bytes": stat.st_size,
+        "modified_at": int(stat.st_mtime),
+        "last_accessed": int(stat.st_atime),
+        "parent_directory": parent_directory,
+        "depth": path.count(os.sep)
+    }
+
+
+def build_dir_record(path: str, stat) -> Dict:
+    parent_directory, name = split_path(path)
+
+    return {
+        "absolute_path": path,
+        "name": name,
+        "extension": "",
+        "size_bytes": 0,
+        "modified_at": int(stat.st_mtime),
+        "last_accessed": int(stat.st_atime),
+        "parent_directory": parent_directory,
+        "is_directory": 1,
+        "depth": path.count(os.sep)
+    }
 
 
 class DriveIndexer:
-    def __init__(self):
+    def __init__(self, db=None):
+        self.db = db
         self.index: List[Dict] = []
 
-        self.excluded_paths = [
-            "C:\\Windows",
-            "C:\\Program Files\\WindowsApps",
-            "C:\\ProgramData\\Microsoft"
-        ]
+        self.exclusions = scan_exclusions()
 
     def is_excluded(self, path: str) -> bool:
-        for excluded in self.excluded_paths:
-            if path.startswith(excluded):
+        return self.exclusions.matches(path)
+
+    # -------------------------
+    # SCAN HISTORY
+    # -------------------------
+
+    def previous_dir_count(self, root: str) -> Optional[int]:
+        if self.db is None:
+            return None
+
+        rows = self.db.fetchall("""
+            SELECT total_dirs
+            FROM scan_history
+            WHERE root = ?
+            AND total_dirs IS NOT NULL
+            ORDER BY id DESC
+            LIMIT 1
+        """, (root,))
+
+        return rows[0][0] if rows else None
+
+    def record_scan(self, root: str, total_files: int, total_size: int, total_dirs: int) -> bool:
+
+        # True when the folder rollup was rebuilt for a new root
+        if self.db is None:
+            return False
+
+        with self.db.transaction() as cur:
+            tops = set(storage_stats.scan_tops(cur))
+
+            cur.execute("""
+                INSERT INTO scan_history (
+                    scan_time, total_files, total_size, root, total_dirs
+                )
+                VALUES (?, ?, ?, ?, ?)
+            """, (
+                datetime.now().isoformat(),
+                total_files,
+                total_size,
+                root,
+                total_dirs
+            ))
+
+            # folder totals stop at the outermost roots; a new one moves
+            # where they stop, for rows already written too
+            if set(storage_stats.scan_tops(cur)) != tops:
+                storage_stats.fill_rollup(cur)
                 return True
+
         return False
 
-    def scan_drive(self, root="C:\\"):
-        self.index.clear()
+    # -------------------------
+    # SCANNING
+    # -------------------------
+
+    def iter_drive(self, root="C:\\", writer=None, chunk_size=None) -> Iterator:
 
         print("Scanning drive...\n")
 
-        total_dirs = sum(len(dirs) for _, dirs, _ in os.walk(root))
+        self.exclusions.reset()
+
+        # the last scan of this root stands in for a second pre-walk
+        expected_dirs = self.previous_dir_count(root)
         processed_dirs = 0
         file_count = 0
+        total_size = 0
+        chunk = []
 
-        for root_dir, dirs, files in os.walk(root):
-            if self.is_excluded(root_dir):
-                continue
+        try:
+            for root_dir, dirs, files in os.walk(root):
+                if self.is_excluded(root_dir):
+                    dirs[:] = []
+                    continue
 
-            processed_dirs += 1
-            percent = int((processed_dirs / max(total_dirs, 1)) * 100)
+                # prune excluded subtrees before os.walk descends into them
+                dirs[:] = [
+                    d for d in dirs
+                    if not self.exclusions.matches(os.path.join(root_dir, d), d)
+                ]
 
-            for file in files:
-                full_path = os.path.join(root_dir, file)
+                processed_dirs += 1
 
-                try:
-                    size = os.path.getsize(full_path)
-                except Exception:
-                    continue
+                for file in files:
+                    full_path = os.path.join(root_dir, file)
+
+                    try:
+                        stat = os.stat(full_path)
+                    except Exception:
+                        continue
 
-                self.index.append({
-                    "name": file,
-                    "path": full_path,
-                    "size": size,
-                    "extension": os.path.splitext(file)[1].lower()
-                })
+                    size = stat.st_size
 
-                file_count += 1
+                    if writer is not None:
+                        writer.add(build_file_record(full_path, file, stat, root_dir))
 
-            # Update progress on ONE line
-            bar_length = 30
-            filled = int(bar_length * percent / 100)
-            bar = "#" * filled + "-" * (bar_length - filled)
+                    record = {
+                        "name": file,
+                        "path": full_path,
+                        "size": size,
+                        "extension": os.path.splitext(file)[1].lower()
+                    }
 
+                    file_count += 1
+                    total_size += size
+
+                    if chunk_size:
+                        chunk.append(record)
+                        if len(chunk) >= chunk_size:
+                            yield chunk
+                            chunk = []
+                    else:
+                        yield record
+
+                self._print_progress(processed_dirs, expected_dirs, file_count)
+
+            if chunk:
+                yield chunk
+
+        finally:
+            if writer is not None:
+                writer.close()
+
+        print("\n\nScan complete.")
+        print(f"Total files indexed: {file_count}\n")
+
+        if self.exclusions.counts:
+            print(f"Excluded: {self.exclusions.summary()}\n")
+
+        if writer is not None:
+            print(
+                f"Saved {writer.written} records in {writer.elapsed():.1f}s "
+                f"({writer.throughput():.0f} files/s) | {writer.summary()}\n"
+            )
+
+        self.record_scan(root, file_count, total_size, processed_dirs)
+
+    def scan_drive(self, root="C:\\", writer=None):
+        self.index = list(self.iter_drive(root, writer))
+        return self.index
+
+    def _print_progress(self, processed_dirs, expected_dirs, file_count):
+
+        # Update progress on ONE line
+        if not expected_dirs:
             sys.stdout.write(
-                f"\r[{bar}] {percent}% | Files: {file_count}"
+                f"\rFolders: {processed_dirs} | Files: {file_count}"
             )
             sys.stdout.flush()
+            return
 
-        print("\n\nScan complete.")
-        print(f"Total files indexed: {file_count}\n")
+        # the tree may have grown since the last scan
+        percent = min(int((processed_dirs / expected_dirs) * 100), 99)
+
+        bar_length = 30
+        filled = int(bar_length * percent / 100)
+        bar = "#" * filled + "-" * (bar_length - filled)
 
-        return self.index
\ No newline at end of file
+        sys.stdout.write(
+            f"\r[{bar}] {percent}% | Files: {file_count}"
+        )
+        sys.stdout.flush()
\ No newline at end of file
@@ -0,0 +1,120 @@
+import os
+from array import array
+from typing import Dict, Iterable, List
+
+
+# one typed array per field plus interned extension / folder codes and a
+# packed UTF-8 name buffer: a few dozen bytes per file instead of a dict
+class FileIndex:
+    def __init__(self):
+        self.sizes = array("q")
+        self.ext_codes = array("I")
+        self.dir_codes = array("I")
+
+        self._name_data = bytearray()
+        self._name_offsets = array("Q", [0])
+
+        # per extension code, kept as rows are appended: its rows in order
+        # and their total size, so grouping never walks the whole index
+        self.ext_rows: List[array] = []
+        self.ext_sizes = array("q")
+
+        # interned values, a code is the position in these lists
+        self.extensions: List[str] = []
+        self.directories: List[str] = []
+        self._ext_lookup: Dict[str, int] = {}
+        self._dir_lookup: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.sizes)
+
+    # -------------------------
+    # BUILDING
+    # -------------------------
+
+    def _intern(self, value, values, lookup):
+        code = lookup.get(value)
+        if code is None:
+            code = len(values)
+            values.append(value)
+            lookup[value] = code
+        return code
+
+    def append(self, name: str, directory: str, size: int, extension: str):
+        row = len(self.sizes)
+        size = size or 0
+
+        ext_code = self._intern(extension or "", self.extensions, self._ext_lookup)
+        if ext_code == len(self.ext_rows):
+            self.ext_rows.append(array("I"))
+            self.ext_sizes.append(0)
+
+        self.sizes.append(size)
+        self.ext_codes.append(ext_code)
+        self.ext_rows[ext_code].append(row)
+        self.ext_sizes[ext_code] += size
+        self.dir_codes.append(
+            self._intern(directory or "", self.directories, self._dir_lookup)
+        )
+
+        self._name_data += name.encode("utf-8", "surrogatepass")
+        self._name_offsets.append(len(self._name_data))
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "FileIndex":
+
+        # DriveIndexer records: name, path, size, extension
+        index = cls()
+        for file in records:
+            index.append(
+                file["name"],
+                os.path.dirname(file["path"]),
+                file["size"],
+                file["extension"]
+            )
+        return index
+
+    @classmethod
+    def from_db(cls, db) -> "FileIndex":
+        index = cls()
+        for name, directory, size, extension in db.iterate("""
+            SELECT name, parent_directory, size_bytes, lower(extension)
+            FROM file_paths
+            WHERE is_directory = 0
+        """):
+            index.append(name, directory, size, extension)
+        return index
+
+    # -------------------------
+    # ACCESS
+    # -------------------------
+
+    def name(self, i: int) -> str:
+        start = self._name_offsets[i]
+        end = self._name_offsets[i + 1]
+        return self._name_data[start:end].decode("utf-8", "surrogatepass")
+
+    def path(self, i: int) -> str:
+        return os.path.join(self.directories[self.dir_codes[i]], self.name(i))
+
+    def record(self, i: int) -> Dict:
+        return {
+            "name": self.name(i),
+            "path": self.path(i),
+            "size": self.sizes[i],
+            "extension": self.extensions[self.ext_codes[i]]
+        }
+
+    def records(self, rows: Iterable[int]) -> List[Dict]:
+        return [self.record(i) for i in rows]
+
+    def nbytes(self) -> int:
+        return (
+            self.sizes.itemsize * len(self.sizes)
+            + self.ext_codes.itemsize * len(self.ext_codes)
+            + self.dir_codes.itemsize * len(self.dir_codes)
+            + self._name_offsets.itemsize * len(self._name_offsets)
+            + len(self._name_data)
+            + sum(rows.itemsize * len(rows) for rows in self.ext_rows)
+            + self.ext_sizes.itemsize * len(self.ext_sizes)
+        )
@@ -1,57 +1,612 @@
+import json
 import os
 import string
-from unittest import result
-import uuid
-
-from core.database import Database
+import time
+from collections import defaultdict
 from datetime import datetime
-from core.drive_indexer import DriveIndexer
+
+from core import directories, libraries, storage_stats
+from core.database import BulkWriter, get_database
+from core.keyset import KeysetQuery
+from core.drive_indexer import DriveIndexer, build_file_record
 from core.organization_engine import OrganizationEngine
-from datetime import datetime, timedelta
+from core.file_index import FileIndex
+from core.path_rules import game_libraries, protected_paths, user_folders
+
+
+FILE_RECORD_QUERY = """
+    INSERT INTO files (
+        dir_id,
+        name,
+        extension,
+        size_bytes,
+        modified_at,
+        last_accessed,
+        last_seen,
+        is_directory,
+        depth,
+        app_id
+    )
+    VALUES (
+        (SELECT id FROM directories WHERE path = ?),
+        ?, ?, ?, ?, ?, ?, ?, ?,
+        (SELECT id FROM libraries WHERE app_root = ?)
+    )
+    ON CONFLICT(dir_id, name) DO UPDATE SET
+        size_bytes = excluded.size_bytes,
+        modified_at = excluded.modified_at,
+        last_accessed = excluded.last_accessed,
+        last_seen = excluded.last_seen,
+        is_directory = excluded.is_directory,
+        app_id = excluded.app_id,
+        hash = NULL
+    WHERE files.size_bytes IS NOT excluded.size_bytes
+    OR files.modified_at IS NOT excluded.modified_at
+    OR files.is_directory IS NOT excluded.is_directory
+"""
+
+
+STATS_EXTENSION_QUERY = """
+    INSERT INTO stats_extension (extension, file_count, total_size)
+    VALUES (?, ?, ?)
+    ON CONFLICT(extension) DO UPDATE SET
+        file_count = file_count + excluded.file_count,
+        total_size = total_size + excluded.total_size
+"""
+
+STATS_DIRECTORY_QUERY = """
+    INSERT INTO stats_directory (path, file_count, total_size)
+    VALUES (?, ?, ?)
+    ON CONFLICT(path) DO UPDATE SET
+        file_count = file_count + excluded.file_count,
+        total_size = total_size + excluded.total_size
+"""
+
+STATS_GLOBAL_QUERY = """
+    UPDATE stats_global SET
+        file_count = file_count + ?,
+        total_size = total_size + ?
+    WHERE id = 1
+"""
+
+
+# size ranges holding fewer rows than this are searched without the index
+SEARCH_SIZE_DRIVEN_LIMIT = 5000
+
+SEARCH_INDEX_QUERY = """
+    INSERT INTO files_fts (rowid, name, absolute_path)
+    SELECT id, name, absolute_path
+    FROM file_paths
+    WHERE id > ?
+"""
+
+
+# age boundaries in days for the breakdown, oldest bucket is open ended
+AGE_BUCKET_DAYS = (30, 90, 365, 730)
+
+# timestamp columns an age query can run on, all epoch seconds
+AGE_COLUMNS = {
+    "accessed": "last_accessed",
+    "modified": "modified_at"
+}
+
+
+def days_ago(days):
+    return int(time.time()) - int(days * 86400)
+
+
+# cleanup candidates: larger than this and not opened for this many days
+CLEANUP_MIN_SIZE = 300 * 1024 * 1024
+CLEANUP_UNUSED_DAYS = 730
+
+
+# -------------------------
+# RESULT PAGES
+# -------------------------
+
+# every sort below walks an index in order, so a page reads about as many
+# rows as it returns however far down the table it is
+
+# idx_kind_size / idx_kind_modified, rowid last
+LARGEST_FILES_PAGES = KeysetQuery("""
+    SELECT size_bytes, modified_at, absolute_path, id
+    FROM file_paths
+    WHERE is_directory = 0
+    {after}
+    ORDER BY {order}
+    LIMIT ?
+""", {
+    "size": (("size_bytes", 0), ("id", 3)),
+    "modified": (("modified_at", 1), ("size_bytes", 0), ("id", 3))
+})
+
+# idx_dir_rollup_size and the path primary key; empty folders left out
+FOLDER_PAGES = KeysetQuery("""
+    SELECT total_size, file_count, path, rowid
+    FROM dir_rollup
+    WHERE total_size > 0
+    {after}
+    ORDER BY {order}
+    LIMIT ?
+""", {
+    "size": (("total_size", 0), ("rowid", 3)),
+    "path": (("path", 2),)
+})
+
+# the size range of idx_kind_size either way: few files are this large,
+# while most are this old; the unary + keeps the planner off
+# idx_kind_accessed, whose order would cost a walk past all of them
+CLEANUP_PAGES = KeysetQuery("""
+    SELECT size_bytes, last_accessed, absolute_path, id
+    FROM file_paths
+    WHERE is_directory = 0
+    AND size_bytes > ?
+    AND last_accessed < ?
+    {after}
+    ORDER BY {order}
+    LIMIT ?
+""", {
+    "size": (("size_bytes", 0), ("id", 3)),
+    "accessed": (("+last_accessed", 1), ("id", 3))
+})
+
+# (hash, copies, size of one copy, space the extra copies take); groups
+# are sorted by an aggregate, which reads every hashed row per page, but
+# only off the partial idx_hash
+DUPLICATE_GROUP_PAGES = KeysetQuery("""
+    SELECT hash, COUNT(*), MAX(size_bytes), MAX(size_bytes) * (COUNT(*) - 1)
+    FROM files
+    WHERE hash IS NOT NULL
+    GROUP BY hash
+    HAVING COUNT(*) > 1
+    {after}
+    ORDER BY {order}
+    LIMIT ?
+""", {
+    "wasted": (("MAX(size_bytes) * (COUNT(*) - 1)", 3), ("hash", 0)),
+    "size": (("MAX(size_bytes)", 2), ("hash", 0)),
+    "copies": (("COUNT(*)", 1), ("hash", 0))
+})
+
 
+# the full path leads for the writer's own bookkeeping, the rest are
+# FILE_RECORD_QUERY's parameters
+def file_record_params(file_data, last_seen=None):
+    return (
+        file_data["absolute_path"],
+        file_data["parent_directory"],
+        file_data["name"],
+        file_data["extension"],
+        file_data["size_bytes"],
+        file_data["modified_at"],
+        file_data.get("last_accessed"),
+        last_seen or datetime.now().isoformat(),
+        file_data.get("is_directory", 0),
+        file_data["depth"]
+    )
 
 
+class FileRecordWriter(BulkWriter):
+    def __init__(
+        self,
+        db,
+        batch_size=None,
+        track_seen=False,
+        last_seen=None,
+        rollup=True
+    ):
+        super().__init__(db, FILE_RECORD_QUERY, batch_size)
+
+        # full scans rebuild the folder rollup once at the end instead
+        self.rollup = rollup
+
+        # games found in the buffered rows, registered on flush
+        self.libraries = game_libraries()
+        self.apps = set()
+
+        # scan generation: every row written by this writer shares it,
+        # a resumed scan carries on with the generation it started with
+        self.last_seen = last_seen or datetime.now().isoformat()
+        self.track_seen = track_seen
+        self.unchanged_dirs = []
+
+        self.inserted = 0
+        self.updated = 0
+        self.untouched = 0
+
+        if track_seen and last_seen is None:
+            with db.transaction() as cur:
+                cur.execute("DELETE FROM scan_seen")
+                cur.execute("DELETE FROM scan_unchanged_dirs")
+
+    def add(self, file_data):
+        if self.track_seen and file_data.get("unchanged"):
+            self.unchanged_dirs.append((file_data["absolute_path"],))
+
+        app = self.libraries.match(libraries.app_directory(
+            file_data["absolute_path"],
+            file_data["parent_directory"],
+            file_data.get("is_directory")
+        ))
+        if app:
+            self.apps.add(app)
+
+        super().add(
+            file_record_params(file_data, self.last_seen)
+            + (app[1] if app else None,)
+        )
+
+    def _previous_rows(self, cur):
+
+        # keyed by (folder, name), looked up one folder at a time
+        previous = {}
+        names = defaultdict(list)
+        for params in self.buffer:
+            names[params[1]].append(params[2])
+
+        for parent, entries in names.items():
+            for i in range(0, len(entries), 500):
+                chunk = entries[i:i + 500]
+                cur.execute(f"""
+                    SELECT f.name, f.extension, f.size_bytes, f.modified_at,
+                           d.path, f.is_directory
+                    FROM directories d
+                    JOIN files f ON f.dir_id = d.id
+                    WHERE d.path = ?
+                    AND f.name IN ({", ".join("?" * len(chunk))})
+                """, (parent, *chunk))
+
+                for row in cur.fetchall():
+                    previous[(parent, row[0])] = row
+
+        return previous
+
+    def _stats_delta(self, previous):
+        extensions = defaultdict(lambda: [0, 0])
+        folders = defaultdict(lambda: [0, 0])
+        total = [0, 0]
+        inserted = 0
+        new_dirs = []
+
+        def count(extension, parent, size, sign):
+            size = (size or 0) * sign
+            for entry in (
+                extensions[extension or ""],
+                folders[parent or ""],
+                total
+            ):
+                entry[0] += sign
+                entry[1] += size
+
+        for params in self.buffer:
+            key = (params[1], params[2])
+            old = previous.get(key)
+
+            if old is None:
+                inserted += 1
+                if params[8] == 1:
+                    new_dirs.append(params[0])
+            # same test as the upsert WHERE clause: untouched rows stay put
+            elif (old[2], old[3], old[5]) == (params[4], params[5], params[8]):
+                continue
+            elif old[5] == 0:
+                count(old[1], old[4], old[2], -1)
+
+            if params[8] == 0:
+                count(params[3], params[1], params[4], 1)
+
+            # the same path twice in one batch is compared to the first
+            previous[key] = (params[2], params[3], params[4], params[5], params[1], params[8])
+
+        return inserted, extensions, folders, total, new_dirs
+
+    def flush(self):
+        if not self.buffer:
+            return
+
+        with self.db.transaction() as cur:
+            previous = self._previous_rows(cur)
+            inserted, extensions, folders, total, new_dirs = (
+                self._stats_delta(previous)
+            )
+
+            if self.apps:
+                libraries.register(cur, self.apps)
+                self.apps.clear()
+
+            directories.register(cur, (params[1] for params in self.buffer))
+
+            # new rows get the next rowids, everything above this one is new
+            cur.execute("SELECT IFNULL(MAX(rowid), 0) FROM files")
+            last_rowid = cur.fetchone()[0]
+
+            # unchanged rows are skipped by the upsert WHERE clause
+            cur.executemany(self.query, (params[1:] for params in self.buffer))
+            changed = cur.rowcount
+
+            # names and paths never change on update, only new rows need
+            # indexing for search; deletes go through a trigger
+            if inserted:
+                cur.execute(SEARCH_INDEX_QUERY, (last_rowid,))
+
+            # summaries for the dashboards, one row per touched key
+            cur.executemany(STATS_EXTENSION_QUERY, (
+                (key, count, size) for key, (count, size) in extensions.items()
+            ))
+            cur.executemany(STATS_DIRECTORY_QUERY, (
+                (key, count, size) for key, (count, size) in folders.items()
+            ))
+            cur.execute(STATS_GLOBAL_QUERY, total)
+
+            # a file replaced by a folder can empty a summary row
+            cur.executemany(
+                "DELETE FROM stats_extension WHERE extension = ? AND file_count <= 0",
+                ((key,) for key, (count, _) in extensions.items() if count < 0)
+            )
+            cur.executemany(
+                "DELETE FROM stats_directory WHERE path = ? AND file_count <= 0",
+                ((key,) for key, (count, _) in folders.items() if count < 0)
+            )
+
+            # rows for new folders first, file rows or not, then the totals
+            if self.rollup:
+                storage_stats.add_folders(
+                    cur,
+                    {params[1] for params in self.buffer}.union(new_dirs)
+                )
+                storage_stats.add_to_ancestors(cur, folders)
+
+            # untouched rows keep their old last_seen, remember them here;
+            # kept in the database so a resumed scan still knows them
+            if self.track_seen:
+                cur.executemany("""
+                    INSERT OR IGNORE INTO scan_seen (file_rowid)
+                    SELECT f.id
+                    FROM directories d
+                    JOIN files f ON f.dir_id = d.id
+                    WHERE d.path = ? AND f.name = ?
+                """, ((params[1], params[2]) for params in self.buffer))
+
+                cur.executemany(
+                    "INSERT OR IGNORE INTO scan_unchanged_dirs (path) VALUES (?)",
+                    self.unchanged_dirs
+                )
+                self.unchanged_dirs.clear()
+
+        self.inserted += inserted
+        self.updated += changed - inserted
+        self.untouched += len(self.buffer) - changed
+
+        self.written += len(self.buffer)
+        self.buffer.clear()
+
+    def summary(self):
+        return (
+            f"{self.inserted} new, {self.updated} updated, "
+            f"{self.untouched} unchanged"
+        )
 
 
 class FileManager:
-    def __init__(self):
-        self.db = Database()
-        self.indexer = DriveIndexer()
+    def __init__(self, db=None):
+        self.db = db or get_database()
+        self.indexer = DriveIndexer(self.db)
         self.file_index = []
         self.organizer = None
-        self.protected_paths = [
-            "windows",
-            "program files",
-            "steamapps",
-            "vmware",
-            "virtualbox"
-        ]
-        
+        self.protected_paths = protected_paths()
+        self.user_folders = user_folders()
+
     def _save_file_record(self, file_data):
-        self.db.execute("""
-            INSERT OR REPLACE INTO files (
-                id,
-                absolute_path,
-                name,
-                extension,
-                size_bytes,
-                modified_at,
-                parent_directory,
-                is_directory,
-                depth
+        with self.bulk_writer() as writer:
+            writer.add(file_data)
+
+    def bulk_writer(self, batch_size=None, track_seen=False, last_seen=None, rollup=True):
+        return FileRecordWriter(self.db, batch_size, track_seen, last_seen, rollup)
+
+    def get_directory_index(self):
+        mtimes = {}
+        children = defaultdict(list)
+
+        for path, parent, modified_at in self.db.fetchall("""
+            SELECT absolute_path, parent_directory, modified_at
+            FROM file_paths
+            WHERE is_directory = 1
+        """):
+            mtimes[path] = modified_at
+            if parent != path:
+                children[parent].append(path)
+
+        return mtimes, children
+
+    def prune_vanished(self, roots, last_seen):
+
+        # rows neither written nor seen by this scan are gone, unless
+        # their folder was skipped as unchanged and never re-listed
+        deleted = 0
+
+        with self.db.transaction() as cur:
+            for root in roots:
+                prefix = root if root.endswith(os.sep) else root + os.sep
+
+                cur.execute("""
+                    DELETE FROM files
+                    WHERE dir_id IN (
+                        SELECT id FROM directories
+                        WHERE path = ? OR (path >= ? AND path < ?)
+                    )
+                    AND last_seen < ?
+                    AND dir_id NOT IN (
+                        SELECT d.id
+                        FROM scan_unchanged_dirs u
+                        JOIN directories d ON d.path = u.path
+                    )
+                    AND id NOT IN (SELECT file_rowid FROM scan_seen)
+                """, (root, prefix, prefix + "\U0010ffff", last_seen))
+
+                deleted += cur.rowcount
+
+            # folders nothing points at any more
+            cur.execute("""
+                DELETE FROM directories
+                WHERE NOT EXISTS (SELECT 1 FROM files WHERE dir_id = directories.id)
+            """)
+
+            cur.execute("DELETE FROM scan_unchanged_dirs")
+            cur.execute("DELETE FROM scan_seen")
+
+        return deleted
+
+    # -------------------------
+    # SCAN CHECKPOINTS
+    # -------------------------
+
+    def save_checkpoint(self, drives, last_seen, incremental, frontier, totals, drive_progress):
+        total_files, total_dirs, total_size = totals
+
+        with self.db.transaction() as cur:
+            cur.execute("DELETE FROM scan_frontier")
+            cur.executemany(
+                "INSERT OR IGNORE INTO scan_frontier (path) VALUES (?)",
+                ((path,) for path in frontier)
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            file_data["id"],
-            file_data["absolute_path"],
-            file_data["name"],
-            file_data["extension"],
-            file_data["size_bytes"],
-            file_data["modified_at"],
-            file_data["parent_directory"],
-            0,
-            file_data["depth"]
-        ))
+
+            cur.execute("""
+                INSERT OR REPLACE INTO scan_checkpoint (
+                    id,
+                    drives,
+                    last_seen,
+                    incremental,
+                    total_files,
+                    total_dirs,
+                    total_size,
+                    drive_progress,
+                    updated_at
+                )
+                VALUES (1, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                os.pathsep.join(drives),
+                last_seen,
+                int(incremental),
+                total_files,
+                total_dirs,
+                total_size,
+                json.dumps(drive_progress),
+                datetime.now().isoformat()
+            ))
+
+    def load_checkpoint(self):
+        rows = self.db.fetchall("""
+            SELECT drives, last_seen, incremental, total_files, total_dirs,
+                   total_size, drive_progress, updated_at
+            FROM scan_checkpoint
+            WHERE id = 1
+        """)
+
+        if not rows:
+            return None
+
+        drives, last_seen, incremental, files, dirs, size, progress, updated_at = rows[0]
+
+        return {
+            "drives": drives.split(os.pathsep),
+            "last_seen": last_seen,
+            "incremental": bool(incremental),
+            "total_files": files or 0,
+            "total_dirs": dirs or 0,
+            "total_size": size or 0,
+            "drive_progress": json.loads(progress or "{}"),
+            "updated_at": updated_at,
+            "frontier": [
+                row[0] for row in self.db.fetchall("SELECT path FROM scan_frontier")
+            ]
+        }
+
+    def has_checkpoint(self):
+        return bool(self.db.fetchall("SELECT 1 FROM scan_checkpoint WHERE id = 1"))
+
+    def clear_checkpoint(self):
+        with self.db.transaction() as cur:
+            cur.execute("DELETE FROM scan_checkpoint")
+            cur.execute("DELETE FROM scan_frontier")
+
+    def get_children_paths(self, directory):
+        return {
+            row[0] for row in self.db.fetchall(
+                "SELECT absolute_path FROM file_paths WHERE parent_directory = ?",
+                (directory,)
+            )
+        }
+
+    def delete_paths(self, paths):
+        deleted = 0
+
+        # a vanished folder takes its whole subtree with it: its own row,
+        # plus every row in it or in a folder below it
+        subtree = """
+            (
+                dir_id IN (
+                    SELECT id FROM directories
+                    WHERE path = ? OR (path >= ? AND path < ?)
+                )
+                OR id = (
+                    SELECT f.id
+                    FROM directories d
+                    JOIN files f ON f.dir_id = d.id
+                    WHERE d.path = ? AND f.name = ?
+                )
+            )
+        """
+
+        with self.db.transaction() as cur:
+            for path in paths:
+                prefix = path if path.endswith(os.sep) else path + os.sep
+                params = (path, prefix, prefix + "\U0010ffff", *directories.split_path(path))
+
+                # take the subtree out of every folder total above it
+                cur.execute(f"""
+                    SELECT COUNT(*), IFNULL(SUM(size_bytes), 0)
+                    FROM files
+                    WHERE is_directory = 0
+                    AND {subtree}
+                """, params)
+                count, size = cur.fetchone()
+
+                if count:
+                    storage_stats.add_to_ancestors(
+                        cur, {os.path.dirname(path): (-count, -size)}
+                    )
+
+                cur.execute("""
+                    DELETE FROM dir_rollup
+                    WHERE path = ?
+                    OR (path >= ? AND path < ?)
+                """, (path, prefix, prefix + "\U0010ffff"))
+
+                cur.execute(f"DELETE FROM files WHERE {subtree}", params)
+                deleted += cur.rowcount
+
+                cur.execute("""
+                    DELETE FROM directories
+                    WHERE path = ?
+                    OR (path >= ? AND path < ?)
+                """, params[:3])
+
+        return deleted
+
+    def get_scanned_roots(self):
+        roots = []
+
+        for (root,) in self.db.fetchall("""
+            SELECT root FROM scan_history
+            WHERE root IS NOT NULL
+            GROUP BY root
+            ORDER BY MAX(id) DESC
+        """):
+            for path in root.split(os.pathsep):
+                if path and path not in roots and os.path.isdir(path):
+                    roots.append(path)
+
+        return roots
 
     def get_available_drives(self):
         drives = []
@@ -62,7 +617,11 @@ class FileManager:
         return drives
 
 
-    def full_scan(self, root_path):
+    def full_scan(self, root_path, writer=None):
+
+        owns_writer = writer is None
+        if owns_writer:
+            writer = self.bulk_writer()
 
         files_indexed = []
 
@@ -72,25 +631,18 @@ class FileManager:
 
                 if entry.is_dir(follow_symlinks=False):
 
-                    files_indexed += self.full_scan(entry.path)
+                    files_indexed += self.full_scan(entry.path, writer)
 
                 else:
 
-                    stat = entry.stat()
-
-                    file_data = {
-                        "id": str(uuid.uuid4()),
-                        "absolute_path": entry.path,
-                        "name": entry.name,
-                        "extension": os.path.splitext(entry.name)[1],
-                        "size_bytes": stat.st_size,
-                        "modified_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                        "last_accessed": stat.st_atime,
-                        "parent_directory": os.path.dirname(entry.path),
-                        "depth": entry.path.count(os.sep)
-                    }
+                    file_data = build_file_record(
+                        entry.path,
+                        entry.name,
+                        entry.stat(),
+                        os.path.dirname(entry.path)
+                    )
 
-                    self._save_file_record(file_data)
+                    writer.add(file_data)
 
                     files_indexed.append(file_data)
 
@@ -99,17 +651,111 @@ class FileManager:
             except Exception as e:
                 print("Scan error:", e)
 
+        if owns_writer:
+            writer.close()
+            print(
+                f"Indexed {writer.written} files in {writer.elapsed():.1f}s "
+                f"({writer.throughput():.0f} files/s) | {writer.summary()}"
+            )
+
         return files_indexed
 
     def get_largest_files(self, limit=10):
         return self.db.fetchall("""
             SELECT absolute_path, size_bytes
-            FROM files
+            FROM file_paths
             WHERE is_directory = 0
             ORDER BY size_bytes DESC
             LIMIT ?
         """, (limit,))
 
+    def search(
+        self,
+        text,
+        limit=50,
+        offset=0,
+        extension=None,
+        min_size=None,
+        max_size=None,
+        names_only=False
+    ):
+
+        # every word is a substring of the name or path; the trigram index
+        # only knows words of 3+ characters, shorter ones are checked per hit
+        words = text.casefold().split()
+        indexed = [word for word in words if len(word) >= 3]
+
+        column = "f.name" if names_only else "f.absolute_path"
+        conditions = []
+        params = []
+
+        if extension:
+            extension = extension.casefold()
+            conditions.append("lower(f.extension) = ?")
+            params.append(extension if extension.startswith(".") else "." + extension)
+
+        sizes = []
+        if min_size is not None:
+            sizes.append(("f.size_bytes >= ?", min_size))
+        if max_size is not None:
+            sizes.append(("f.size_bytes <= ?", max_size))
+
+        for condition, value in sizes:
+            conditions.append(condition)
+            params.append(value)
+
+        if not words and not conditions:
+            return []
+
+        # nothing for the trigram index ("ab ext:pdf", filters alone), or a
+        # narrow size range that beats a common word ("games" with min:1GB):
+        # walk the rows the filters allow and check the words on each
+        if not indexed or (
+            sizes and self._size_range_count(sizes) < SEARCH_SIZE_DRIVEN_LIMIT
+        ):
+            for word in words:
+                conditions.append(f"instr(lower({column}), ?) > 0")
+                params.append(word)
+
+            return self.db.fetchall(f"""
+                SELECT f.absolute_path, f.size_bytes, f.is_directory
+                FROM file_paths f
+                WHERE {" AND ".join(conditions) or "1"}
+                LIMIT ? OFFSET ?
+            """, (*params, limit, offset))
+
+        match = " ".join('"' + word.replace('"', '""') + '"' for word in indexed)
+        if names_only:
+            match = f"{{name}} : ({match})"
+
+        for word in words:
+            if len(word) < 3:
+                conditions.append(f"instr(lower({column}), ?) > 0")
+                params.append(word)
+
+        # no ORDER BY: hits stream out of the index and LIMIT stops early
+        return self.db.fetchall(f"""
+            SELECT f.absolute_path, f.size_bytes, f.is_directory
+            FROM files_fts
+            JOIN file_paths f ON f.id = files_fts.rowid
+            WHERE {" AND ".join(["files_fts MATCH ?"] + conditions)}
+            LIMIT ? OFFSET ?
+        """, (match, *params, limit, offset))
+
+    def _size_range_count(self, sizes):
+        # counted through idx_size_bytes, stopping at the limit
+        return self.db.fetchall(f"""
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM files f
+                WHERE {" AND ".join(condition for condition, _ in sizes)}
+                LIMIT ?
+            )
+        """, (*(value for _, value in sizes), SEARCH_SIZE_DRIVEN_LIMIT))[0][0]
+
+    def load_organizer(self):
+        self.organizer = OrganizationEngine(FileIndex.from_db(self.db))
+        return self.organizer
+
     def get_duplicates(self):
         if not self.organizer:
             return []
@@ -117,30 +763,30 @@ class FileManager:
 
     def get_extension_breakdown(self):
         return self.db.fetchall("""
-            SELECT extension, COUNT(*), SUM(size_bytes)
-            FROM files
-            WHERE is_directory = 0
-            GROUP BY extension
-            ORDER BY COUNT(*) DESC
+            SELECT NULLIF(extension, ''), file_count, total_size
+            FROM stats_extension
+            ORDER BY file_count DESC
             LIMIT 15
         """)
     
     def get_indexed_file_count(self):
-        result = self.db.fetchall("SELECT COUNT(*) FROM files")
+        result = self.db.fetchall("SELECT file_count FROM stats_global")
         return result[0][0] if result else 0
 
     def get_total_storage_used(self):
-        result = self.db.fetchall("""
-            SELECT SUM(size_bytes) FROM files
-            WHERE is_directory = 0
-        """)
+        result = self.db.fetchall("SELECT total_size FROM stats_global")
         total = result[0][0] if result and result[0][0] else 0
         return total
+
+    def check_storage_stats(self, repair=False):
+        return storage_stats.check(self.db, repair)
     
-    def get_duplicate_files(self):
+    def get_duplicate_files(self, limit=None):
+
+        # every path is rebuilt from its folder, only read what is shown
         return self.db.fetchall("""
             SELECT absolute_path, size_bytes, hash
-            FROM files
+            FROM file_paths
             WHERE hash IS NOT NULL
             AND hash IN (
                 SELECT hash
@@ -150,70 +796,181 @@ class FileManager:
                 HAVING COUNT(*) > 1
             )
             ORDER BY hash
-        """)
+            LIMIT ?
+        """, (limit if limit is not None else -1,))
     
     def get_storage_by_folder(self, limit=10):
+
+        # the folders directly inside the scanned roots, subfolders included;
+        # scans recorded without a root chart the top of the rollup instead
+        roots = self.get_scanned_roots() or self._rollup_roots()
+        if not roots:
+            return []
+
+        return self.db.fetchall(f"""
+            SELECT path, total_size
+            FROM dir_rollup
+            WHERE parent IN ({", ".join("?" * len(roots))})
+            ORDER BY total_size DESC
+            LIMIT ?
+        """, (*roots, limit))
+
+    def _rollup_roots(self):
+
+        # folders with no parent row, off idx_dir_rollup_depth
+        top = self.db.fetchall("""
+            SELECT path, parent
+            FROM dir_rollup
+            WHERE depth = (SELECT MIN(depth) FROM dir_rollup)
+        """)
+        paths = {path for path, _ in top}
+        roots = [path for path, parent in top if parent not in paths]
+
+        # down the chain of folders holding a single folder and no files
+        # of their own, "/" and "/home" above a scanned home folder
+        while len(roots) == 1:
+            children = self.db.fetchall(
+                "SELECT path FROM dir_rollup WHERE parent = ? LIMIT 2",
+                (roots[0],)
+            )
+            own = self.db.fetchall(
+                "SELECT file_count FROM stats_directory WHERE path = ?",
+                (roots[0],)
+            )
+
+            if len(children) != 1 or own:
+                break
+            roots = [children[0][0]]
+
+        return roots
+
+    def get_heaviest_subtrees(self, limit=20, depth=None):
+        if depth is None:
+            return self.db.fetchall("""
+                SELECT path, total_size, file_count
+                FROM dir_rollup
+                ORDER BY total_size DESC
+                LIMIT ?
+            """, (limit,))
+
         return self.db.fetchall("""
-            SELECT parent_directory, SUM(size_bytes)
-            FROM files
-            WHERE is_directory = 0
-            GROUP BY parent_directory
-            ORDER BY SUM(size_bytes) DESC
+            SELECT path, total_size, file_count
+            FROM dir_rollup
+            WHERE depth = ?
+            ORDER BY total_size DESC
             LIMIT ?
-        """, (limit,))
+        """, (depth, limit))
+
+    def get_subtree_children(self, path, limit=50):
+        return self.db.fetchall("""
+            SELECT path, total_size, file_count
+            FROM dir_rollup
+            WHERE parent = ?
+            ORDER BY total_size DESC
+            LIMIT ?
+        """, (path, limit))
+
+    def rebuild_rollup(self):
+        storage_stats.rebuild_rollup(self.db)
+
 
+    def get_game_library_usage(self, launcher=None):
+
+        # per game, over the partial app_id index only
+        query = """
+            SELECT l.launcher, l.name, l.app_root, u.size, u.files
+            FROM (
+                SELECT app_id, SUM(size_bytes) AS size,
+                       SUM(is_directory = 0) AS files
+                FROM files
+                WHERE app_id IS NOT NULL
+                GROUP BY app_id
+            ) u
+            JOIN libraries l ON l.id = u.app_id
+        """
+        params = ()
+
+        if launcher is not None:
+            query += " WHERE l.launcher = ?"
+            params = (launcher,)
+
+        return self.db.fetchall(query + " ORDER BY u.size DESC", params)
 
     def get_steam_games_usage(self):
-        return self.db.fetchall("""
-            SELECT parent_directory, SUM(size_bytes)
-            FROM files
-            WHERE absolute_path LIKE '%Steam%steamapps%common%'
-            GROUP BY parent_directory
-            ORDER BY SUM(size_bytes) DESC
-        """)
+        return [
+            (app_root, size)
+            for _, _, app_root, size, _ in self.get_game_library_usage("Steam")
+        ]
+
+    def retag_libraries(self):
+        # after GAME_LIBRARIES changed in core/config.py
+        return libraries.tag_existing(self.db)
     
-    def get_cleanup_suggestions(self):
-        suggestions = []
+    def get_stale_files(self, days, min_size=0, limit=100, by="accessed"):
 
-        two_years_ago = (datetime.now() - timedelta(days=730)).isoformat()
+        # larger than min_size and untouched for days: walks idx_kind_size
+        # largest first and stops once limit rows pass the age check
+        column = AGE_COLUMNS[by]
 
-        candidates = self.db.fetchall("""
-            SELECT absolute_path, size_bytes, last_accessed
-            FROM files
+        return self.db.fetchall(f"""
+            SELECT absolute_path, size_bytes, {column}
+            FROM file_paths
             WHERE is_directory = 0
             AND size_bytes > ?
-            AND last_accessed < ?
+            AND {column} < ?
             ORDER BY size_bytes DESC
-            LIMIT 100
-        """, (300 * 1024 * 1024, two_years_ago))  # >300MB unused 2+ years
+            LIMIT ?
+        """, (min_size, days_ago(days), limit))
 
-        for path, size, last_accessed in candidates:
-            lower = path.lower()
-
-            # 🚫 Exclusions
-            if any(x in lower for x in [
-                "windows",
-                "program files",
-                "programdata",
-                "steamapps",
-                "$recycle.bin",
-                "system volume information",
-                "virtualbox",
-                "vmware"
-            ]):
-                continue
+    def get_age_breakdown(self, by="accessed"):
 
-            if lower.endswith((".sys", ".dll", ".exe", ".vmdk", ".vdi", ".iso")):
-                continue
+        # one covering range over idx_kind_accessed / idx_kind_modified per
+        # bucket: (newer than, older than in days, file count, total size)
+        column = AGE_COLUMNS[by]
+        bounds = (0,) + AGE_BUCKET_DAYS + (None,)
+        buckets = []
+
+        for newest, oldest in zip(bounds, bounds[1:]):
+            conditions = []
+            params = []
+
+            # the newest bucket also takes clock skewed future timestamps
+            if newest:
+                conditions.append(f"{column} <= ?")
+                params.append(days_ago(newest))
+
+            if oldest is not None:
+                conditions.append(f"{column} > ?")
+                params.append(days_ago(oldest))
+
+            count, size = self.db.fetchall(f"""
+                SELECT COUNT(*), IFNULL(SUM(size_bytes), 0)
+                FROM files
+                WHERE is_directory = 0
+                AND {" AND ".join(conditions)}
+            """, params)[0]
+
+            buckets.append((newest, oldest, count, size))
+
+        return buckets
+
+    def _cleanup_candidate(self, path):
 
-            # 🟢 Prefer user folders
-            if not any(x in lower for x in [
-                "downloads",
-                "desktop",
-                "documents",
-                "videos",
-                "pictures"
-            ]):
+        # 🚫 Exclusions
+        if self.protected_paths.matches(path):
+            return False
+
+        # 🟢 Prefer user folders
+        return self.user_folders.matches(path)
+
+    def get_cleanup_suggestions(self):
+        suggestions = []
+
+        # >300MB unused 2+ years
+        candidates = self.get_stale_files(CLEANUP_UNUSED_DAYS, CLEANUP_MIN_SIZE)
+
+        for path, size, last_accessed in candidates:
+            if not self._cleanup_candidate(path):
                 continue
 
             size_gb = round(size / (1024**3), 2)
@@ -222,36 +979,62 @@ class FileManager:
             )
 
         return suggestions
-    
-    def get_top_folders(self):
 
-        return self.db.fetchall("""
-
-            SELECT parent_directory, SUM(size_bytes)
+    # -------------------------
+    # RESULT PAGES
+    # -------------------------
 
-            FROM files
+    # one page of a result table: (rows, after), where after is passed
+    # back in for the next page and is None once there are no more
 
-            GROUP BY parent_directory
+    def get_largest_files_page(self, sort="size", descending=True, after=None, limit=200):
+        return LARGEST_FILES_PAGES.page(self.db, sort, descending, after, limit)
 
-            ORDER BY SUM(size_bytes) DESC
+    def get_folders_page(self, sort="size", descending=True, after=None, limit=200):
+        return FOLDER_PAGES.page(self.db, sort, descending, after, limit)
 
-            LIMIT 20
+    def get_duplicate_groups_page(self, sort="wasted", descending=True, after=None, limit=200):
+        groups, after = DUPLICATE_GROUP_PAGES.page(self.db, sort, descending, after, limit)
+        if not groups:
+            return [], after
 
-        """)
-    def get_filetype_storage(self):
+        # every copy's path, for this page's groups only
+        paths = defaultdict(list)
+        for digest, path in self.db.fetchall(f"""
+            SELECT hash, absolute_path
+            FROM file_paths
+            WHERE hash IN ({", ".join("?" * len(groups))})
+            ORDER BY absolute_path
+        """, [group[0] for group in groups]):
+            paths[digest].append(path)
 
-        return self.db.fetchall("""
+        return [group + (paths[group[0]],) for group in groups], after
 
-            SELECT extension, COUNT(*), SUM(size_bytes)
+    def get_cleanup_page(self, sort="size", descending=True, after=None, limit=200):
 
-            FROM files
+        # the path rules run here, not in SQL: keep reading until a page
+        # has limit rows that pass or the candidates run out
+        found = []
 
-            WHERE is_directory = 0
+        while True:
+            rows, after = CLEANUP_PAGES.page(
+                self.db, sort, descending, after, limit,
+                (CLEANUP_MIN_SIZE, days_ago(CLEANUP_UNUSED_DAYS))
+            )
+            found.extend(row for row in rows if self._cleanup_candidate(row[2]))
 
-            GROUP BY extension
+            if after is None or len(found) >= limit:
+                return found, after
 
-            ORDER BY SUM(size_bytes) DESC
+    def get_top_folders(self):
+        return [
+            (path, size) for path, size, _ in self.get_heaviest_subtrees(20)
+        ]
 
+    def get_filetype_storage(self):
+        return self.db.fetchall("""
+            SELECT NULLIF(extension, ''), file_count, total_size
+            FROM stats_extension
+            ORDER BY total_size DESC
             LIMIT 15
-
         """)
\ No newline at end of file
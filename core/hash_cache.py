@@ -0,0 +1,121 @@
+from datetime import datetime
+from typing import Optional
+
+
+HASH_CACHE_QUERY = """
+    INSERT INTO hash_cache (
+        device,
+        inode,
+        size_bytes,
+        mtime_ns,
+        path,
+        partial_hash,
+        full_hash,
+        hashed_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(device, inode) DO UPDATE SET
+        size_bytes = excluded.size_bytes,
+        mtime_ns = excluded.mtime_ns,
+        path = excluded.path,
+        partial_hash = CASE
+            WHEN hash_cache.size_bytes = excluded.size_bytes
+            AND hash_cache.mtime_ns = excluded.mtime_ns
+            THEN COALESCE(excluded.partial_hash, hash_cache.partial_hash)
+            ELSE excluded.partial_hash
+        END,
+        full_hash = CASE
+            WHEN hash_cache.size_bytes = excluded.size_bytes
+            AND hash_cache.mtime_ns = excluded.mtime_ns
+            THEN COALESCE(excluded.full_hash, hash_cache.full_hash)
+            ELSE excluded.full_hash
+        END,
+        hashed_at = excluded.hashed_at
+"""
+
+
+class HashCache:
+    def __init__(self, db):
+        self.db = db
+        self.writer = db.bulk_writer(HASH_CACHE_QUERY)
+
+        self.hits = 0
+        self.misses = 0
+
+    # -------------------------
+    # LOOKUP / STORE
+    # -------------------------
+
+    def lookup(self, path: str, stat, kind: str = "full") -> Optional[str]:
+
+        # some filesystems report no inode, so there is no stable identity
+        if not stat.st_ino:
+            self.misses += 1
+            return None
+
+        column = "full_hash" if kind == "full" else "partial_hash"
+
+        rows = self.db.fetchall(f"""
+            SELECT path, {column}
+            FROM hash_cache
+            WHERE device = ?
+            AND inode = ?
+            AND size_bytes = ?
+            AND mtime_ns = ?
+        """, (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns))
+
+        if not rows or not rows[0][1]:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        # renamed or moved: same file, keep the entry pointing at it
+        if rows[0][0] != path:
+            self.store(path, stat)
+
+        return rows[0][1]
+
+    def store(
+        self,
+        path: str,
+        stat,
+        partial: Optional[str] = None,
+        full: Optional[str] = None
+    ):
+        if not stat.st_ino:
+            return
+
+        self.writer.add((
+            stat.st_dev,
+            stat.st_ino,
+            stat.st_size,
+            stat.st_mtime_ns,
+            path,
+            partial,
+            full,
+            datetime.now().isoformat()
+        ))
+
+    def flush(self):
+        self.writer.flush()
+
+    # -------------------------
+    # EVICTION
+    # -------------------------
+
+    def evict_missing(self) -> int:
+        self.flush()
+
+        # the files table is the source of truth for what still exists
+        cur = self.db.execute("""
+            DELETE FROM hash_cache
+            WHERE path NOT IN (SELECT absolute_path FROM file_paths)
+        """)
+
+        return cur.rowcount
+
+    # -------------------------
+
+    def summary(self) -> str:
+        return f"cache: {self.hits} hits, {self.misses} misses"
@@ -0,0 +1,48 @@
+from typing import Dict, Optional, Sequence, Tuple
+
+
+class KeysetQuery:
+
+    # a page is the rows after the previous page's last key, never an
+    # OFFSET: page 5000 costs what page 1 does and rows written between
+    # pages don't shift anything over by one
+    #
+    # query: SQL with {after} where "AND (<key>) < (?, ...)" goes (after
+    # the query's own parameters) and {order} after ORDER BY
+    # sorts: name -> ((sql expression, column in the row), ...), each one
+    # an index order ending in a unique column so keys never tie
+
+    def __init__(self, query: str, sorts: Dict[str, Sequence[Tuple[str, int]]]):
+        self.query = query
+        self.sorts = sorts
+
+    def key(self, sort: str, row) -> tuple:
+        return tuple(row[column] for _, column in self.sorts[sort])
+
+    def sql(self, sort: str, descending: bool, after: Optional[tuple]) -> str:
+        keys = self.sorts[sort]
+        direction = "DESC" if descending else "ASC"
+
+        condition = ""
+        if after is not None:
+            columns = ", ".join(expression for expression, _ in keys)
+            placeholders = ", ".join("?" * len(keys))
+            condition = f"AND ({columns}) {'<' if descending else '>'} ({placeholders})"
+
+        return self.query.format(
+            after=condition,
+            order=", ".join(f"{expression} {direction}" for expression, _ in keys)
+        )
+
+    def page(self, db, sort, descending=True, after=None, limit=200, params=()):
+
+        # (rows, key to pass as after for the next page or None at the end)
+        rows = db.fetchall(
+            self.sql(sort, descending, after),
+            (*params, *(after or ()), limit)
+        )
+
+        if len(rows) < limit:
+            return rows, None
+
+        return rows, self.key(sort, rows[-1])
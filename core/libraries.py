@@ -0,0 +1,61 @@
+import os
+from typing import Iterable, Optional, Tuple
+
+from core.path_rules import LibraryMatcher, game_libraries
+
+
+LIBRARY_QUERY = """
+    INSERT OR IGNORE INTO libraries (launcher, name, app_root)
+    VALUES (?, ?, ?)
+"""
+
+
+def app_directory(path: str, parent: str, is_directory) -> str:
+    # a folder is classified by itself, a file by the folder it is in
+    return path if is_directory else parent
+
+
+def register(cur, apps: Iterable[Tuple[str, str]]):
+    cur.executemany(LIBRARY_QUERY, (
+        (launcher, os.path.basename(app_root) or app_root, app_root)
+        for launcher, app_root in apps
+    ))
+
+
+def tag_existing(db, matcher: Optional[LibraryMatcher] = None) -> int:
+    with db.transaction() as cur:
+        return tag_rows(cur, matcher)
+
+
+def tag_rows(cur, matcher: Optional[LibraryMatcher] = None) -> int:
+    matcher = matcher or game_libraries()
+    patterns = matcher.like_patterns()
+
+    if not patterns:
+        return 0
+
+    # one pass, narrowed by SQLite to the paths that can be inside a game
+    where = " OR ".join("absolute_path LIKE ?" for _ in patterns)
+
+    apps = set()
+    updates = []
+
+    for rowid, path, parent, is_directory in cur.execute(f"""
+        SELECT id, absolute_path, parent_directory, is_directory
+        FROM file_paths
+        WHERE {where}
+    """, patterns):
+        found = matcher.match(app_directory(path, parent, is_directory))
+        if found:
+            apps.add(found)
+            updates.append((found[1], rowid))
+
+    cur.execute("UPDATE files SET app_id = NULL WHERE app_id IS NOT NULL")
+    register(cur, apps)
+    cur.executemany("""
+        UPDATE files
+        SET app_id = (SELECT id FROM libraries WHERE app_root = ?)
+        WHERE id = ?
+    """, updates)
+
+    return len(updates)
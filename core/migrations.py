@@ -0,0 +1,479 @@
+import time
+
+from core import directories, libraries, storage_stats
+
+
+# Schema versions, counted in PRAGMA user_version. Every entry takes the
+# database one version up in a single transaction: its data step runs
+# first, its indexes are built after the rows are in place. Append new
+# entries, never edit one that has shipped.
+
+DIRECTORIES_SCHEMA = """(
+    id INTEGER PRIMARY KEY,
+    parent_id INTEGER,
+    path TEXT UNIQUE
+)"""
+
+FILES_SCHEMA = """(
+    id INTEGER PRIMARY KEY,
+    dir_id INTEGER NOT NULL,
+    name TEXT,
+    extension TEXT,
+    size_bytes INTEGER,
+    created_at INTEGER,
+    modified_at INTEGER,
+    last_seen TEXT,
+    last_accessed INTEGER,
+    is_directory INTEGER,
+    hash TEXT,
+    depth INTEGER,
+    app_id INTEGER,
+    UNIQUE (dir_id, name)
+)"""
+
+
+def epoch_sql(column: str) -> str:
+    # integer epoch seconds from what older versions stored: local time
+    # ISO strings, or raw float seconds
+    return f"""(CASE
+        WHEN {column} IS NULL THEN NULL
+        WHEN typeof({column}) = 'text' AND {column} GLOB '[0-9]*-*'
+            THEN CAST(strftime('%s', {column}, 'utc') AS INTEGER)
+        ELSE CAST({column} AS INTEGER)
+    END)"""
+
+
+def _columns(cur, table):
+    cur.execute(f"PRAGMA table_info({table})")
+    return {row[1]: row[2].upper() for row in cur.fetchall()}
+
+
+# -------------------------
+# 1: FOLDER PATHS
+# -------------------------
+
+def _normalize_directories(cur):
+    columns = _columns(cur, "files")
+
+    # files from before the directories table carry a full path and a
+    # full parent path on every row; move them onto folder ids once
+    if "absolute_path" not in columns:
+        return
+
+    def column(name):
+        return f"f.{name}" if name in columns else "NULL"
+
+    # rebuilt against the new table by the baseline schema
+    cur.execute("DROP TABLE IF EXISTS files_fts")
+
+    cur.execute(f"CREATE TABLE IF NOT EXISTS directories {DIRECTORIES_SCHEMA}")
+    cur.execute("""
+        INSERT OR IGNORE INTO directories (path)
+        SELECT DISTINCT IFNULL(parent_directory, '') FROM files
+    """)
+    directories.link_parents(cur)
+
+    # rowids are kept, scan_seen and the search index refer to them
+    cur.execute(f"CREATE TABLE files_normalized {FILES_SCHEMA}")
+    cur.execute(f"""
+        INSERT OR IGNORE INTO files_normalized (
+            id, dir_id, name, extension, size_bytes, created_at,
+            modified_at, last_seen, last_accessed, is_directory,
+            hash, depth, app_id
+        )
+        SELECT f.rowid, d.id, f.name, f.extension, f.size_bytes,
+               {epoch_sql(column("created_at"))},
+               {epoch_sql("f.modified_at")}, f.last_seen,
+               {epoch_sql(column("last_accessed"))}, f.is_directory, f.hash,
+               f.depth, {column("app_id")}
+        FROM files f
+        JOIN directories d ON d.path = IFNULL(f.parent_directory, '')
+    """)
+
+    cur.execute("DROP TABLE files")
+    cur.execute("ALTER TABLE files_normalized RENAME TO files")
+
+
+# -------------------------
+# 2: EPOCH TIMESTAMPS
+# -------------------------
+
+def _epoch_timestamps(cur):
+    columns = _columns(cur, "files")
+
+    # a TEXT column would store the new integers as strings again, so
+    # the table is rebuilt with INTEGER columns and its rows converted
+    if columns.get("modified_at", "INTEGER") == "INTEGER":
+        return
+
+    def column(name):
+        return f"f.{name}" if name in columns else "NULL"
+
+    # recreated by the baseline schema
+    cur.execute("DROP VIEW IF EXISTS file_paths")
+
+    # rowids are kept, the search index refers to them
+    cur.execute(f"CREATE TABLE files_epoch {FILES_SCHEMA}")
+    cur.execute(f"""
+        INSERT INTO files_epoch (
+            id, dir_id, name, extension, size_bytes, created_at,
+            modified_at, last_seen, last_accessed, is_directory,
+            hash, depth, app_id
+        )
+        SELECT f.id, f.dir_id, f.name, f.extension, f.size_bytes,
+               {epoch_sql("f.created_at")},
+               {epoch_sql("f.modified_at")}, f.last_seen,
+               {epoch_sql(column("last_accessed"))}, f.is_directory,
+               f.hash, f.depth, {column("app_id")}
+        FROM files f
+    """)
+
+    cur.execute("DROP TABLE files")
+    cur.execute("ALTER TABLE files_epoch RENAME TO files")
+
+
+# -------------------------
+# 3: BASELINE SCHEMA
+# -------------------------
+
+def _baseline(cur):
+
+    # every folder path once; files point at their folder by id
+    cur.execute(f"CREATE TABLE IF NOT EXISTS directories {DIRECTORIES_SCHEMA}")
+    cur.execute(f"CREATE TABLE IF NOT EXISTS files {FILES_SCHEMA}")
+
+    # columns added before versioning, on files not rebuilt above
+    columns = _columns(cur, "files")
+    if "last_accessed" not in columns:
+        cur.execute("ALTER TABLE files ADD COLUMN last_accessed INTEGER")
+    if "app_id" not in columns:
+        cur.execute("ALTER TABLE files ADD COLUMN app_id INTEGER")
+
+    # full paths for reading, rebuilt from the folder and the name
+    cur.execute(f"""
+        CREATE VIEW IF NOT EXISTS file_paths AS
+        SELECT
+            f.id,
+            f.dir_id,
+            f.name,
+            {directories.path_sql("d.path", "f.name")} AS absolute_path,
+            d.path AS parent_directory,
+            f.extension,
+            f.size_bytes,
+            f.created_at,
+            f.modified_at,
+            f.last_seen,
+            f.last_accessed,
+            f.is_directory,
+            f.hash,
+            f.depth,
+            f.app_id
+        FROM files f
+        JOIN directories d ON d.id = f.dir_id
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS hash_cache (
+            device INTEGER,
+            inode INTEGER,
+            size_bytes INTEGER,
+            mtime_ns INTEGER,
+            path TEXT,
+            partial_hash TEXT,
+            full_hash TEXT,
+            hashed_at TEXT,
+            PRIMARY KEY (device, inode)
+        )
+    """)
+
+    # game folders found by core/libraries.py, files point here by app_id
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS libraries (
+            id INTEGER PRIMARY KEY,
+            launcher TEXT,
+            name TEXT,
+            app_root TEXT UNIQUE
+        )
+    """)
+
+    # dashboard summaries, kept current by FileRecordWriter and a trigger
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS stats_global (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            file_count INTEGER,
+            total_size INTEGER
+        )
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS stats_extension (
+            extension TEXT PRIMARY KEY,
+            file_count INTEGER,
+            total_size INTEGER
+        )
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS stats_directory (
+            path TEXT PRIMARY KEY,
+            file_count INTEGER,
+            total_size INTEGER
+        )
+    """)
+
+    # cumulative size of every folder, subfolders included
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS dir_rollup (
+            path TEXT PRIMARY KEY,
+            parent TEXT,
+            depth INTEGER,
+            total_size INTEGER,
+            file_count INTEGER
+        )
+    """)
+
+    _create_stats_trigger(cur)
+    _create_search_index(cur)
+
+    # state of an unfinished scan, so it can be resumed
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS scan_checkpoint (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            drives TEXT,
+            last_seen TEXT,
+            incremental INTEGER,
+            total_files INTEGER,
+            total_dirs INTEGER,
+            total_size INTEGER,
+            drive_progress TEXT,
+            updated_at TEXT
+        )
+    """)
+
+    cur.execute("CREATE TABLE IF NOT EXISTS scan_frontier (path TEXT PRIMARY KEY)")
+    cur.execute("CREATE TABLE IF NOT EXISTS scan_seen (file_rowid INTEGER PRIMARY KEY)")
+    cur.execute("CREATE TABLE IF NOT EXISTS scan_unchanged_dirs (path TEXT PRIMARY KEY)")
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS scan_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scan_time TEXT,
+            total_files INTEGER,
+            total_size INTEGER,
+            root TEXT,
+            total_dirs INTEGER
+        )
+    """)
+
+    columns = _columns(cur, "scan_history")
+    if "root" not in columns:
+        cur.execute("ALTER TABLE scan_history ADD COLUMN root TEXT")
+    if "total_dirs" not in columns:
+        cur.execute("ALTER TABLE scan_history ADD COLUMN total_dirs INTEGER")
+
+    # rows from before versioning: summaries, folder totals and game tags
+    # are recomputed once from the files themselves
+    storage_stats.fill_summaries(cur)
+    storage_stats.fill_rollup(cur)
+    libraries.tag_rows(cur)
+
+
+def _create_stats_trigger(cur):
+
+    # inserts and updates are summed per batch by FileRecordWriter,
+    # rows can be deleted from many places so that is left to SQLite
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS stats_files_delete
+        AFTER DELETE ON files
+        WHEN OLD.is_directory = 0
+        BEGIN
+            UPDATE stats_extension SET
+                file_count = file_count - 1,
+                total_size = total_size - IFNULL(OLD.size_bytes, 0)
+            WHERE extension = IFNULL(OLD.extension, '');
+
+            DELETE FROM stats_extension
+            WHERE extension = IFNULL(OLD.extension, '') AND file_count <= 0;
+
+            UPDATE stats_directory SET
+                file_count = file_count - 1,
+                total_size = total_size - IFNULL(OLD.size_bytes, 0)
+            WHERE path = (SELECT path FROM directories WHERE id = OLD.dir_id);
+
+            DELETE FROM stats_directory
+            WHERE path = (SELECT path FROM directories WHERE id = OLD.dir_id)
+            AND file_count <= 0;
+
+            UPDATE stats_global SET
+                file_count = file_count - 1,
+                total_size = total_size - IFNULL(OLD.size_bytes, 0)
+            WHERE id = 1;
+        END
+    """)
+
+
+def _create_search_index(cur):
+    cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'files_fts'")
+    exists = cur.fetchone()
+
+    old_path = directories.path_sql("d.path", "OLD.name")
+    new_path = directories.path_sql("d.path", "NEW.name")
+
+    # trigram full text over names and paths, reading its text from
+    # file_paths; new rows are indexed per batch by FileRecordWriter,
+    # a trigger per inserted row made a full scan several times slower
+    cur.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+            name,
+            absolute_path,
+            content = 'file_paths',
+            content_rowid = 'id',
+            tokenize = 'trigram'
+        )
+    """)
+
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS files_fts_delete
+        AFTER DELETE ON files
+        BEGIN
+            INSERT INTO files_fts (files_fts, rowid, name, absolute_path)
+            SELECT 'delete', OLD.id, OLD.name, {old_path}
+            FROM directories d WHERE d.id = OLD.dir_id;
+        END
+    """)
+
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS files_fts_update
+        AFTER UPDATE OF dir_id, name ON files
+        WHEN OLD.dir_id IS NOT NEW.dir_id OR OLD.name IS NOT NEW.name
+        BEGIN
+            INSERT INTO files_fts (files_fts, rowid, name, absolute_path)
+            SELECT 'delete', OLD.id, OLD.name, {old_path}
+            FROM directories d WHERE d.id = OLD.dir_id;
+            INSERT INTO files_fts (rowid, name, absolute_path)
+            SELECT NEW.id, NEW.name, {new_path}
+            FROM directories d WHERE d.id = NEW.dir_id;
+        END
+    """)
+
+    # files indexed before search existed
+    if not exists:
+        cur.execute("INSERT INTO files_fts (files_fts) VALUES ('rebuild')")
+
+
+BASELINE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_directories_parent ON directories(parent_id)",
+
+    "CREATE INDEX IF NOT EXISTS idx_size_bytes ON files(size_bytes)",
+
+    # age buckets ("last touched 90 to 365 days ago") as covering range
+    # scans, files and folders apart like idx_kind_size
+    """CREATE INDEX IF NOT EXISTS idx_kind_modified
+    ON files(is_directory, modified_at, size_bytes)""",
+
+    """CREATE INDEX IF NOT EXISTS idx_kind_accessed
+    ON files(is_directory, last_accessed, size_bytes)""",
+
+    # files vs folders, largest first: largest files, cleanup, folder list
+    "CREATE INDEX IF NOT EXISTS idx_kind_size ON files(is_directory, size_bytes)",
+
+    # per folder totals grouped straight off the index: summaries,
+    # rollup rebuilds and the consistency check
+    """CREATE INDEX IF NOT EXISTS idx_kind_dir
+    ON files(is_directory, dir_id, size_bytes)""",
+
+    # only hashed rows, covering the duplicate listing
+    """CREATE INDEX IF NOT EXISTS idx_hash
+    ON files(hash, size_bytes, dir_id, name)
+    WHERE hash IS NOT NULL""",
+
+    # only rows inside a game, covering the per-game usage
+    """CREATE INDEX IF NOT EXISTS idx_app
+    ON files(app_id, is_directory, size_bytes)
+    WHERE app_id IS NOT NULL""",
+
+    """CREATE INDEX IF NOT EXISTS idx_stats_directory_size
+    ON stats_directory(total_size)""",
+
+    "CREATE INDEX IF NOT EXISTS idx_dir_rollup_size ON dir_rollup(total_size)",
+    "CREATE INDEX IF NOT EXISTS idx_dir_rollup_parent ON dir_rollup(parent, total_size)",
+    "CREATE INDEX IF NOT EXISTS idx_dir_rollup_depth ON dir_rollup(depth, total_size)"
+]
+
+
+# -------------------------
+# 4: TASKS
+# -------------------------
+
+def _tasks(cur):
+
+    # TaskManager's table, which no earlier version created
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            category TEXT,
+            importance INTEGER,
+            estimated_minutes INTEGER,
+            due_date TEXT,
+            created_at TEXT,
+            completed INTEGER DEFAULT 0,
+            completed_at TEXT
+        )
+    """)
+
+
+TASKS_INDEXES = [
+    # open tasks by due date, the task list's default view
+    "CREATE INDEX IF NOT EXISTS idx_tasks_open ON tasks(completed, due_date)"
+]
+
+
+# (description, data step, indexes built once the data step is done)
+MIGRATIONS = [
+    ("folder paths into the directories table", _normalize_directories, []),
+    ("timestamps as epoch seconds", _epoch_timestamps, []),
+    ("baseline schema", _baseline, BASELINE_INDEXES),
+    ("tasks table", _tasks, TASKS_INDEXES)
+]
+
+LATEST_VERSION = len(MIGRATIONS)
+
+
+# -------------------------
+# RUNNER
+# -------------------------
+
+def migrate(db) -> int:
+
+    # an up to date database costs this one read
+    version = db.conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= LATEST_VERSION:
+        return version
+
+    started = time.perf_counter()
+
+    for number in range(version + 1, LATEST_VERSION + 1):
+        description, step, indexes = MIGRATIONS[number - 1]
+        print(f"Database: migrating to version {number} ({description})...")
+
+        # DDL included: without an explicit BEGIN sqlite3 would run the
+        # CREATE and DROP statements outside the transaction
+        with db.transaction() as cur:
+            cur.execute("BEGIN IMMEDIATE")
+            step(cur)
+
+            for statement in indexes:
+                cur.execute(statement)
+
+            cur.execute(f"PRAGMA user_version = {number}")
+
+    # tables rewritten by a migration leave their old pages behind
+    page_count = db.conn.execute("PRAGMA page_count").fetchone()[0]
+    free_pages = db.conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if free_pages > page_count // 4:
+        db.conn.execute("VACUUM")
+
+    print(f"Database: at version {LATEST_VERSION} in {time.perf_counter() - started:.1f}s")
+    return LATEST_VERSION
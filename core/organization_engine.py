@@ -1,39 +1,103 @@
-from collections import defaultdict
-from typing import List, Dict
+from collections import Counter, defaultdict
+from itertools import compress
+from typing import List, Dict, Iterable, Union
+
+from core import config
+from core.file_index import FileIndex
+from modules.duplicate_detector import find_duplicate_groups
 
 
 class OrganizationEngine:
-    def __init__(self, file_index: List[Dict]):
+    def __init__(self, file_index: Union[List[Dict], FileIndex]):
+        if not isinstance(file_index, FileIndex):
+            file_index = FileIndex.from_records(file_index)
+
         self.file_index = file_index
 
-    def group_by_extension(self):
-        groups = defaultdict(list)
+    def extension_rows(self):
 
-        for file in self.file_index:
-            groups[file["extension"]].append(file)
+        # extension -> row numbers, straight from the index's own columns;
+        # file_index.records(rows) turns the ones that get shown into dicts
+        index = self.file_index
+        return dict(zip(index.extensions, index.ext_rows))
 
-        return groups
+    def group_by_extension(self):
+        index = self.file_index
+        return defaultdict(list, {
+            extension: index.records(rows)
+            for extension, rows in self.extension_rows().items()
+        })
+
+    def extension_breakdown(self):
+        index = self.file_index
+        return {
+            extension: {"count": len(rows), "size": size}
+            for extension, rows, size in zip(index.extensions, index.ext_rows, index.ext_sizes)
+        }
 
     def find_large_files(self, min_size_mb=500):
-        large_files = []
+        index = self.file_index
+        min_size = min_size_mb * 1024 * 1024
+
+        rows = compress(range(len(index)), map(min_size.__le__, index.sizes))
+
+        return index.records(rows)
+
+    def duplicate_rows(self):
+        index = self.file_index
+
+        # size pre-filter only, on the column: rows grouped by a shared
+        # size, nothing is read from disk
+        counts = Counter(index.sizes)
+        by_size = {
+            size: [] for size, count in counts.items()
+            if count > 1 and size >= config.DUPLICATE_MIN_SIZE
+        }
+
+        candidates = by_size.get
+        for row, size in enumerate(index.sizes):
+            rows = candidates(size)
+            if rows is not None:
+                rows.append(row)
+
+        return list(by_size.values())
+
+    def duplicate_groups(self):
+
+        # hashes the size candidates' contents, see find_duplicate_groups
+        index = self.file_index
+        row_by_path = {
+            index.path(row): row
+            for rows in self.duplicate_rows() for row in rows
+        }
 
-        for file in self.file_index:
-            size_mb = file["size"] / (1024 * 1024)
-            if size_mb >= min_size_mb:
-                large_files.append(file)
+        groups, _ = find_duplicate_groups(
+            (path, index.sizes[row]) for path, row in row_by_path.items()
+        )
 
-        return large_files
+        return [[row_by_path[path] for path in paths] for paths in groups]
 
     def find_duplicates(self):
-        size_map = defaultdict(list)
+        rows = sorted(row for group in self.duplicate_groups() for row in group)
+        return self.file_index.records(rows)
 
-        for file in self.file_index:
-            size_map[file["size"]].append(file)
+    # -------------------------
+    # STREAMING
+    # -------------------------
 
-        duplicates = []
+    @staticmethod
+    def analyze_stream(records: Iterable[Dict], min_size_mb=500) -> Dict:
 
-        for size, files in size_map.items():
-            if len(files) > 1:
-                duplicates.extend(files)
+        # builds the columnar index straight from DriveIndexer.iter_drive,
+        # so the dict list never exists
+        engine = OrganizationEngine(FileIndex.from_records(records))
+        index = engine.file_index
 
-        return duplicates
\ No newline at end of file
+        return {
+            "extensions": engine.extension_breakdown(),
+            "large_files": engine.find_large_files(min_size_mb),
+            "duplicates": [
+                [index.path(row) for row in rows]
+                for rows in engine.duplicate_groups()
+            ]
+        }
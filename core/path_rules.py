@@ -0,0 +1,252 @@
+import fnmatch
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core import config
+
+
+_SEPARATORS = re.compile(r"[\\/]+")
+_PARTS = re.compile(r"[^\\/]+")
+
+
+def _components(path: str) -> List[str]:
+    return [part for part in _SEPARATORS.split(path.casefold()) if part]
+
+
+def _alternation(patterns: List[str]):
+    if not patterns:
+        return None
+
+    # one group per rule, match.lastindex tells which one fired
+    return re.compile("|".join(f"({pattern})" for pattern in patterns))
+
+
+class PathMatcher:
+    def __init__(
+        self,
+        prefixes: Iterable[str] = (),
+        names: Iterable[str] = (),
+        globs: Iterable[str] = (),
+        keywords: Iterable[str] = (),
+        suffixes: Iterable[str] = (),
+        included: Iterable[str] = ()
+    ):
+        # folder prefixes: trie over path components
+        self._trie = {}
+        for prefix in prefixes:
+            node = self._trie
+            for part in _components(prefix):
+                node = node.setdefault(part, {})
+            node[None] = f"prefix:{prefix}"
+
+        # exceptions to every rule, for themselves and the folders above them
+        self._included = {}
+        for path in included:
+            node = self._included
+            for part in _components(os.path.expanduser(path)):
+                node = node.setdefault(part, {})
+            node[None] = True
+
+        # exact entry names
+        self._names = {name.casefold(): f"name:{name}" for name in names}
+
+        # entry name globs
+        globs = list(globs)
+        self._glob_labels = [f"glob:{glob}" for glob in globs]
+        self._globs = _alternation(
+            [fnmatch.translate(glob.casefold()) for glob in globs]
+        )
+
+        # substrings anywhere in the path
+        keywords = list(keywords)
+        self._keyword_labels = [f"keyword:{keyword}" for keyword in keywords]
+        self._keywords = _alternation(
+            [re.escape(keyword.casefold()) for keyword in keywords]
+        )
+
+        self._suffixes = tuple(suffix.casefold() for suffix in suffixes)
+
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # MATCHING
+    # -------------------------
+
+    def _match_prefix(self, path: str, below: int = 0) -> Optional[str]:
+
+        # rules ending in the first `below` components don't count
+        node = self._trie
+        for depth, part in enumerate(_components(path), 1):
+            node = node.get(part)
+            if node is None:
+                return None
+            if None in node and depth > below:
+                return node[None]
+        return None
+
+    def _inclusion(self, path: str) -> Optional[int]:
+
+        # None when no included path is involved, 0 for an included path
+        # and the folders on the way to it, which are never pruned; inside
+        # one, how many components it has
+        node = self._included
+        parts = _components(path)
+
+        for depth, part in enumerate(parts, 1):
+            node = node.get(part)
+            if node is None:
+                return None
+            if None in node:
+                return depth if depth < len(parts) else 0
+
+        return 0
+
+    def match(self, path: str, name: Optional[str] = None) -> Optional[str]:
+
+        # inside an included path the name rules apply as usual, and the
+        # whole-path rules only look below it
+        below = 0
+        if self._included:
+            below = self._inclusion(path)
+            if below == 0:
+                return None
+
+        folded = path.casefold()
+        label = None
+
+        if self._trie:
+            label = self._match_prefix(path, below or 0)
+
+        if label is None and (self._names or self._globs):
+            if name is not None:
+                entry = name.casefold()
+            else:
+                entry = (_components(folded) or [""])[-1]
+
+            label = self._names.get(entry)
+
+            if label is None and self._globs:
+                found = self._globs.fullmatch(entry)
+                if found:
+                    label = self._glob_labels[found.lastindex - 1]
+
+        if label is None and self._keywords:
+            if below:
+                folded = os.sep.join(_components(folded)[below:])
+            found = self._keywords.search(folded)
+            if found:
+                label = self._keyword_labels[found.lastindex - 1]
+
+        if label is None and self._suffixes and folded.endswith(self._suffixes):
+            for suffix in self._suffixes:
+                if folded.endswith(suffix):
+                    label = f"suffix:{suffix}"
+                    break
+
+        if label is not None:
+            with self._lock:
+                self.counts[label] += 1
+
+        return label
+
+    def matches(self, path: str, name: Optional[str] = None) -> bool:
+        return self.match(path, name) is not None
+
+    # -------------------------
+    # REPORT
+    # -------------------------
+
+    def report(self) -> List[Tuple[str, int]]:
+        return self.counts.most_common()
+
+    def summary(self) -> str:
+        return ", ".join(f"{label} x{count}" for label, count in self.report())
+
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+
+
+# -------------------------
+# GAME LIBRARIES
+# -------------------------
+
+class LibraryMatcher:
+    def __init__(self, libraries: Dict[str, Iterable[str]]):
+
+        # marker components, looked up by their first component
+        self._markers = {}
+        for launcher, markers in libraries.items():
+            for marker in markers:
+                parts = _components(marker)
+                if parts:
+                    self._markers.setdefault(parts[0], []).append((launcher, parts))
+
+        self._cache = {}
+
+    def _app_root(self, directory: str) -> Optional[Tuple[str, str]]:
+        spans = [(m.start(), m.end()) for m in _PARTS.finditer(directory)]
+        parts = [directory[start:end].casefold() for start, end in spans]
+
+        for i, part in enumerate(parts):
+            for launcher, marker in self._markers.get(part, ()):
+                end = i + len(marker)
+
+                # the folder right below the marker is the game
+                if end < len(parts) and parts[i:end] == marker:
+                    return launcher, directory[:spans[end][1]]
+
+        return None
+
+    def like_patterns(self) -> List[str]:
+        # LIKE patterns that every path inside a game matches; "_" stands
+        # in for either separator
+        return [
+            "%" + "_".join(parts) + "_%"
+            for markers in self._markers.values()
+            for _, parts in markers
+        ]
+
+    def match(self, directory: str) -> Optional[Tuple[str, str]]:
+        # (launcher, game root folder) for anything inside a game
+        if directory in self._cache:
+            return self._cache[directory]
+
+        if len(self._cache) >= 10000:
+            self._cache.clear()
+
+        found = self._app_root(directory) if directory else None
+        self._cache[directory] = found
+        return found
+
+
+# -------------------------
+# SHARED RULE SETS
+# -------------------------
+
+def scan_exclusions() -> PathMatcher:
+    return PathMatcher(
+        prefixes=config.SCAN_EXCLUDED_PREFIXES,
+        names=config.SCAN_EXCLUDED_NAMES,
+        globs=config.SCAN_EXCLUDED_GLOBS,
+        included=config.SCAN_INCLUDED_PATHS
+    )
+
+
+def protected_paths() -> PathMatcher:
+    return PathMatcher(
+        keywords=config.PROTECTED_KEYWORDS,
+        suffixes=config.PROTECTED_EXTENSIONS
+    )
+
+
+def user_folders() -> PathMatcher:
+    return PathMatcher(keywords=config.USER_FOLDER_KEYWORDS)
+
+
+def game_libraries() -> LibraryMatcher:
+    return LibraryMatcher(config.GAME_LIBRARIES)
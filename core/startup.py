@@ -0,0 +1,74 @@
+import time
+from contextlib import contextmanager
+
+
+# where startup time goes: main.py calls begin() before anything else is
+# imported, every phase after that is timed from that moment and printed;
+# nothing is recorded in processes that never call begin (benchmarks,
+# scripts opening the database)
+
+_began = None
+
+# (name, ms since begin at the start, ms spent or None for a moment),
+# in the order they ended
+phases = []
+
+_listeners = []
+finished = False
+
+
+def begin():
+    global _began
+    if _began is None:
+        _began = time.perf_counter()
+
+
+def since_begin(moment=None):
+    return ((moment or time.perf_counter()) - _began) * 1000
+
+
+def _record(name, started, spent=None):
+    phases.append((name, started, spent))
+
+    if spent is None:
+        print(f"Startup: {name} at {started:.0f} ms")
+    else:
+        print(f"Startup: {name} {spent:.0f} ms (at {started:.0f} ms)")
+
+
+@contextmanager
+def phase(name):
+    if _began is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, since_begin(started), (time.perf_counter() - started) * 1000)
+
+
+def mark(name):
+
+    # a moment rather than a span
+    if _began is not None:
+        _record(name, since_begin())
+
+
+def finish():
+
+    # the window is painted and the preloaded pages are built
+    global finished
+    if _began is None or finished:
+        return
+
+    finished = True
+    mark("startup finished")
+
+    for listener in _listeners:
+        listener()
+
+
+def when_finished(listener):
+    _listeners.append(listener)
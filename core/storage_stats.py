@@ -0,0 +1,280 @@
+import os
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from core.directories import split_path
+
+
+# what the summary tables must hold, computed from the files table
+FRESH_QUERIES = {
+    "stats_global": """
+        SELECT 1, COUNT(*), IFNULL(SUM(size_bytes), 0)
+        FROM files
+        WHERE is_directory = 0
+    """,
+    "stats_extension": """
+        SELECT IFNULL(extension, ''), COUNT(*), IFNULL(SUM(size_bytes), 0)
+        FROM files
+        WHERE is_directory = 0
+        GROUP BY IFNULL(extension, '')
+    """,
+    "stats_directory": """
+        SELECT d.path, g.file_count, g.total_size
+        FROM (
+            SELECT dir_id, COUNT(*) AS file_count,
+                   IFNULL(SUM(size_bytes), 0) AS total_size
+            FROM files
+            WHERE is_directory = 0
+            GROUP BY dir_id
+        ) g
+        JOIN directories d ON d.id = g.dir_id
+    """
+}
+
+STORED_QUERIES = {
+    "stats_global": "SELECT id, file_count, total_size FROM stats_global",
+    "stats_extension": "SELECT extension, file_count, total_size FROM stats_extension",
+    "stats_directory": "SELECT path, file_count, total_size FROM stats_directory"
+}
+
+
+# -------------------------
+# REBUILD
+# -------------------------
+
+def rebuild(db):
+    with db.transaction() as cur:
+        fill_summaries(cur)
+
+
+def fill_summaries(cur):
+    for table, query in FRESH_QUERIES.items():
+        cur.execute(f"DELETE FROM {table}")
+        cur.execute(f"INSERT INTO {table} {query}")
+
+
+# -------------------------
+# FOLDER ROLLUP
+# -------------------------
+
+def _inside(path: str, folder: str) -> bool:
+    prefix = folder if folder.endswith(os.sep) else folder + os.sep
+    return path != folder and path.startswith(prefix)
+
+
+def scan_tops(cur) -> List[str]:
+
+    # the outermost recorded scan roots; folder totals stop there, so the
+    # folders above a root get no row of their own
+    cur.execute("SELECT DISTINCT root FROM scan_history WHERE root IS NOT NULL")
+    roots = {path for (root,) in cur.fetchall() for path in root.split(os.pathsep) if path}
+
+    return [
+        root for root in roots
+        if not any(_inside(root, other) for other in roots)
+    ]
+
+
+def rollup_rows(paths: Iterable[str], tops: List[str]) -> Iterable[Tuple[str, str, int]]:
+
+    # (path, parent, depth) for every folder given and every folder above
+    # it up to its scan root, so folders holding only subfolders still get
+    # a total; folders under no recorded root go all the way up
+    rows = {}
+
+    for path in paths:
+        while path and path not in rows:
+            if any(_inside(top, path) for top in tops):
+                break
+
+            parent = split_path(path)[0]
+            rows[path] = (path, parent, path.count(os.sep))
+
+            if path in tops:
+                break
+            path = parent
+
+    return rows.values()
+
+
+def _build_rollup(cur, table: str, direct: str):
+
+    # every folder in directories (the parent of any indexed row) or with a
+    # folder row of its own, plus their ancestors up to the scan root;
+    # scans that wrote no folder rows and databases from before them get
+    # the same rows
+    cur.execute(f"DELETE FROM {table}")
+
+    cur.execute("""
+        SELECT path FROM directories
+        UNION
+        SELECT absolute_path FROM file_paths WHERE is_directory = 1
+    """)
+    paths = [path for (path,) in cur.fetchall()]
+    rows = rollup_rows(paths, scan_tops(cur))
+
+    # every folder starts with its own files
+    cur.execute(direct)
+    totals = {path: (size, count) for path, size, count in cur.fetchall()}
+
+    cur.executemany(f"""
+        INSERT INTO {table} (path, parent, depth, total_size, file_count)
+        VALUES (?, ?, ?, ?, ?)
+    """, (
+        (path, parent, depth, *totals.get(path, (0, 0)))
+        for path, parent, depth in rows
+    ))
+
+    # then each depth level is added to its parents from the deepest up:
+    # one pass over the folders
+    cur.execute(f"SELECT DISTINCT depth FROM {table} ORDER BY depth DESC")
+    depths = [row[0] for row in cur.fetchall()]
+
+    for depth in depths:
+        cur.execute(f"""
+            SELECT parent, SUM(total_size), SUM(file_count)
+            FROM {table}
+            WHERE depth = ?
+            AND parent != path
+            GROUP BY parent
+        """, (depth,))
+
+        cur.executemany(f"""
+            UPDATE {table}
+            SET total_size = total_size + ?, file_count = file_count + ?
+            WHERE path = ?
+        """, [(size, count, parent) for parent, size, count in cur.fetchall()])
+
+
+def rebuild_rollup(db):
+    with db.transaction() as cur:
+        fill_rollup(cur)
+
+
+def fill_rollup(cur):
+    # from stats_directory, which has to be current first
+    _build_rollup(
+        cur,
+        "dir_rollup",
+        "SELECT path, total_size, file_count FROM stats_directory"
+    )
+
+
+def add_folders(cur, paths: Iterable[str]):
+
+    # rows for folders new to the index, the way _build_rollup makes them
+    cur.executemany("""
+        INSERT OR IGNORE INTO dir_rollup (path, parent, depth, total_size, file_count)
+        VALUES (?, ?, ?, 0, 0)
+    """, rollup_rows(paths, scan_tops(cur)))
+
+
+def add_to_ancestors(cur, deltas: Dict[str, Tuple[int, int]]):
+
+    # {folder: (file_count, total_size)} applied to the folder and every
+    # folder above it, which add_folders has given rows
+    totals = defaultdict(lambda: [0, 0])
+
+    for directory, (count, size) in deltas.items():
+        path = directory
+        while path:
+            entry = totals[path]
+            entry[0] += count
+            entry[1] += size
+
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+
+    cur.executemany("""
+        UPDATE dir_rollup
+        SET file_count = file_count + ?, total_size = total_size + ?
+        WHERE path = ?
+    """, (
+        (count, size, path)
+        for path, (count, size) in totals.items()
+        if count or size
+    ))
+
+
+# -------------------------
+# CONSISTENCY CHECK
+# -------------------------
+
+def diff(db) -> Iterator[Tuple[str, str, object, object]]:
+
+    # (table, "missing" | "stale", key, (file_count, total_size)):
+    # missing rows should exist, stale rows hold wrong or leftover values
+    for table, fresh in FRESH_QUERIES.items():
+        stored = STORED_QUERIES[table]
+
+        for key, count, size in db.iterate(f"{fresh} EXCEPT {stored}"):
+            yield table, "missing", key, (count, size)
+
+        for key, count, size in db.iterate(f"{stored} EXCEPT {fresh}"):
+            yield table, "stale", key, (count, size)
+
+    # the rollup is rebuilt from files alone into a scratch table, which
+    # only the writer connection can see
+    with db.transaction() as cur:
+        cur.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS rollup_check (
+                path TEXT PRIMARY KEY,
+                parent TEXT,
+                depth INTEGER,
+                total_size INTEGER,
+                file_count INTEGER
+            )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS temp.idx_rollup_check_depth ON rollup_check(depth)")
+        _build_rollup(cur, "rollup_check", """
+            SELECT d.path AS path, g.total_size, g.file_count
+            FROM (
+                SELECT dir_id, IFNULL(SUM(size_bytes), 0) AS total_size,
+                       COUNT(*) AS file_count
+                FROM files
+                WHERE is_directory = 0
+                GROUP BY dir_id
+            ) g
+            JOIN directories d ON d.id = g.dir_id
+        """)
+
+        fresh = "SELECT path, file_count, total_size FROM rollup_check"
+        stored = "SELECT path, file_count, total_size FROM dir_rollup"
+
+        missing = cur.execute(f"{fresh} EXCEPT {stored}").fetchall()
+        stale = cur.execute(f"{stored} EXCEPT {fresh}").fetchall()
+
+        cur.execute("DELETE FROM rollup_check")
+
+    for key, count, size in missing:
+        yield "dir_rollup", "missing", key, (count, size)
+
+    for key, count, size in stale:
+        yield "dir_rollup", "stale", key, (count, size)
+
+
+def check(db, repair: bool = False) -> int:
+    problems = 0
+
+    for table, kind, key, values in diff(db):
+        problems += 1
+        print(f"{table}: {kind} {key!r} files={values[0]} size={values[1]}")
+
+    if problems and repair:
+        rebuild(db)
+        rebuild_rollup(db)
+        print(f"Rebuilt storage summaries ({problems} rows were off)")
+    elif not problems:
+        print("Storage summaries are consistent")
+
+    return problems
+
+
+if __name__ == "__main__":
+    # python -m core.storage_stats [--rebuild]
+    from core.database import get_database
+
+    sys.exit(1 if check(get_database(), repair="--rebuild" in sys.argv) else 0)
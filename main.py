@@ -2,22 +2,27 @@ import os
 os.environ["QT_LOGGING_RULES"] = "*.warning=false"
 
 import sys
-import time
 
-from PyQt6.QtWidgets import QApplication, QSplashScreen
-from PyQt6.QtGui import QPixmap
-from PyQt6.QtCore import Qt
+from core import startup
+startup.begin()
 
-from core.database import Database
-from modules.task_manager import TaskManager
-from ui.main_window import MainWindow
-from core.file_manager import FileManager
+with startup.phase("imports"):
+    from PyQt6.QtWidgets import QApplication, QSplashScreen
+    from PyQt6.QtGui import QPixmap
+    from PyQt6.QtCore import Qt
+
+    from core.database import get_database
+    from modules.task_manager import TaskManager
+    from ui.main_window import MainWindow
 
 
 def main():
-    app = QApplication(sys.argv)
-    with open("assets/theme.qss", "r") as f:
-        app.setStyleSheet(f.read())
+    with startup.phase("application"):
+        app = QApplication(sys.argv)
+
+    with startup.phase("theme"):
+        with open("assets/theme.qss", "r") as f:
+            app.setStyleSheet(f.read())
 
 
     # Splash screen
@@ -40,11 +45,10 @@ def main():
     )
     app.processEvents()
 
-    db = Database()
-    task_manager = TaskManager(db)
-
-
-    time.sleep(0.4)
+    # migrations are timed on their own inside
+    with startup.phase("database"):
+        db = get_database()
+        task_manager = TaskManager(db)
 
     splash.showMessage(
         "Loading dashboard...",
@@ -53,8 +57,9 @@ def main():
     )
     app.processEvents()
 
-    window = MainWindow(task_manager)
-    window.show()
+    with startup.phase("main window"):
+        window = MainWindow(task_manager)
+        window.show()
 
     splash.finish(window)
 
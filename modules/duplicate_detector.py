@@ -0,0 +1,225 @@
+import hashlib
+import mmap
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core import config
+from core.directories import split_path
+from core.hash_cache import HashCache
+
+
+# -------------------------
+# HASHING (module level so the process pool can pickle them)
+# -------------------------
+
+def _hash_file(f, size: int) -> str:
+    hash_sha256 = hashlib.sha256()
+
+    if size >= config.HASH_MMAP_THRESHOLD:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                for start in range(0, size, config.HASH_CHUNK_SIZE):
+                    hash_sha256.update(view[start:start + config.HASH_CHUNK_SIZE])
+            finally:
+                view.release()
+    else:
+        for chunk in iter(lambda: f.read(config.HASH_CHUNK_SIZE), b""):
+            hash_sha256.update(chunk)
+
+    return hash_sha256.hexdigest()
+
+
+def partial_hash(path: str) -> Tuple[str, Optional[str]]:
+    block = config.HASH_BLOCK_SIZE
+
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+
+            # small files are read whole, so this is already the full hash
+            if size <= 2 * block:
+                return path, _hash_file(f, size)
+
+            hash_sha256 = hashlib.sha256()
+            hash_sha256.update(f.read(block))
+            f.seek(-block, os.SEEK_END)
+            hash_sha256.update(f.read(block))
+
+            return path, "partial:" + hash_sha256.hexdigest()
+
+    except Exception:
+        return path, None
+
+
+def full_hash(path: str) -> Tuple[str, Optional[str]]:
+    try:
+        with open(path, "rb") as f:
+            return path, _hash_file(f, os.fstat(f.fileno()).st_size)
+    except Exception:
+        return path, None
+
+
+# -------------------------
+# PIPELINE
+# -------------------------
+
+def _hash_all(
+    func,
+    paths: List[str],
+    workers: Optional[int],
+    cache: Optional[HashCache] = None,
+    kind: str = "full"
+) -> Dict[str, str]:
+
+    digests = {}
+    stats = {}
+
+    if cache is not None:
+        misses = []
+
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            digest = cache.lookup(path, stat, kind)
+
+            if digest:
+                digests[path] = digest
+            else:
+                stats[path] = stat
+                misses.append(path)
+
+        paths = misses
+
+    if not paths:
+        return digests
+
+    if len(paths) < config.HASH_POOL_MIN_FILES:
+        results = list(map(func, paths))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(func, paths, chunksize=64))
+
+    for path, digest in results:
+        if not digest:
+            continue
+
+        digests[path] = digest
+
+        if cache is not None:
+            if kind == "full":
+                cache.store(path, stats[path], full=digest)
+            elif digest.startswith("partial:"):
+                cache.store(path, stats[path], partial=digest)
+            else:
+                cache.store(path, stats[path], partial=digest, full=digest)
+
+    return digests
+
+
+def _regroup(groups: Iterable[List[str]], digests: Dict[str, str]) -> List[List[str]]:
+    regrouped = []
+
+    for paths in groups:
+        by_digest = defaultdict(list)
+
+        for path in paths:
+            digest = digests.get(path)
+            if digest:
+                by_digest[digest].append(path)
+
+        regrouped.extend(g for g in by_digest.values() if len(g) > 1)
+
+    return regrouped
+
+
+def find_duplicate_groups(
+    candidates: Iterable[Tuple[str, int]],
+    workers: Optional[int] = None,
+    cache: Optional[HashCache] = None
+) -> Tuple[List[List[str]], Dict[str, str]]:
+
+    # stage 1: only files sharing a size can be duplicates
+    by_size = defaultdict(list)
+    for path, size in candidates:
+        if size and size >= config.DUPLICATE_MIN_SIZE:
+            by_size[size].append(path)
+
+    size_groups = [paths for paths in by_size.values() if len(paths) > 1]
+
+    # stage 2: head + tail blocks
+    partial = _hash_all(
+        partial_hash,
+        [path for paths in size_groups for path in paths],
+        workers,
+        cache,
+        "partial"
+    )
+    partial_groups = _regroup(size_groups, partial)
+
+    # stage 3: full content, only for files whose partial hash was not
+    # already computed over the whole file
+    hashes = {}
+    to_hash = []
+
+    for paths in partial_groups:
+        for path in paths:
+            if partial[path].startswith("partial:"):
+                to_hash.append(path)
+            else:
+                hashes[path] = partial[path]
+
+    hashes.update(_hash_all(full_hash, to_hash, workers, cache, "full"))
+
+    groups = _regroup(partial_groups, hashes)
+    hashes = {path: hashes[path] for paths in groups for path in paths}
+
+    return groups, hashes
+
+
+class DuplicateDetector:
+    def __init__(self, db, workers: Optional[int] = None):
+        self.db = db
+        self.workers = workers or config.HASH_WORKERS
+        self.cache = HashCache(db)
+
+    def _size_candidates(self) -> List[Tuple[str, int]]:
+        return self.db.fetchall("""
+            SELECT absolute_path, size_bytes
+            FROM file_paths
+            WHERE is_directory = 0
+            AND size_bytes >= ?
+            AND size_bytes IN (
+                SELECT size_bytes
+                FROM files
+                WHERE is_directory = 0
+                AND size_bytes >= ?
+                GROUP BY size_bytes
+                HAVING COUNT(*) > 1
+            )
+        """, (config.DUPLICATE_MIN_SIZE, config.DUPLICATE_MIN_SIZE))
+
+    def run(self) -> List[List[str]]:
+        groups, hashes = find_duplicate_groups(
+            self._size_candidates(),
+            self.workers,
+            self.cache
+        )
+
+        # after the lookups, so renamed files have been re-pointed first
+        self.cache.evict_missing()
+
+        with self.db.bulk_writer("""
+            UPDATE files SET hash = ?
+            WHERE dir_id = (SELECT id FROM directories WHERE path = ?)
+            AND name = ?
+        """) as writer:
+            for path, digest in hashes.items():
+                writer.add((digest, *split_path(path)))
+
+        return groups
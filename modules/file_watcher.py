@@ -0,0 +1,465 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from stat import S_ISDIR, S_ISREG
+from typing import Callable, Iterable, Optional
+
+from core import config
+from core.drive_indexer import build_file_record, build_dir_record
+from core.path_rules import scan_exclusions
+
+
+# -------------------------
+# INOTIFY (Linux only, through libc)
+# -------------------------
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_CREATE | IN_DELETE | IN_MOVED_FROM
+    | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+
+_EVENT = struct.Struct("iIII")
+
+
+class Inotify:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+
+        self._add_watch = libc.inotify_add_watch
+        self._rm_watch = libc.inotify_rm_watch
+
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.paths = {}
+        self.wds = {}
+
+    def add_watch(self, path: str) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()), path)
+
+        self.paths[wd] = path
+        self.wds[path] = wd
+        return wd
+
+    def remove_watch(self, path: str):
+        wd = self.wds.pop(path, None)
+        if wd is None:
+            return
+
+        self.paths.pop(wd, None)
+        self._rm_watch(self.fd, wd)
+
+    def forget_wd(self, wd: int):
+        path = self.paths.pop(wd, None)
+        if path is not None and self.wds.get(path) == wd:
+            del self.wds[path]
+
+    def read_events(self, timeout: float):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            yield wd, mask, name
+
+    def close(self):
+        os.close(self.fd)
+
+    @staticmethod
+    def kernel_watch_limit() -> Optional[int]:
+        try:
+            with open("/proc/sys/fs/inotify/max_user_watches") as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+
+# -------------------------
+# WATCHER
+# -------------------------
+
+class FileWatcher:
+    def __init__(
+        self,
+        file_manager,
+        roots: Iterable[str],
+        on_change: Optional[Callable[[int], None]] = None
+    ):
+        self.file_manager = file_manager
+        self.roots = list(roots)
+        self.on_change = on_change
+        self.exclusions = scan_exclusions()
+
+        self.max_watches = config.WATCHER_MAX_WATCHES
+        limit = Inotify.kernel_watch_limit()
+        if limit:
+            # leave room for every other program watching files
+            self.max_watches = min(self.max_watches, limit // 2)
+
+        self.inotify = None
+        self.watched = set()
+        self.polled = set()
+
+        # folder mtimes, compared by the polling fallback
+        self.dir_mtimes = {}
+
+        self._pending_paths = set()
+        self._pending_dirs = set()
+        self._first_event = None
+        self._last_event = None
+        self._next_poll = 0.0
+
+        # polled folders still to check in the current pass
+        self._poll_queue = []
+
+        self._running = False
+        self._thread = None
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+
+    def start(self):
+        if self._running:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+        if self._thread is not None:
+            # no timeout: the loop sees _running within half a second, and
+            # the final _apply must finish before anything else writes
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        if sys.platform.startswith("linux"):
+            try:
+                self.inotify = Inotify()
+            except (OSError, AttributeError) as e:
+                print("Watcher: inotify unavailable, polling instead:", e)
+
+        self._load_dirs()
+
+        # catch whatever changed while nothing was watching; polled folders
+        # are caught up by their first polling pass
+        self._check_dirs([path for path in self.dir_mtimes if path not in self.polled])
+
+        try:
+            while self._running:
+                self._read_events()
+
+                now = time.monotonic()
+
+                if self.polled and now >= self._next_poll:
+                    self._poll()
+                    self._next_poll = now + 1
+
+                if self._due(now):
+                    self._apply()
+
+            if self._pending_paths or self._pending_dirs:
+                self._apply()
+
+        finally:
+            if self.inotify is not None:
+                self.inotify.close()
+                self.inotify = None
+
+    # -------------------------
+    # WATCHES
+    # -------------------------
+
+    def _load_dirs(self):
+        mtimes, _ = self.file_manager.get_directory_index()
+
+        dirs = [path for path in mtimes if self._under_roots(path)]
+
+        # indexed without folder rows, find them on disk instead
+        if not dirs:
+            for root in self.roots:
+                for root_dir, subdirs, _ in os.walk(root):
+                    if not self._running:
+                        return
+
+                    subdirs[:] = [
+                        d for d in subdirs
+                        if not self.exclusions.matches(os.path.join(root_dir, d), d)
+                    ]
+                    dirs.append(root_dir)
+
+        for path in dirs:
+            if not self._running:
+                return
+
+            self.dir_mtimes[path] = mtimes.get(path)
+            self._watch(path)
+
+        if self.polled:
+            print(
+                f"Watcher: {len(self.watched)} folders watched, "
+                f"{len(self.polled)} polled every {config.WATCHER_POLL_INTERVAL}s"
+            )
+
+    def _watch(self, path: str):
+        if self.inotify is None or len(self.watched) >= self.max_watches:
+            self.polled.add(path)
+            return
+
+        try:
+            self.inotify.add_watch(path)
+            self.watched.add(path)
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                # kernel limit reached: everything from here on is polled
+                self.max_watches = len(self.watched)
+            self.polled.add(path)
+
+    def _forget(self, path: str):
+        prefix = path if path.endswith(os.sep) else path + os.sep
+
+        for known in [p for p in self.dir_mtimes if p == path or p.startswith(prefix)]:
+            self.dir_mtimes.pop(known, None)
+            self.polled.discard(known)
+
+            if known in self.watched:
+                self.watched.discard(known)
+                self.inotify.remove_watch(known)
+
+    def _under_roots(self, path: str) -> bool:
+        for root in self.roots:
+            prefix = root if root.endswith(os.sep) else root + os.sep
+            if path == root or path.startswith(prefix):
+                return True
+        return False
+
+    # -------------------------
+    # EVENTS
+    # -------------------------
+
+    def _read_events(self):
+        if self.inotify is None:
+            time.sleep(0.5)
+            return
+
+        for wd, mask, name in self.inotify.read_events(0.5):
+
+            if mask & IN_Q_OVERFLOW:
+                # events were dropped, fall back to comparing folder mtimes
+                self._check_dirs(list(self.dir_mtimes))
+                continue
+
+            directory = self.inotify.paths.get(wd)
+
+            if mask & IN_IGNORED:
+                self.inotify.forget_wd(wd)
+                continue
+
+            if directory is None:
+                continue
+
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                self._mark(directory)
+                continue
+
+            if not name:
+                continue
+
+            self._mark(os.path.join(directory, name))
+
+            # the folder row carries its mtime for incremental rescans
+            self._mark(directory)
+
+    def _poll(self):
+
+        # a slice every second, sized to check every polled folder once per
+        # WATCHER_POLL_INTERVAL, up to WATCHER_POLL_RATE
+        if not self._poll_queue:
+            self._poll_queue = list(self.polled)
+
+        count = min(
+            config.WATCHER_POLL_RATE,
+            -(-len(self.polled) // config.WATCHER_POLL_INTERVAL)
+        )
+        batch = self._poll_queue[-count:]
+        del self._poll_queue[-count:]
+
+        # forgotten since the pass started
+        self._check_dirs([path for path in batch if path in self.polled])
+
+    def _check_dirs(self, dirs):
+        for path in dirs:
+            if not self._running:
+                return
+
+            if path in self._pending_dirs:
+                continue
+
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self._mark(path)
+                continue
+
+            if self.dir_mtimes.get(path) != int(stat.st_mtime):
+                self._mark(path, relist=True)
+
+    def _mark(self, path: str, relist: bool = False):
+        if relist:
+            self._pending_dirs.add(path)
+        else:
+            self._pending_paths.add(path)
+
+        now = time.monotonic()
+        self._last_event = now
+        if self._first_event is None:
+            self._first_event = now
+
+    def _due(self, now: float) -> bool:
+        if self._first_event is None:
+            return False
+
+        # coalesce a burst, but never hold changes back for too long
+        return (
+            now - self._last_event >= config.WATCHER_DEBOUNCE
+            or now - self._first_event >= config.WATCHER_MAX_LATENCY
+        )
+
+    # -------------------------
+    # APPLY
+    # -------------------------
+
+    def _apply(self):
+        paths = self._pending_paths
+        dirs = self._pending_dirs
+        self._pending_paths = set()
+        self._pending_dirs = set()
+        self._first_event = None
+        self._last_event = None
+
+        deleted = set()
+
+        # polled folders: diff the listing against the rows we have
+        for directory in dirs:
+            paths.add(directory)
+
+            try:
+                with os.scandir(directory) as entries:
+                    present = {entry.path for entry in entries}
+            except OSError:
+                continue
+
+            known = self.file_manager.get_children_paths(directory)
+            # known subfolders keep their own rows, new ones are walked
+            paths.update(present - known)
+            paths.update(
+                path for path in present & known
+                if path not in self.dir_mtimes
+            )
+            deleted.update(known - present)
+
+        writer = self.file_manager.bulk_writer()
+
+        for path in paths:
+            if path in deleted:
+                continue
+
+            try:
+                info = os.stat(path, follow_symlinks=False)
+            except OSError:
+                deleted.add(path)
+                continue
+
+            if S_ISDIR(info.st_mode):
+                if self.exclusions.matches(path, os.path.basename(path)):
+                    continue
+
+                if path in self.dir_mtimes:
+                    self._record_dir(path, info, writer)
+                else:
+                    self._index_tree(path, writer)
+
+            elif S_ISREG(info.st_mode):
+                parent = os.path.dirname(path)
+                writer.add(build_file_record(path, os.path.basename(path), info, parent))
+
+        writer.close()
+
+        for path in deleted:
+            if path in self.dir_mtimes:
+                self._forget(path)
+
+        removed = self.file_manager.delete_paths(deleted)
+
+        changed = writer.inserted + writer.updated + removed
+        if changed and self.on_change is not None:
+            self.on_change(changed)
+
+    def _record_dir(self, path: str, stat, writer):
+        record = build_dir_record(path, stat)
+        self.dir_mtimes[path] = record["modified_at"]
+        writer.add(record)
+
+    def _index_tree(self, path: str, writer):
+
+        # a folder created or moved in: index and watch all of it
+        for root_dir, subdirs, files in os.walk(path):
+            if not self._running:
+                return
+
+            subdirs[:] = [
+                d for d in subdirs
+                if not self.exclusions.matches(os.path.join(root_dir, d), d)
+            ]
+
+            try:
+                self._record_dir(root_dir, os.stat(root_dir), writer)
+            except OSError:
+                continue
+
+            self._watch(root_dir)
+
+            for file in files:
+                full_path = os.path.join(root_dir, file)
+                try:
+                    info = os.stat(full_path, follow_symlinks=False)
+                except OSError:
+                    continue
+                if S_ISREG(info.st_mode):
+                    writer.add(build_file_record(full_path, file, info, root_dir))
@@ -60,27 +60,41 @@ class TaskManager:
     # READ
     # -------------------------
 
+    # nearest due date first, tasks without one last
+    TASK_COLUMNS = "id, title, due_date, completed, created_at, completed_at"
+    TASK_ORDER = "ORDER BY due_date IS NULL, due_date, id"
+
     def get_all_tasks(self, include_completed: bool = True) -> List[Dict]:
 
         if include_completed:
             rows = self.db.fetchall(
-                "SELECT id, title, due_date, completed FROM tasks"
+                f"SELECT {self.TASK_COLUMNS} FROM tasks {self.TASK_ORDER}"
             )
         else:
             rows = self.db.fetchall(
-                "SELECT id, title, due_date, completed FROM tasks WHERE completed = 0"
+                f"SELECT {self.TASK_COLUMNS} FROM tasks WHERE completed = 0 {self.TASK_ORDER}"
             )
 
-        tasks = []
-        for row in rows:
-            tasks.append({
-                "id": row[0],
-                "title": row[1],
-                "due_date": row[2],
-                "completed": row[3]
-            })
+        return [self._task(row) for row in rows]
+
+    def get_task(self, task_id: int) -> Optional[Dict]:
+
+        rows = self.db.fetchall(
+            f"SELECT {self.TASK_COLUMNS} FROM tasks WHERE id = ?",
+            (task_id,)
+        )
+
+        return self._task(rows[0]) if rows else None
 
-        return tasks
+    def _task(self, row) -> Dict:
+        return {
+            "id": row[0],
+            "title": row[1],
+            "due_date": row[2],
+            "completed": row[3],
+            "created_at": row[4],
+            "completed_at": row[5]
+        }
 
     # -------------------------
     # COMPLETE
@@ -100,6 +114,18 @@ class TaskManager:
             (completed_at, task_id),
         )
 
+    def mark_incomplete(self, task_id: int):
+
+        self.db.execute(
+            """
+            UPDATE tasks
+            SET completed = 0,
+                completed_at = NULL
+            WHERE id = ?
+            """,
+            (task_id,),
+        )
+
     # -------------------------
     # UPDATE
     # -------------------------
@@ -167,4 +193,12 @@ class TaskManager:
         self.db.execute(
             "DELETE FROM tasks WHERE id = ?",
             (task_id,)
-        )
\ No newline at end of file
+        )
+
+    def delete_tasks(self, task_ids: List[int]):
+
+        # one transaction for the whole selection
+        self.db.executemany(
+            "DELETE FROM tasks WHERE id = ?",
+            [(task_id,) for task_id in task_ids]
+        )
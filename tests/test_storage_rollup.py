@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from core import storage_stats
+from core.database import Database
+from core.file_manager import FileManager
+
+
+# python -m unittest discover -s tests -t .
+
+class RollupScanRootTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="aegis-test-")
+
+        # a root a few folders down, files only in its subfolders
+        self.outer = os.path.join(self.workdir, "outer")
+        self.root = os.path.join(self.outer, "root")
+        for folder, size in (("a/b", 300), ("a/c", 200), ("d", 100)):
+            os.makedirs(os.path.join(self.root, folder))
+            with open(os.path.join(self.root, folder, "file.bin"), "wb") as f:
+                f.write(b"x" * size)
+
+        with open(os.path.join(self.outer, "beside.bin"), "wb") as f:
+            f.write(b"x" * 50)
+
+        self.db = Database(Path(self.workdir) / "test.db")
+        self.file_manager = FileManager(self.db)
+
+    def tearDown(self):
+        self.db.reader.close()
+        self.db.conn.close()
+        shutil.rmtree(self.workdir)
+
+    def scan(self, root):
+        writer = self.file_manager.bulk_writer()
+        for _ in self.file_manager.indexer.iter_drive(root, writer):
+            pass
+
+    def rollup_paths(self):
+        return {path for (path,) in self.db.fetchall("SELECT path FROM dir_rollup")}
+
+    def test_no_rows_above_the_scan_root(self):
+        self.scan(self.root)
+
+        prefix = self.root + os.sep
+        above = [
+            path for path in self.rollup_paths()
+            if path != self.root and not path.startswith(prefix)
+        ]
+        self.assertEqual(above, [])
+
+        # the root leads every folder list
+        top_path, top_size, top_files = self.file_manager.get_heaviest_subtrees(1)[0]
+        self.assertEqual((top_path, top_size, top_files), (self.root, 600, 3))
+        self.assertEqual(self.file_manager.get_top_folders()[0], (self.root, 600))
+
+        rows, _ = self.file_manager.get_folders_page()
+        self.assertEqual(rows[0][2], self.root)
+
+        self.assertEqual(list(storage_stats.diff(self.db)), [])
+
+    def test_outer_root_moves_where_totals_stop(self):
+        self.scan(self.root)
+        self.scan(self.outer)
+
+        paths = self.rollup_paths()
+        self.assertIn(self.outer, paths)
+        self.assertNotIn(self.workdir, paths)
+
+        top_path, top_size, _ = self.file_manager.get_heaviest_subtrees(1)[0]
+        self.assertEqual((top_path, top_size), (self.outer, 650))
+
+        self.assertEqual(list(storage_stats.diff(self.db)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,13 +4,63 @@ from PyQt6.QtWidgets import (
     QLabel,
     QPushButton,
     QComboBox,
+    QCheckBox,
     QProgressBar,
     QTabWidget,
-    QTextEdit
+    QTextEdit,
+    QLineEdit
 )
 
-from PyQt6.QtCore import QThread
-from ui.scan_worker import ScanWorker
+from PyQt6.QtCore import QThread, QTimer
+from core import config
+from modules.file_watcher import FileWatcher
+from ui.query_runner import QueryRunner
+from ui.scan_worker import ScanWorker, DuplicateWorker, WatcherSignals
+from ui.table_models import (
+    cleanup_model,
+    duplicate_groups_model,
+    folders_model,
+    largest_files_model,
+    result_table
+)
+
+
+SIZE_UNITS = {"b": 1, "kb": 1024, "mb": 1024**2, "gb": 1024**3, "tb": 1024**4}
+
+
+def parse_size(value):
+    value = value.strip().lower()
+    for unit in sorted(SIZE_UNITS, key=len, reverse=True):
+        if value.endswith(unit):
+            return int(float(value[:-len(unit)]) * SIZE_UNITS[unit])
+    return int(float(value))
+
+
+def parse_search(text):
+
+    # "report ext:pdf min:1MB max:2GB name:" -> FileManager.search arguments
+    words = []
+    filters = {}
+
+    for token in text.split():
+        key, _, value = token.partition(":")
+        key = key.lower()
+
+        try:
+            if key == "ext" and value:
+                filters["extension"] = value
+            elif key == "min" and value:
+                filters["min_size"] = parse_size(value)
+            elif key == "max" and value:
+                filters["max_size"] = parse_size(value)
+            elif key == "name" and not value:
+                filters["names_only"] = True
+            else:
+                words.append(token)
+        except ValueError:
+            words.append(token)
+
+    return " ".join(words), filters
 
 
 class FilesView(QWidget):
@@ -21,6 +71,14 @@ class FilesView(QWidget):
         self.storage_dashboard = storage_dashboard
         self.scan_thread = None
         self.worker = None
+        self.duplicate_thread = None
+        self.duplicate_worker = None
+        self.scan_summary = ""
+        self.scanned_drives = []
+
+        self.watcher = None
+        self.watcher_signals = WatcherSignals()
+        self.watcher_signals.changed.connect(self.index_changed)
 
         self.main_layout = QVBoxLayout()
         self.setLayout(self.main_layout)
@@ -34,10 +92,32 @@ class FilesView(QWidget):
         self.drive_selector.addItem("All Drives")
         self.main_layout.addWidget(self.drive_selector)
 
+        self.worker_selector = QComboBox()
+        for label, workers in config.SCAN_WORKER_PRESETS.items():
+            self.worker_selector.addItem(label, workers)
+        self.main_layout.addWidget(self.worker_selector)
+
+        self.incremental_checkbox = QCheckBox("Incremental rescan (skip unchanged folders)")
+        self.main_layout.addWidget(self.incremental_checkbox)
+
         self.scan_button = QPushButton("Scan")
         self.scan_button.clicked.connect(self.run_scan)
         self.main_layout.addWidget(self.scan_button)
 
+        self.resume_button = QPushButton("Resume Last Scan")
+        self.resume_button.clicked.connect(self.resume_scan)
+        self.resume_button.setEnabled(self.file_manager.has_checkpoint())
+        self.main_layout.addWidget(self.resume_button)
+
+        self.stop_button = QPushButton("Stop Scan")
+        self.stop_button.clicked.connect(self.stop_scan)
+        self.stop_button.setEnabled(False)
+        self.main_layout.addWidget(self.stop_button)
+
+        self.duplicate_button = QPushButton("Find Duplicates")
+        self.duplicate_button.clicked.connect(self.run_duplicate_scan)
+        self.main_layout.addWidget(self.duplicate_button)
+
         self.progress_bar = QProgressBar()
         self.main_layout.addWidget(self.progress_bar)
 
@@ -46,46 +126,114 @@ class FilesView(QWidget):
         self.main_layout.addWidget(self.tabs)
 
         # Create tab content
-        self.overview_tab = QTextEdit()
-        self.folder_tab = QTextEdit()
-        self.duplicate_tab = QTextEdit()
         self.steam_tab = QTextEdit()
-        self.cleanup_tab = QTextEdit()
+        self.search_results = QTextEdit()
 
         for tab in [
-            self.overview_tab,
-            self.folder_tab,
-            self.duplicate_tab,
             self.steam_tab,
-            self.cleanup_tab,
+            self.search_results,
         ]:
             tab.setReadOnly(True)
 
+        # result lists are tables paged in from SQL as they scroll
+        self.largest_model = largest_files_model(self.file_manager, self)
+        self.folder_model = folders_model(self.file_manager, self)
+        self.duplicate_model = duplicate_groups_model(self.file_manager, self)
+        self.cleanup_model = cleanup_model(self.file_manager, self)
+
+        self.overview_label = QLabel("Loading...")
+
+        self.overview_tab = QWidget()
+        overview_layout = QVBoxLayout()
+        overview_layout.addWidget(self.overview_label)
+        overview_layout.addWidget(QLabel("Largest Files:"))
+        overview_layout.addWidget(result_table(self.largest_model))
+        self.overview_tab.setLayout(overview_layout)
+
+        self.folder_tab = result_table(self.folder_model)
+        self.duplicate_tab = result_table(self.duplicate_model)
+        self.cleanup_tab = result_table(self.cleanup_model)
+
+        # search as you type, once typing pauses
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search files, e.g. report ext:pdf min:1MB max:2GB")
+        self.search_box.textChanged.connect(self.schedule_search)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(config.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.run_search)
+
+        self.search_tab = QWidget()
+        search_layout = QVBoxLayout()
+        search_layout.addWidget(self.search_box)
+        search_layout.addWidget(self.search_results)
+        self.search_tab.setLayout(search_layout)
+
         self.tabs.addTab(self.overview_tab, "Overview")
         self.tabs.addTab(self.folder_tab, "Folders")
         self.tabs.addTab(self.duplicate_tab, "Duplicates")
         self.tabs.addTab(self.steam_tab, "Steam")
         self.tabs.addTab(self.cleanup_tab, "Cleanup")
+        self.tabs.addTab(self.search_tab, "Search")
+
+        # tab contents are queried on a thread pool and shown on arrival
+        self.queries = QueryRunner(self.file_manager.db, self)
+        self.queries.loaded.connect(self.show_result)
+        self.queries.failed.connect(self.show_error)
+
+        # where each background load lands: (widget, render)
+        self.results = {
+            "overview": (self.overview_label, self.show_overview),
+            "steam": (self.steam_tab, self.show_steam),
+            "search": (self.search_results, self.show_search)
+        }
 
         self.load_dashboard()
 
+        self.start_watcher(self.file_manager.get_scanned_roots())
+
     # -------------------------
     # SCANNING
     # -------------------------
 
     def run_scan(self):
+        option = self.drive_selector.currentText()
+        drives = ["C:\\"] if option == "C Drive Only" else self.file_manager.get_available_drives()
+
+        self.start_scan(drives)
+
+    def resume_scan(self):
+        checkpoint = self.file_manager.load_checkpoint()
+        if not checkpoint:
+            self.resume_button.setEnabled(False)
+            return
+
+        self.start_scan(checkpoint["drives"], resume=True)
+
+    def start_scan(self, drives, resume=False):
         self.scan_button.setEnabled(False)
+        self.resume_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
         self.progress_bar.setValue(0)
 
-        option = self.drive_selector.currentText()
-        drives = ["C:\\"] if option == "C Drive Only" else self.file_manager.get_available_drives()
+        # the scan rewrites what the watcher would, pause it meanwhile
+        self.stop_watcher()
+        self.scanned_drives = drives
 
         self.scan_thread = QThread()
-        self.worker = ScanWorker(self.file_manager, drives)
+        self.worker = ScanWorker(
+            self.file_manager,
+            drives,
+            workers=self.worker_selector.currentData(),
+            incremental=self.incremental_checkbox.isChecked(),
+            resume=resume
+        )
         self.worker.moveToThread(self.scan_thread)
 
         self.scan_thread.started.connect(self.worker.run)
         self.worker.progress.connect(self.update_progress)
+        self.worker.status.connect(self.update_status)
         self.worker.finished.connect(self.scan_finished)
 
         self.worker.finished.connect(self.scan_thread.quit)
@@ -94,92 +242,190 @@ class FilesView(QWidget):
 
         self.scan_thread.start()
 
+    def stop_scan(self):
+        if self.worker is not None:
+            self.stop_button.setEnabled(False)
+            self.worker.stop()
+
     def update_progress(self, count):
         self.progress_bar.setFormat(f"Indexed {count} files")
         self.progress_bar.setValue(0)
 
+    def update_status(self, message):
+        self.scan_summary = message
+        self.progress_bar.setFormat(message)
+
     def scan_finished(self, total_files):
+        self.worker = None
         self.scan_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+        self.resume_button.setEnabled(self.file_manager.has_checkpoint())
         self.progress_bar.setValue(100)
-        self.progress_bar.setFormat("Scan Complete")
+        self.progress_bar.setFormat(f"Scan Complete | {self.scan_summary}")
         if self.storage_dashboard:
-            self.storage_dashboard.update()
+            self.storage_dashboard.refresh_dashboard()
 
         self.load_dashboard()
 
+        self.start_watcher(self.scanned_drives)
+
     # -------------------------
-    # DASHBOARD LOAD
+    # LIVE UPDATES
     # -------------------------
 
-    def load_dashboard(self):
-        self.load_overview()
-        self.load_folders()
-        self.load_duplicates()
-        self.load_steam()
-        self.load_cleanup()
+    def start_watcher(self, roots):
+        if not config.WATCHER_ENABLED or not roots:
+            return
+
+        self.stop_watcher()
+
+        self.watcher = FileWatcher(
+            self.file_manager,
+            roots,
+            on_change=self.watcher_signals.changed.emit
+        )
+        self.watcher.start()
+
+    def stop_watcher(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    def index_changed(self, changes):
+        self.progress_bar.setFormat(f"Index updated ({changes} changes)")
+
+        if self.storage_dashboard:
+            self.storage_dashboard.refresh_dashboard()
+
+        self.load_dashboard()
+
+    def run_duplicate_scan(self):
+        self.duplicate_button.setEnabled(False)
+
+        self.duplicate_thread = QThread()
+        self.duplicate_worker = DuplicateWorker(self.file_manager)
+        self.duplicate_worker.moveToThread(self.duplicate_thread)
+
+        self.duplicate_thread.started.connect(self.duplicate_worker.run)
+        self.duplicate_worker.status.connect(self.update_status)
+        self.duplicate_worker.finished.connect(self.duplicate_scan_finished)
+
+        self.duplicate_worker.finished.connect(self.duplicate_thread.quit)
+        self.duplicate_worker.finished.connect(self.duplicate_worker.deleteLater)
+        self.duplicate_thread.finished.connect(self.duplicate_thread.deleteLater)
+
+        self.duplicate_thread.start()
+
+    def duplicate_scan_finished(self, groups):
+        self.duplicate_button.setEnabled(True)
+        self.duplicate_model.refresh()
 
     # -------------------------
-    # TAB LOADERS
+    # SEARCH
+    # -------------------------
+
+    def schedule_search(self):
+        self.search_timer.start()
+
+    def run_search(self):
+        text, filters = parse_search(self.search_box.text())
+
+        # "ext:pdf" or "min:1GB" alone lists what matches them; "name:"
+        # only says where the words are looked for
+        if not text and not filters.keys() - {"names_only"}:
+            self.queries.cancel("search")
+            self.search_results.clear()
+            return
+
+        # each keystroke's search replaces the one still running
+        self.search_results.setPlainText("Searching...")
+        self.queries.submit(
+            "search",
+            self.file_manager.search,
+            text,
+            config.SEARCH_RESULT_LIMIT,
+            **filters
+        )
+
+    def show_search(self, results):
+        self.search_results.clear()
+
+        if not results:
+            self.search_results.append("No matching files.")
+            return
+
+        for path, size, is_directory in results:
+            if is_directory:
+                self.search_results.append(f"[folder] — {path}")
+            else:
+                size_mb = round((size or 0) / (1024**2), 2)
+                self.search_results.append(f"{size_mb} MB — {path}")
+
+    # -------------------------
+    # DASHBOARD LOAD
     # -------------------------
 
-    def load_overview(self):
-        self.overview_tab.clear()
+    def load_dashboard(self):
+        self.load("overview", self.fetch_overview)
+        self.load("steam", self.file_manager.get_game_library_usage)
+
+        for model in [
+            self.largest_model,
+            self.folder_model,
+            self.duplicate_model,
+            self.cleanup_model
+        ]:
+            model.refresh()
 
-        total_files = self.file_manager.get_indexed_file_count()
-        total_storage = self.file_manager.get_total_storage_used()
+    def load(self, key, fetch, *args):
 
-        self.overview_tab.append(f"Total Files Indexed: {total_files}")
-        self.overview_tab.append(f"Total Storage Indexed: {round(total_storage / (1024**3), 2)} GB\n")
+        # a refresh keeps the old contents up until the new ones land,
+        # a tab with nothing to show yet says so
+        widget, _ = self.results[key]
+        if isinstance(widget, QTextEdit) and widget.document().isEmpty():
+            widget.setPlainText("Loading...")
 
-        self.overview_tab.append("Top 5 Largest Files:\n")
-        for path, size in self.file_manager.get_largest_files(5):
-            size_gb = round(size / (1024**3), 2)
-            self.overview_tab.append(f"{size_gb} GB — {path}")
+        self.queries.submit(key, fetch, *args)
 
-    def load_folders(self):
-        self.folder_tab.clear()
+    def show_result(self, key, data):
+        _, render = self.results[key]
+        render(data)
 
-        folders = self.file_manager.get_storage_by_folder(10)
-        self.folder_tab.append("Top 10 Largest Folders:\n")
+    def show_error(self, key, message):
+        widget, _ = self.results[key]
+        if isinstance(widget, QTextEdit):
+            widget.setPlainText(f"Could not load: {message}")
+        else:
+            widget.setText(f"Could not load: {message}")
 
-        for folder, size in folders:
-            size_gb = round(size / (1024**3), 2)
-            self.folder_tab.append(f"{size_gb} GB — {folder}")
+    # -------------------------
+    # TAB LOADERS
+    # -------------------------
 
-    def load_duplicates(self):
-        self.duplicate_tab.clear()
+    # fetch_* run on a pool thread and only touch the database,
+    # show_* render the result on the GUI thread
 
-        duplicates = self.file_manager.get_duplicate_files()
+    def fetch_overview(self):
+        return (
+            self.file_manager.get_indexed_file_count(),
+            self.file_manager.get_total_storage_used()
+        )
 
-        if duplicates:
-            self.duplicate_tab.append("Duplicate Files:\n")
-            for path, size, h in duplicates[:20]:
-                size_mb = round(size / (1024**2), 2)
-                self.duplicate_tab.append(f"{size_mb} MB — {path}")
-        else:
-            self.duplicate_tab.append("No duplicates found.")
+    def show_overview(self, data):
+        total_files, total_storage = data
 
-    def load_steam(self):
-        self.steam_tab.clear()
+        self.overview_label.setText(
+            f"Total Files Indexed: {total_files}\n"
+            f"Total Storage Indexed: {round(total_storage / (1024**3), 2)} GB"
+        )
 
-        games = self.file_manager.get_steam_games_usage()
+    def show_steam(self, games):
+        self.steam_tab.clear()
 
         if games:
             self.steam_tab.append("Steam / Game Storage:\n")
-            for game, size in games:
+            for launcher, name, app_root, size, files in games:
                 size_gb = round(size / (1024**3), 2)
-                self.steam_tab.append(f"{size_gb} GB — {game}")
+                self.steam_tab.append(f"{size_gb} GB — {launcher}: {name} ({app_root})")
         else:
             self.steam_tab.append("No Steam installations detected.")
-
-    def load_cleanup(self):
-        self.cleanup_tab.clear()
-
-        suggestions = self.file_manager.get_cleanup_suggestions()
-
-        if suggestions:
-            self.cleanup_tab.append("Cleanup Suggestions:\n")
-            for suggestion in suggestions:
-                self.cleanup_tab.append(suggestion)
-        else:
-            self.cleanup_tab.append("No cleanup suggestions available.")
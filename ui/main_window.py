@@ -5,7 +5,9 @@ from PyQt6.QtWidgets import (
     QStackedWidget,
     QStatusBar
 )
+from PyQt6.QtCore import QTimer
 
+from core import config, startup
 from core.analytics import AnalyticsEngine
 from ui.sidebar import Sidebar
 from ui.dashboard_view import DashboardView
@@ -20,10 +22,26 @@ class MainWindow(QMainWindow):
     def __init__(self, task_manager):
         super().__init__()
         self.task_manager = task_manager
-        self.file_manager = FileManager()
-        self.dashboard = StorageDashboard(self.file_manager)
+
+        # one of each, shared by every page that needs it
+        self.file_manager = FileManager(task_manager.db)
         self.analytics = AnalyticsEngine(self.task_manager)
-        self.storage_dashboard = StorageDashboard(self.file_manager)
+
+        # sidebar order: name -> (builds the page, preload after first paint);
+        # nothing is built until it is shown, needed by another page or
+        # preloaded, so opening the window costs the first page only
+        self.pages = {
+            "Dashboard": (self._create_dashboard, False),
+            "Tasks": (self._create_tasks, True),
+            "File Organizer": (self._create_files, True),
+            "Storage": (self._create_storage, True),
+            "Analytics": (self._create_analytics, False),
+            "Settings": (SettingsView, False)
+        }
+        self.created = {}
+        self.preload = None
+        self.painted = False
+
         self.setWindowTitle("Aegis")
         self.resize(1200, 800)
 
@@ -40,49 +58,90 @@ class MainWindow(QMainWindow):
         central_widget.setLayout(main_layout)
 
         # Sidebar
-        self.sidebar = Sidebar()
+        self.sidebar = Sidebar(list(self.pages))
         main_layout.addWidget(self.sidebar)
 
         # Page Stack
         self.stack = QStackedWidget()
         main_layout.addWidget(self.stack)
 
-        # Pages
-        self.dashboard_view = DashboardView(self.task_manager, self.analytics)
-        self.tasks_view = TasksView(self.task_manager)
-        self.storage_dashboard = StorageDashboard(self.file_manager)
-        self.analytics_view = AnalyticsView(self.analytics)
-        self.settings_view = SettingsView()
+        # Status Bar
+        self.status = QStatusBar()
+        self.setStatusBar(self.status)
+        self.status.showMessage("Ready")
+
+        # Connect sidebar
+        self.sidebar.page_changed.connect(self.switch_page)
+        self.switch_page(self.sidebar.current_index)
+
+    # -------------------------
+    # PAGES
+    # -------------------------
+
+    def page(self, name):
+        page = self.created.get(name)
+
+        if page is None:
+            create, _ = self.pages[name]
+            with startup.phase(f"page: {name}"):
+                page = create()
+            self.created[name] = page
+            self.stack.addWidget(page)
+
+        return page
+
+    def _create_dashboard(self):
+        return DashboardView(self.task_manager, self.analytics)
 
-        self.file_view = FilesView(
+    def _create_tasks(self):
+        return TasksView(self.task_manager)
+
+    def _create_files(self):
+        return FilesView(
             self.file_manager,
-            storage_dashboard=self.storage_dashboard
+            storage_dashboard=self.page("Storage")
         )
 
-        self.stack.addWidget(self.dashboard_view)
-        self.stack.addWidget(self.tasks_view)
-        self.stack.addWidget(self.storage_dashboard)
-        self.stack.addWidget(self.analytics_view)
-        self.stack.addWidget(self.settings_view)
-        self.stack.addWidget(self.dashboard)
-
-        # Connect sidebar
-        self.sidebar.page_changed.connect(self.switch_page)
+    def _create_storage(self):
+        return StorageDashboard(self.file_manager)
 
-        # Status Bar
-        self.status = QStatusBar()
-        self.setStatusBar(self.status)
-        self.status.showMessage("Ready")
+    def _create_analytics(self):
+        return AnalyticsView(self.analytics)
 
     def switch_page(self, index: int):
-        self.stack.setCurrentIndex(index)
+        name = list(self.pages)[index]
+        self.stack.setCurrentWidget(self.page(name))
+
+        self.status.showMessage(f"{name} loaded")
+
+    # -------------------------
+    # STARTUP
+    # -------------------------
+
+    def paintEvent(self, a0):
+        super().paintEvent(a0)
+
+        if not self.painted:
+            self.painted = True
+            startup.mark("first paint")
+
+    def showEvent(self, a0):
+        super().showEvent(a0)
+
+        # once the window is up, build the heavy pages so the first visit
+        # to them is instant; their queries already run on the query pool
+        if self.preload is None:
+            self.preload = [name for name, (_, preload) in self.pages.items() if preload]
+            QTimer.singleShot(config.PAGE_PRELOAD_DELAY_MS, self.preload_next)
+
+    def preload_next(self):
+        while self.preload and self.preload[0] in self.created:
+            self.preload.pop(0)
 
-        page_names = [
-            "Dashboard",
-            "Tasks",
-            "File Organizer",
-            "Analytics",
-            "Settings"
-        ]
+        if not self.preload:
+            startup.finish()
+            return
 
-        self.status.showMessage(f"{page_names[index]} loaded")
+        # one page per turn of the event loop, input gets handled in between
+        self.page(self.preload.pop(0))
+        QTimer.singleShot(0, self.preload_next)
@@ -0,0 +1,125 @@
+import threading
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from core import config
+
+
+_pool = None
+
+
+def query_pool():
+
+    # shared by every view, sized in core/config.py
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(config.QUERY_THREADS)
+    return _pool
+
+
+class QueryTask(QRunnable):
+    def __init__(self, db, key, func, args, kwargs, finished):
+        super().__init__()
+
+        # the runner holds on to it until it reports back
+        self.setAutoDelete(False)
+
+        self.db = db
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.finished = finished
+
+        self.result = None
+        self.error = None
+        self.cancelled = False
+
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def run(self):
+        with self._lock:
+            if self.cancelled:
+                self.finished(self)
+                return
+
+            # this thread's read connection, the one func will query on
+            self._conn = self.db.reader
+
+        try:
+            self.result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            with self._lock:
+                self._conn = None
+
+        self.finished(self)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+
+            # stops a statement already running on our reader; between
+            # statements this is a no-op and the result is dropped instead
+            if self._conn is not None:
+                self._conn.interrupt()
+
+
+class QueryRunner(QObject):
+
+    # (key, result) and (key, error message), on the GUI thread
+    loaded = pyqtSignal(str, object)
+    failed = pyqtSignal(str, str)
+
+    # from a pool thread, queued over to _deliver
+    _finished = pyqtSignal(object)
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+
+        self.db = db
+        self.pool = query_pool()
+
+        # the newest request per key; anything else still out is stale
+        self.current = {}
+        self.started = set()
+
+        self._finished.connect(self._deliver)
+
+    def submit(self, key, func, *args, **kwargs):
+        self.cancel(key)
+
+        task = QueryTask(self.db, key, func, args, kwargs, self._finished.emit)
+        self.current[key] = task
+        self.started.add(task)
+        self.pool.start(task)
+
+    def cancel(self, key=None):
+        keys = list(self.current) if key is None else [key]
+
+        for key in keys:
+            task = self.current.pop(key, None)
+            if task is None:
+                continue
+
+            # never started: taken back off the queue, no report coming
+            if self.pool.tryTake(task):
+                self.started.discard(task)
+            else:
+                task.cancel()
+
+    def _deliver(self, task):
+        self.started.discard(task)
+
+        if self.current.get(task.key) is not task:
+            return
+
+        del self.current[task.key]
+
+        if task.error is None:
+            self.loaded.emit(task.key, task.result)
+        else:
+            self.failed.emit(task.key, task.error)
@@ -1,8 +1,14 @@
 from PyQt6.QtCore import QObject, pyqtSignal
 import os
-from datetime import datetime
-import uuid
-import hashlib
+import queue
+import threading
+import time
+
+from core import config
+from core.drive_indexer import build_file_record, build_dir_record
+from core.hash_cache import HashCache
+from core.path_rules import scan_exclusions
+from modules.duplicate_detector import DuplicateDetector, full_hash
 
 
 class ScanWorker(QObject):
@@ -11,134 +17,468 @@ class ScanWorker(QObject):
     status = pyqtSignal(str)
     finished = pyqtSignal(int)
 
-    def __init__(self, file_manager, drives):
+    def __init__(
+        self,
+        file_manager,
+        drives,
+        batch_size=None,
+        workers=None,
+        incremental=False,
+        resume=False
+    ):
         super().__init__()
 
         self.file_manager = file_manager
         self.drives = drives
+        self.batch_size = batch_size
+        self.workers = workers or config.SCAN_WORKERS
+        self.incremental = incremental
+        self.hash_cache = HashCache(file_manager.db)
         self._running = True
 
-        # directories we NEVER scan
-        self.excluded_dirs = {
-            "Windows",
-            "System Volume Information",
-            "$Recycle.Bin",
-            "PerfLogs"
-        }
-
-        # directories we avoid indexing for cleanup suggestions
-        self.protected_keywords = [
-            "program files",
-            "steamapps",
-            "vmware",
-            "virtualbox"
-        ]
+        # pick up where an interrupted scan left off
+        self.checkpoint = file_manager.load_checkpoint() if resume else None
+        if self.checkpoint:
+            self.drives = self.checkpoint["drives"]
+            self.incremental = self.checkpoint["incremental"]
+
+        # folder mtimes from the previous scan, used to skip unchanged folders
+        self.known_dirs = {}
+        self.known_children = {}
+        self.skipped_dirs = 0
+
+        # set by the writer thread when a write fails
+        self._write_error = None
+
+        # directories we NEVER scan (rules live in core/config.py)
+        self.exclusions = scan_exclusions()
 
     # -------------------------
 
     def run(self):
 
-        total_indexed = 0
+        self._total_indexed = 0
+        self._total_dirs = 0
+        self._total_size = 0
+        self._drive_progress = {drive: 0 for drive in self.drives}
+        self._drives_by_length = sorted(self.drives, key=len, reverse=True)
+
+        if self.checkpoint:
+            writer = self.file_manager.bulk_writer(
+                self.batch_size,
+                track_seen=True,
+                last_seen=self.checkpoint["last_seen"],
+                rollup=False
+            )
+            self._total_indexed = self.checkpoint["total_files"]
+            self._total_dirs = self.checkpoint["total_dirs"]
+            self._total_size = self.checkpoint["total_size"]
+            self._drive_progress.update(self.checkpoint["drive_progress"])
+
+            # folders already written are not in the frontier, so they are
+            # not listed again; rows seen before the stop stay in scan_seen
+            frontier = self.checkpoint["frontier"]
+            self.status.emit(
+                f"Resuming scan of {', '.join(self.drives)} "
+                f"({len(frontier)} folders left)"
+            )
+        else:
+            self.file_manager.clear_checkpoint()
+            writer = self.file_manager.bulk_writer(
+                self.batch_size,
+                track_seen=True,
+                rollup=False
+            )
+            frontier = list(self.drives)
+
+        if self.incremental:
+            self.status.emit("Loading previous scan")
+            self.known_dirs, self.known_children = (
+                self.file_manager.get_directory_index()
+            )
+
+        self._next_checkpoint = time.monotonic() + config.SCAN_CHECKPOINT_INTERVAL
+
+        try:
+            if self.workers > 1:
+                self._run_parallel(writer, frontier)
+            else:
+                self._run_serial(writer, frontier)
+        except Exception as e:
+            self._fail(writer, e)
+
+    # -------------------------
+    # CHECKPOINTS
+    # -------------------------
+
+    def _checkpoint_due(self):
+        return time.monotonic() >= self._next_checkpoint
+
+    def _checkpoint(self, writer, frontier):
+
+        # rows first: a folder leaves the frontier only once it is written
+        writer.flush()
+        self.file_manager.save_checkpoint(
+            self.drives,
+            writer.last_seen,
+            self.incremental,
+            frontier,
+            (self._total_indexed, self._total_dirs, self._total_size),
+            self._drive_progress
+        )
+        self._next_checkpoint = time.monotonic() + config.SCAN_CHECKPOINT_INTERVAL
+
+    def _drive_of(self, path):
+        for drive in self._drives_by_length:
+            prefix = drive if drive.endswith(os.sep) else drive + os.sep
+            if path == drive or path.startswith(prefix):
+                return drive
+        return None
+
+    # -------------------------
+    # SINGLE THREAD
+    # -------------------------
+
+    def _run_serial(self, writer, frontier):
+
         batch_counter = 0
+        current_drive = None
 
-        for drive in self.drives:
+        # first drive on top, so drives are still walked one by one
+        stack = list(reversed(frontier))
 
-            self.status.emit(f"Scanning {drive}")
+        while stack:
 
-            stack = [drive]
+            if not self._running:
+                break
 
-            while stack:
+            current_dir = stack.pop()
 
-                if not self._running:
-                    self.finished.emit(total_indexed)
-                    return
+            drive = self._drive_of(current_dir)
+            if drive != current_drive:
+                current_drive = drive
+                self.status.emit(f"Scanning {drive}")
 
-                current_dir = stack.pop()
+            subdirs, records = self._scan_directory(current_dir)
 
-                try:
-                    with os.scandir(current_dir) as entries:
+            # stopped halfway through the listing: list it again on resume
+            if not self._running:
+                stack.append(current_dir)
+                continue
 
-                        for entry in entries:
+            stack.extend(subdirs)
 
-                            if not self._running:
-                                self.finished.emit(total_indexed)
-                                return
+            for file_data in records:
+                writer.add(file_data)
 
-                            try:
+            file_count = self._count_files(records)
+            batch_counter += file_count
 
-                                # -------------------------
-                                # DIRECTORY
-                                # -------------------------
+            if batch_counter >= 500:
+                self.progress.emit(self._total_indexed)
+                batch_counter = 0
 
-                                if entry.is_dir(follow_symlinks=False):
+            if self._checkpoint_due():
+                self._checkpoint(writer, stack)
 
-                                    name_lower = entry.name.lower()
+        if not self._running:
+            self._checkpoint(writer, stack)
 
-                                    if (
-                                        entry.name in self.excluded_dirs
-                                        or name_lower.startswith(".")
-                                    ):
-                                        continue
+        self._finish(writer, completed=self._running)
 
-                                    stack.append(entry.path)
+    # -------------------------
+    # THREAD POOL + SINGLE WRITER
+    # -------------------------
 
-                                # -------------------------
-                                # FILE
-                                # -------------------------
+    def _run_parallel(self, writer, frontier):
 
-                                elif entry.is_file(follow_symlinks=False):
+        self.status.emit(
+            f"Scanning {', '.join(self.drives)} with {self.workers} workers"
+        )
 
-                                    stat = entry.stat()
+        dir_queue = queue.Queue()
+        record_queue = queue.Queue(maxsize=config.SCAN_RECORD_QUEUE_SIZE)
 
-                                    size = stat.st_size
-                                    modified = datetime.fromtimestamp(
-                                        stat.st_mtime
-                                    ).isoformat()
+        # every folder not yet written: queued, being listed, or with
+        # records still on their way to the writer
+        self._pending = set(frontier)
+        self._pending_lock = threading.Lock()
 
-                                    last_accessed = datetime.fromtimestamp(
-                                        stat.st_atime
-                                    ).isoformat()
+        for path in frontier:
+            dir_queue.put(path)
 
-                                    file_data = {
+        writer_thread = threading.Thread(
+            target=self._write_records,
+            args=(record_queue, writer),
+            daemon=True
+        )
+        writer_thread.start()
 
-                                        "id": str(uuid.uuid4()),
-                                        "absolute_path": entry.path,
-                                        "name": entry.name,
-                                        "extension": os.path.splitext(entry.name)[1],
-                                        "size_bytes": size,
-                                        "modified_at": modified,
-                                        "last_accessed": last_accessed,
-                                        "parent_directory": current_dir,
-                                        "depth": entry.path.count(os.sep)
+        threads = []
+        for _ in range(self.workers):
+            thread = threading.Thread(
+                target=self._traverse,
+                args=(dir_queue, record_queue),
+                daemon=True
+            )
+            thread.start()
+            threads.append(thread)
 
-                                    }
+        # returns once every queued directory has been scanned,
+        # or drained without scanning after stop()
+        dir_queue.join()
 
-                                    self.file_manager._save_file_record(
-                                        file_data,
-                                        last_accessed
-                                    )
+        for _ in threads:
+            dir_queue.put(None)
+        for thread in threads:
+            thread.join()
 
-                                    total_indexed += 1
-                                    batch_counter += 1
+        record_queue.put(None)
+        writer_thread.join()
 
-                                    if batch_counter >= 500:
-                                        self.progress.emit(total_indexed)
-                                        batch_counter = 0
+        if self._write_error is not None:
+            raise self._write_error
 
-                            except PermissionError:
-                                continue
-                            except FileNotFoundError:
-                                continue
-                            except Exception:
-                                continue
+        if not self._running:
+            self._checkpoint(writer, list(self._pending))
+
+        self._finish(writer, completed=self._running)
+
+    def _traverse(self, dir_queue, record_queue):
+
+        while True:
+
+            current_dir = dir_queue.get()
 
-                except PermissionError:
+            if current_dir is None:
+                dir_queue.task_done()
+                return
+
+            try:
+                if not self._running:
+                    continue
+
+                subdirs, records = self._scan_directory(current_dir)
+
+                # stopped halfway: leave it pending, it is listed on resume
+                if not self._running:
                     continue
-                except FileNotFoundError:
+
+                with self._pending_lock:
+                    self._pending.update(subdirs)
+
+                for subdir in subdirs:
+                    dir_queue.put(subdir)
+
+                # chunked so one huge directory cannot fill the queue alone
+                for i in range(0, len(records), 500):
+                    record_queue.put(("records", records[i:i + 500]))
+
+                record_queue.put(("done", current_dir))
+
+            finally:
+                dir_queue.task_done()
+
+    def _write_records(self, record_queue, writer):
+
+        batch_counter = 0
+
+        while True:
+
+            item = record_queue.get()
+
+            if item is None:
+                return
+
+            # after a failed write only drain, so traversal threads blocked
+            # on the full queue can see the stop and wind down
+            if self._write_error is not None:
+                continue
+
+            try:
+                kind, payload = item
+
+                if kind == "done":
+                    with self._pending_lock:
+                        self._pending.discard(payload)
+
+                    if self._checkpoint_due():
+                        with self._pending_lock:
+                            frontier = list(self._pending)
+                        self._checkpoint(writer, frontier)
                     continue
 
+                for file_data in payload:
+                    writer.add(file_data)
+
+                file_count = self._count_files(payload)
+                batch_counter += file_count
+
+                if batch_counter >= 500:
+                    self.progress.emit(self._total_indexed)
+                    batch_counter = 0
+
+            except Exception as e:
+                self._write_error = e
+                self._running = False
+
+    # -------------------------
+    # DIRECTORY LISTING
+    # -------------------------
+
+    def _scan_directory(self, current_dir):
+
+        try:
+            dir_record = build_dir_record(current_dir, os.stat(current_dir))
+        except OSError:
+            return [], []
+
+        subdirs = []
+        records = [dir_record]
+
+        # an unchanged folder mtime means no entry was added, removed or
+        # renamed here, so reuse the known subfolders instead of listing
+        if (
+            self.incremental
+            and self.known_dirs.get(current_dir) == dir_record["modified_at"]
+        ):
+            dir_record["unchanged"] = True
+
+            subdirs = [
+                path for path in self.known_children.get(current_dir, ())
+                if not self.exclusions.matches(path)
+            ]
+            return subdirs, records
+
+        try:
+            with os.scandir(current_dir) as entries:
+
+                for entry in entries:
+
+                    if not self._running:
+                        break
+
+                    try:
+
+                        if entry.is_dir(follow_symlinks=False):
+
+                            # prunes the whole subtree
+                            if self.exclusions.matches(entry.path, entry.name):
+                                continue
+
+                            subdirs.append(entry.path)
+
+                        elif entry.is_file(follow_symlinks=False):
+
+                            records.append(build_file_record(
+                                entry.path,
+                                entry.name,
+                                entry.stat(),
+                                current_dir
+                            ))
+
+                    except PermissionError:
+                        continue
+                    except FileNotFoundError:
+                        continue
+                    except Exception:
+                        continue
+
+        except PermissionError:
+            pass
+        except FileNotFoundError:
+            pass
+        except OSError:
+            pass
+
+        return subdirs, records
+
+    # -------------------------
+
+    def _count_files(self, records):
+        file_count = 0
+        size = 0
+
+        for file_data in records:
+            if file_data.get("is_directory"):
+                self._total_dirs += 1
+                if file_data.get("unchanged"):
+                    self.skipped_dirs += 1
+            else:
+                file_count += 1
+                size += file_data["size_bytes"]
+
+        self._total_indexed += file_count
+        self._total_size += size
+
+        # records come one folder at a time, so they share a drive
+        if records:
+            drive = self._drive_of(records[0]["absolute_path"])
+            if drive is not None:
+                self._drive_progress[drive] = self._drive_progress.get(drive, 0) + file_count
+
+        return file_count
+
+    def _finish(self, writer, completed=True):
+
+        # flush whatever is still buffered, also when stopped early
+        writer.close()
+        self.hash_cache.flush()
+
+        total_indexed = self._total_indexed
+
+        message = (
+            f"Indexed {total_indexed} files in {writer.elapsed():.1f}s "
+            f"({writer.throughput():.0f} files/s) | {writer.summary()}"
+        )
+
+        # only a complete walk can tell which rows have vanished
+        if completed:
+            removed = self.file_manager.prune_vanished(
+                self.drives,
+                writer.last_seen
+            )
+            message += f", removed {removed}"
+
+            rebuilt = self.file_manager.indexer.record_scan(
+                os.pathsep.join(self.drives),
+                total_indexed,
+                self._total_size,
+                self._total_dirs
+            )
+            self.file_manager.clear_checkpoint()
+
+            # folder totals in one bottom-up pass rather than per batch (a
+            # first scan of a root has just had it); a stopped scan leaves
+            # them to the resumed one, so Stop is quick
+            if not rebuilt:
+                self.file_manager.rebuild_rollup()
+        else:
+            message += " | stopped, progress saved for resume"
+
+        if self.incremental:
+            message += f", skipped {self.skipped_dirs} unchanged folders"
+
+        if self.exclusions.counts:
+            message += f" | excluded: {self.exclusions.summary()}"
+
+        self.status.emit(message)
         self.finished.emit(total_indexed)
 
+    def _fail(self, writer, error):
+
+        # buffered rows may be what failed, retrying them on close would
+        # only fail again; the last saved checkpoint still matches what
+        # reached the database, so a resume starts from there
+        writer.buffer.clear()
+
+        print("Scan error:", error)
+        self.status.emit(
+            f"Scan failed after {self._total_indexed} files: {error} "
+            f"| resume continues from the last checkpoint"
+        )
+        self.finished.emit(self._total_indexed)
+
     # -------------------------
 
     def stop(self):
@@ -148,14 +488,47 @@ class ScanWorker(QObject):
 
     def calculate_hash(self, file_path):
 
-        hash_sha256 = hashlib.sha256()
-
         try:
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(8192), b""):
-                    hash_sha256.update(chunk)
+            stat = os.stat(file_path)
+        except Exception:
+            return None
 
-            return hash_sha256.hexdigest()
+        cached = self.hash_cache.lookup(file_path, stat)
+        if cached:
+            return cached
 
-        except Exception:
-            return None
\ No newline at end of file
+        _, digest = full_hash(file_path)
+
+        if digest:
+            self.hash_cache.store(file_path, stat, full=digest)
+
+        return digest
+
+
+class DuplicateWorker(QObject):
+
+    status = pyqtSignal(str)
+    finished = pyqtSignal(int)
+
+    def __init__(self, file_manager):
+        super().__init__()
+
+        self.file_manager = file_manager
+
+    def run(self):
+
+        self.status.emit("Hashing duplicate candidates")
+
+        detector = DuplicateDetector(self.file_manager.db)
+        groups = detector.run()
+
+        self.status.emit(
+            f"Found {len(groups)} duplicate groups ({detector.cache.summary()})"
+        )
+        self.finished.emit(len(groups))
+
+
+class WatcherSignals(QObject):
+
+    # FileWatcher calls back from its own thread, this hops to the GUI
+    changed = pyqtSignal(int)
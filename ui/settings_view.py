@@ -1,4 +1,6 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QTextEdit
+
+from core import startup
 
 
 class SettingsView(QWidget):
@@ -12,3 +14,29 @@ class SettingsView(QWidget):
         label = QLabel("Settings")
         label.setStyleSheet("font-size: 24px;")
         layout.addWidget(label)
+
+        # where this launch spent its startup time, from core/startup.py
+        startup_label = QLabel("Startup")
+        startup_label.setStyleSheet("font-size: 18px;")
+        layout.addWidget(startup_label)
+
+        self.startup_box = QTextEdit()
+        self.startup_box.setReadOnly(True)
+        layout.addWidget(self.startup_box)
+
+    def showEvent(self, a0):
+        super().showEvent(a0)
+
+        # pages keep being preloaded after this one may have been built
+        self.show_startup()
+
+    def show_startup(self):
+        self.startup_box.clear()
+
+        if not startup.phases:
+            self.startup_box.append("No startup trace for this launch.")
+            return
+
+        for name, started, spent in startup.phases:
+            took = f"{spent:.0f} ms" if spent is not None else ""
+            self.startup_box.append(f"{took:>10}  at {started:>6.0f} ms  {name}")
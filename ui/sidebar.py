@@ -5,7 +5,7 @@ from PyQt6.QtCore import pyqtSignal
 class Sidebar(QWidget):
     page_changed = pyqtSignal(int)
 
-    def __init__(self):
+    def __init__(self, pages):
         super().__init__()
 
         self.setFixedWidth(220)
@@ -18,14 +18,6 @@ class Sidebar(QWidget):
         self.buttons = []
         self.current_index = 0
 
-        pages = [
-            "Dashboard",
-            "Tasks",
-            "File Organizer",
-            "Analytics",
-            "Settings"
-        ]
-
         for index, name in enumerate(pages):
             btn = QPushButton(name)
             btn.setMinimumHeight(40)
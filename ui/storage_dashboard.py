@@ -5,6 +5,8 @@ from PyQt6.QtWidgets import (
     QTextEdit
 )
 
+from ui.query_runner import QueryRunner
+
 
 class StorageDashboard(QWidget):
 
@@ -26,6 +28,7 @@ class StorageDashboard(QWidget):
         self.folder_box = QTextEdit()
         self.largest_files_box = QTextEdit()
         self.steam_box = QTextEdit()
+        self.age_box = QTextEdit()
         self.cleanup_box = QTextEdit()
 
         for box in [
@@ -34,32 +37,73 @@ class StorageDashboard(QWidget):
             self.folder_box,
             self.largest_files_box,
             self.steam_box,
+            self.age_box,
             self.cleanup_box
         ]:
             box.setReadOnly(True)
             self.main_layout.addWidget(box)
 
+        # each box is queried on a thread pool and shown on arrival
+        self.queries = QueryRunner(self.file_manager.db, self)
+        self.queries.loaded.connect(self.show_result)
+        self.queries.failed.connect(self.show_error)
+
+        # where each background load lands: (box, render)
+        self.results = {
+            "summary": (self.summary_box, self.show_summary),
+            "types": (self.types_box, self.show_file_types),
+            "folders": (self.folder_box, self.show_folders),
+            "largest": (self.largest_files_box, self.show_largest_files),
+            "steam": (self.steam_box, self.show_steam),
+            "ages": (self.age_box, self.show_ages),
+            "cleanup": (self.cleanup_box, self.show_cleanup)
+        }
+
         self.refresh_dashboard()
 
     # -------------------------
 
     def refresh_dashboard(self):
 
-        self.load_summary()
-        self.load_file_types()
-        self.load_folders()
-        self.load_largest_files()
-        self.load_steam()
-        self.load_cleanup()
+        self.load("summary", self.fetch_summary)
+        self.load("types", self.file_manager.get_extension_breakdown)
+        self.load("folders", self.file_manager.get_storage_by_folder, 10)
+        self.load("largest", self.file_manager.get_largest_files, 10)
+        self.load("steam", self.file_manager.get_game_library_usage)
+        self.load("ages", self.file_manager.get_age_breakdown)
+        self.load("cleanup", self.file_manager.get_cleanup_suggestions)
+
+    def load(self, key, fetch, *args):
+
+        # a refresh keeps the old contents up until the new ones land,
+        # an empty box says it is loading
+        box, _ = self.results[key]
+        if box.document().isEmpty():
+            box.setPlainText("Loading...")
+
+        self.queries.submit(key, fetch, *args)
+
+    def show_result(self, key, data):
+        _, render = self.results[key]
+        render(data)
+
+    def show_error(self, key, message):
+        box, _ = self.results[key]
+        box.setPlainText(f"Could not load: {message}")
 
     # -------------------------
 
-    def load_summary(self):
+    def fetch_summary(self):
+        # on a pool thread
+        return (
+            self.file_manager.get_indexed_file_count(),
+            self.file_manager.get_total_storage_used()
+        )
 
-        self.summary_box.clear()
+    def show_summary(self, data):
+        total_files, total_storage = data
 
-        total_files = self.file_manager.get_indexed_file_count()
-        total_storage = self.file_manager.get_total_storage_used()
+        self.summary_box.clear()
 
         self.summary_box.append("SYSTEM SUMMARY\n")
         self.summary_box.append(f"Total Files Indexed: {total_files}")
@@ -69,13 +113,11 @@ class StorageDashboard(QWidget):
 
     # -------------------------
 
-    def load_file_types(self):
+    def show_file_types(self, types):
 
         self.types_box.clear()
         self.types_box.append("\nFILE TYPE BREAKDOWN\n")
 
-        types = self.file_manager.get_extension_breakdown()
-
         for ext, count, size in types:
             size_gb = round(size / (1024**3), 2) if size else 0
             self.types_box.append(
@@ -84,59 +126,66 @@ class StorageDashboard(QWidget):
 
     # -------------------------
 
-    def load_folders(self):
+    def show_folders(self, folders):
 
         self.folder_box.clear()
         self.folder_box.append("\nLARGEST FOLDERS\n")
 
-        folders = self.file_manager.get_storage_by_folder(10)
-
         for folder, size in folders:
             size_gb = round(size / (1024**3), 2)
             self.folder_box.append(f"{size_gb} GB — {folder}")
 
     # -------------------------
 
-    def load_largest_files(self):
+    def show_largest_files(self, files):
 
         self.largest_files_box.clear()
         self.largest_files_box.append("\nLARGEST FILES\n")
 
-        files = self.file_manager.get_largest_files(10)
-
         for path, size in files:
             size_gb = round(size / (1024**3), 2)
             self.largest_files_box.append(f"{size_gb} GB — {path}")
 
     # -------------------------
 
-    def load_steam(self):
+    def show_steam(self, games):
 
         self.steam_box.clear()
         self.steam_box.append("\nSTEAM / GAME STORAGE\n")
 
-        games = self.file_manager.get_steam_games_usage()
-
         if not games:
             self.steam_box.append("No Steam libraries detected.")
             return
 
-        for game, size in games:
+        for launcher, name, app_root, size, files in games:
             size_gb = round(size / (1024**3), 2)
-            self.steam_box.append(f"{size_gb} GB — {game}")
+            self.steam_box.append(f"{size_gb} GB — {launcher}: {name} ({app_root})")
 
     # -------------------------
 
-    def load_cleanup(self):
+    def show_ages(self, buckets):
+
+        self.age_box.clear()
+        self.age_box.append("\nLAST ACCESSED\n")
+
+        for newest, oldest, count, size in buckets:
+            label = (
+                f"{newest}-{oldest} days ago" if oldest is not None
+                else f"over {newest} days ago"
+            )
+            size_gb = round(size / (1024**3), 2)
+            self.age_box.append(f"{label} | {count} files | {size_gb} GB")
+
+    # -------------------------
+
+    def show_cleanup(self, suggestions):
 
         self.cleanup_box.clear()
         self.cleanup_box.append("\nSMART CLEANUP SUGGESTIONS\n")
 
-        suggestions = self.file_manager.get_cleanup_suggestions()
-
         if not suggestions:
             self.cleanup_box.append("No cleanup suggestions available.")
             return
 
         for s in suggestions[:20]:
-            self.cleanup_box.append(s)
\ No newline at end of file
+            self.cleanup_box.append(s)
@@ -0,0 +1,222 @@
+from datetime import datetime
+
+from PyQt6.QtWidgets import QAbstractItemView, QHeaderView, QTableView
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from core import config
+from ui.query_runner import QueryRunner
+
+
+def format_size(size):
+    size = size or 0
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def format_time(epoch):
+    return datetime.fromtimestamp(epoch).strftime("%Y-%m-%d") if epoch else "-"
+
+
+class PagedTableModel(QAbstractTableModel):
+
+    # rows arrive a page at a time as the view scrolls: fetch(sort,
+    # descending, after, limit) -> (rows, after) is one of FileManager's
+    # keyset page methods, run on the query pool; only pages scrolled
+    # past are ever held, not the whole result
+    #
+    # columns: (header, sort name or None, text(row), right aligned)
+
+    def __init__(self, db, fetch, columns, sort, descending=True, tooltip=None, parent=None):
+        super().__init__(parent)
+
+        self.fetch = fetch
+        self.columns = columns
+        self.sort_name = sort
+        self.descending = descending
+        self.tooltip = tooltip
+
+        self.rows = []
+        self.after = None
+        self.pending = False
+
+        self.queries = QueryRunner(db, self)
+        self.queries.loaded.connect(self._page_loaded)
+        self.queries.failed.connect(self._page_failed)
+
+    # -------------------------
+    # PAGES
+    # -------------------------
+
+    def refresh(self):
+
+        # the old rows stay up until the first page replaces them
+        self.queries.cancel("more")
+        self.pending = True
+        self.queries.submit(
+            "first", self.fetch, self.sort_name, self.descending, None, config.RESULT_PAGE_SIZE
+        )
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.after is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.after is None or self.pending:
+            return
+
+        self.pending = True
+        self.queries.submit(
+            "more", self.fetch, self.sort_name, self.descending, self.after, config.RESULT_PAGE_SIZE
+        )
+
+    def _page_loaded(self, key, page):
+        rows, after = page
+        self.pending = False
+        self.after = after
+
+        if key == "first":
+            self.beginResetModel()
+            self.rows = list(rows)
+            self.endResetModel()
+        elif rows:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+
+    def _page_failed(self, key, message):
+        print(f"Result table: could not load a page: {message}")
+
+        # no retry loop from the view asking again, a refresh starts over
+        self.pending = False
+        self.after = None
+
+    # -------------------------
+    # SORTING
+    # -------------------------
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+
+        # only columns with an index order behind them; the next first
+        # page comes back already sorted by SQL
+        name = self.columns[column][1]
+        if name is None:
+            return
+
+        descending = order == Qt.SortOrder.DescendingOrder
+        if (name, descending) == (self.sort_name, self.descending) and (self.rows or self.pending):
+            return
+
+        self.sort_name = name
+        self.descending = descending
+        self.refresh()
+
+    def sort_column(self):
+        return next(
+            column for column, (_, name, _, _) in enumerate(self.columns)
+            if name == self.sort_name
+        )
+
+    def sort_order(self):
+        return Qt.SortOrder.DescendingOrder if self.descending else Qt.SortOrder.AscendingOrder
+
+    # -------------------------
+    # MODEL INTERFACE
+    # -------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = self.rows[index.row()]
+        _, _, text, right = self.columns[index.column()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return text(row)
+
+        if role == Qt.ItemDataRole.TextAlignmentRole and right:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+
+        if role == Qt.ItemDataRole.ToolTipRole and self.tooltip:
+            return self.tooltip(row)
+
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.columns[section][0]
+        return None
+
+
+# -------------------------
+# RESULT TABLES
+# -------------------------
+
+def largest_files_model(file_manager, parent=None):
+    # (size, modified, path, id)
+    return PagedTableModel(file_manager.db, file_manager.get_largest_files_page, [
+        ("Size", "size", lambda row: format_size(row[0]), True),
+        ("Modified", "modified", lambda row: format_time(row[1]), False),
+        ("Path", None, lambda row: row[2], False)
+    ], "size", tooltip=lambda row: row[2], parent=parent)
+
+
+def folders_model(file_manager, parent=None):
+    # (total size, file count, path, rowid)
+    return PagedTableModel(file_manager.db, file_manager.get_folders_page, [
+        ("Size", "size", lambda row: format_size(row[0]), True),
+        ("Files", None, lambda row: str(row[1]), True),
+        ("Folder", "path", lambda row: row[2], False)
+    ], "size", tooltip=lambda row: row[2], parent=parent)
+
+
+def duplicate_groups_model(file_manager, parent=None):
+    # (hash, copies, size of one copy, wasted, paths)
+    return PagedTableModel(file_manager.db, file_manager.get_duplicate_groups_page, [
+        ("Wasted", "wasted", lambda row: format_size(row[3]), True),
+        ("Size", "size", lambda row: format_size(row[2]), True),
+        ("Copies", "copies", lambda row: str(row[1]), True),
+        ("Files", None, lambda row: f"{row[4][0]} (+{len(row[4]) - 1} more)" if row[4] else "", False)
+    ], "wasted", tooltip=lambda row: "\n".join(row[4]), parent=parent)
+
+
+def cleanup_model(file_manager, parent=None):
+    # (size, last accessed, path, id)
+    return PagedTableModel(file_manager.db, file_manager.get_cleanup_page, [
+        ("Size", "size", lambda row: format_size(row[0]), True),
+        ("Last used", "accessed", lambda row: format_time(row[1]), False),
+        ("Path", None, lambda row: row[2], False)
+    ], "size", tooltip=lambda row: row[2], parent=parent)
+
+
+def result_table(model):
+    table = QTableView()
+    table.setModel(model)
+    table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+    table.setWordWrap(False)
+
+    # every row one line high, nothing is measured per row
+    vertical = table.verticalHeader()
+    vertical.setVisible(False)
+    vertical.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+
+    header = table.horizontalHeader()
+    header.setStretchLastSection(True)
+    header.setSortIndicator(model.sort_column(), model.sort_order())
+    table.setSortingEnabled(True)
+
+    # a click on a column SQL can't sort by leaves the indicator where it was
+    def keep_indicator(section, order):
+        if model.columns[section][1] is None:
+            header.setSortIndicator(model.sort_column(), model.sort_order())
+
+    header.sortIndicatorChanged.connect(keep_indicator)
+
+    return table
@@ -0,0 +1,331 @@
+from PyQt6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionViewItem
+from PyQt6.QtGui import QColor, QFont, QFontMetrics
+from PyQt6.QtCore import (
+    Qt,
+    QDate,
+    QModelIndex,
+    QAbstractListModel,
+    QSortFilterProxyModel,
+    QRect,
+    QSize
+)
+
+
+TaskIdRole = Qt.ItemDataRole.UserRole
+TaskRole = Qt.ItemDataRole.UserRole + 1
+
+# plain strings the proxy compares without a Python lessThan
+DueSortRole = Qt.ItemDataRole.UserRole + 2
+CreatedSortRole = Qt.ItemDataRole.UserRole + 3
+TitleSortRole = Qt.ItemDataRole.UserRole + 4
+
+META_COLOR = QColor("#AAAAAA")
+OVERDUE_COLOR = QColor("#E74C3C")
+META_FONT_SIZE = 12
+
+ROW_MARGIN = 8
+LINE_SPACING = 4
+
+# past every yyyy-MM-dd, so tasks without a due date sort last
+NO_DUE_DATE = "9999-99-99"
+
+
+def today():
+    return QDate.currentDate().toString("yyyy-MM-dd")
+
+
+def timestamp(value):
+    # isoformat() down to the minute
+    return value[:16].replace("T", " ") if value else "-"
+
+
+class TaskListModel(QAbstractListModel):
+    def __init__(self, task_manager, parent=None):
+        super().__init__(parent)
+
+        self.task_manager = task_manager
+
+        # rows in arrival order, TaskFilterProxy puts them in display order
+        self.tasks = []
+        self.rows = {}
+
+    # -------------------------
+    # LOAD
+    # -------------------------
+
+    def set_tasks(self, tasks):
+
+        # rows from get_all_tasks, due date order already, which the
+        # proxy's stable sort keeps for equal keys
+        self.beginResetModel()
+
+        self.tasks = tasks
+        self._index_rows()
+
+        self.endResetModel()
+
+    def _index_rows(self):
+        self.rows = {task["id"]: row for row, task in enumerate(self.tasks)}
+
+    def row_of(self, task_id):
+        return self.rows.get(task_id, -1)
+
+    # -------------------------
+    # MODEL INTERFACE
+    # -------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.tasks)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        task = self.tasks[index.row()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return task["title"]
+
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if task["completed"] else Qt.CheckState.Unchecked
+
+        if role == TaskIdRole:
+            return task["id"]
+
+        if role == TaskRole:
+            return task
+
+        if role == DueSortRole:
+            return task["due_date"] or NO_DUE_DATE
+
+        if role == CreatedSortRole:
+            return task["created_at"] or ""
+
+        if role == TitleSortRole:
+            return task["title"].casefold()
+
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+
+        return (
+            Qt.ItemFlag.ItemIsEnabled |
+            Qt.ItemFlag.ItemIsSelectable |
+            Qt.ItemFlag.ItemIsUserCheckable
+        )
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole:
+            return False
+
+        task = self.tasks[index.row()]
+
+        if Qt.CheckState(value) == Qt.CheckState.Checked:
+            self.task_manager.mark_completed(task["id"])
+        else:
+            self.task_manager.mark_incomplete(task["id"])
+
+        # only this row repaints, and the proxy re-checks its filter
+        self.tasks[index.row()] = self.task_manager.get_task(task["id"])
+        self.dataChanged.emit(index, index)
+        return True
+
+    # -------------------------
+    # SINGLE ROW CHANGES
+    # -------------------------
+
+    # the proxy sorts dynamically: a new or changed row is moved into
+    # place there, the other rows are left alone
+
+    def add(self, task_id):
+        task = self.task_manager.get_task(task_id)
+        if task is None:
+            return
+
+        row = len(self.tasks)
+
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.tasks.append(task)
+        self.rows[task_id] = row
+        self.endInsertRows()
+
+    def update(self, task_id):
+        row = self.row_of(task_id)
+        task = self.task_manager.get_task(task_id)
+        if row < 0 or task is None:
+            return
+
+        self.tasks[row] = task
+        self.dataChanged.emit(self.index(row), self.index(row))
+
+    def remove(self, task_ids):
+        rows = sorted((self.row_of(task_id) for task_id in task_ids), reverse=True)
+
+        self.task_manager.delete_tasks(task_ids)
+
+        # bottom up so the rows still to go keep their numbers
+        for row in rows:
+            if row < 0:
+                continue
+
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.tasks[row]
+            self.endRemoveRows()
+
+        self._index_rows()
+
+
+class TaskFilterProxy(QSortFilterProxyModel):
+
+    MODES = ["All", "Active", "Completed", "Due Today"]
+
+    # name -> (sort role, order); the roles hold plain strings, so the
+    # comparisons run in Qt's own lessThan rather than in Python
+    ORDERS = {
+        "Due date": (DueSortRole, Qt.SortOrder.AscendingOrder),
+        "Newest": (CreatedSortRole, Qt.SortOrder.DescendingOrder),
+        "Title": (TitleSortRole, Qt.SortOrder.AscendingOrder)
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.mode = "All"
+        self.today = today()
+
+        # a toggled or edited row is re-filtered and re-placed on its own
+        self.setDynamicSortFilter(True)
+        self.set_order("Due date")
+
+    def set_mode(self, mode):
+        self.mode = mode
+        self.today = today()
+        self.invalidateFilter()
+
+    def set_order(self, order):
+        role, direction = self.ORDERS[order]
+        self.setSortRole(role)
+        self.sort(0, direction)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.mode == "All":
+            return True
+
+        # straight off the model's rows, no QVariant round trip per row
+        task = self.sourceModel().tasks[source_row]
+
+        if self.mode == "Active":
+            return not task["completed"]
+
+        if self.mode == "Completed":
+            return bool(task["completed"])
+
+        if self.mode == "Due Today":
+            return task["due_date"] == self.today and not task["completed"]
+
+        return True
+
+
+class TaskDelegate(QStyledItemDelegate):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.meta_font = None
+
+    def _meta_font(self, font):
+        if self.meta_font is None or self.meta_font.family() != font.family():
+            self.meta_font = QFont(font)
+            self.meta_font.setPixelSize(META_FONT_SIZE)
+        return self.meta_font
+
+    # -------------------------
+    # SIZE
+    # -------------------------
+
+    def sizeHint(self, option, index):
+        # every row is the same height, so the view can use uniform sizes
+        title_height = QFontMetrics(option.font).height()
+        meta_height = QFontMetrics(self._meta_font(option.font)).height()
+        return QSize(option.rect.width(), title_height + meta_height + LINE_SPACING + ROW_MARGIN * 2)
+
+    # -------------------------
+    # PAINT
+    # -------------------------
+
+    def paint(self, painter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+
+        task = index.data(TaskRole)
+        title = opt.text
+        opt.text = ""
+
+        widget = opt.widget
+        style = widget.style() if widget else QApplication.style()
+
+        # background, selection and the check indicator, drawn by the style;
+        # the base editorEvent toggles against this same indicator rect
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, opt, painter, widget)
+
+        check = style.subElementRect(QStyle.SubElement.SE_ItemViewItemCheckIndicator, opt, widget)
+        left = check.right() + ROW_MARGIN
+        width = opt.rect.right() - ROW_MARGIN - left
+
+        meta_font = self._meta_font(opt.font)
+        title_height = QFontMetrics(opt.font).height()
+        meta_height = QFontMetrics(meta_font).height()
+        top = opt.rect.top() + (opt.rect.height() - title_height - meta_height - LINE_SPACING) // 2
+
+        painter.save()
+
+        if opt.state & QStyle.StateFlag.State_Selected:
+            title_color = opt.palette.highlightedText().color()
+        else:
+            title_color = opt.palette.text().color()
+
+        painter.setFont(opt.font)
+        painter.setPen(title_color)
+        painter.drawText(
+            QRect(left, top, width, title_height),
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+            QFontMetrics(opt.font).elidedText(title, Qt.TextElideMode.ElideRight, width)
+        )
+
+        meta, overdue = self.meta_text(task)
+
+        painter.setFont(meta_font)
+        painter.setPen(OVERDUE_COLOR if overdue else META_COLOR)
+        painter.drawText(
+            QRect(left, top + title_height + LINE_SPACING, width, meta_height),
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+            QFontMetrics(meta_font).elidedText(meta, Qt.TextElideMode.ElideRight, width)
+        )
+
+        painter.restore()
+
+    def meta_text(self, task):
+        meta_parts = [f"Created: {timestamp(task['created_at'])}"]
+        overdue = False
+
+        if task["due_date"]:
+            due = QDate.fromString(task["due_date"], "yyyy-MM-dd")
+            days_remaining = QDate.currentDate().daysTo(due)
+
+            if days_remaining > 1:
+                remaining_text = f"{days_remaining} days left"
+            elif days_remaining == 1:
+                remaining_text = "Due tomorrow"
+            elif days_remaining == 0:
+                remaining_text = "Due today"
+            else:
+                remaining_text = f"{abs(days_remaining)} days overdue"
+
+            meta_parts.append(f"Due: {task['due_date']} ({remaining_text})")
+            overdue = days_remaining < 0 and not task["completed"]
+
+        if task["completed"] and task["completed_at"]:
+            meta_parts.append(f"Completed: {timestamp(task['completed_at'])}")
+
+        return " | ".join(meta_parts), overdue
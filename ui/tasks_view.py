@@ -4,9 +4,8 @@ from PyQt6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QPushButton,
-    QListWidget,
-    QListWidgetItem,
-    QCheckBox,
+    QListView,
+    QAbstractItemView,
     QComboBox,
     QInputDialog,
     QMessageBox,
@@ -19,6 +18,9 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtGui import QAction, QKeyEvent
 from PyQt6.QtCore import Qt, QDate
 
+from ui.task_list import TaskListModel, TaskFilterProxy, TaskDelegate, TaskIdRole
+from ui.query_runner import QueryRunner
+
 
 class TasksView(QWidget):
     def __init__(self, task_manager):
@@ -26,6 +28,11 @@ class TasksView(QWidget):
 
         self.task_manager = task_manager
 
+        # the task list is read on the query pool, the page shows at once
+        self.queries = QueryRunner(self.task_manager.db, self)
+        self.queries.loaded.connect(self.show_tasks)
+        self.queries.failed.connect(self.show_error)
+
         self._init_ui()
         self.load_tasks()
 
@@ -34,6 +41,13 @@ class TasksView(QWidget):
     # -------------------------
 
     def _init_ui(self):
+
+        # rows live in the model; the proxy filters and sorts them without
+        # a reload
+        self.model = TaskListModel(self.task_manager, self)
+        self.proxy = TaskFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 20, 20, 20)
         self.setLayout(layout)
@@ -44,23 +58,31 @@ class TasksView(QWidget):
         title = QLabel("Tasks")
         title.setStyleSheet("font-size: 24px; font-weight: bold;")
 
+        self.order_box = QComboBox()
+        self.order_box.addItems(TaskFilterProxy.ORDERS)
+        self.order_box.currentTextChanged.connect(self.proxy.set_order)
+
         self.filter_box = QComboBox()
-        self.filter_box.addItems(["All", "Active", "Completed", "Due Today"])
-        self.filter_box.currentIndexChanged.connect(self.load_tasks)
+        self.filter_box.addItems(TaskFilterProxy.MODES)
+        self.filter_box.currentTextChanged.connect(self.proxy.set_mode)
 
         self.add_button = QPushButton("Add Task")
         self.add_button.clicked.connect(self.add_task)
 
         header_layout.addWidget(title)
         header_layout.addStretch()
+        header_layout.addWidget(self.order_box)
         header_layout.addWidget(self.filter_box)
         header_layout.addWidget(self.add_button)
 
         layout.addLayout(header_layout)
 
-        # Task List
-        self.task_list = QListWidget()
-        self.task_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        # Task List, painted by the delegate only for the rows in view
+        self.task_list = QListView()
+        self.task_list.setModel(self.proxy)
+        self.task_list.setItemDelegate(TaskDelegate(self.task_list))
+        self.task_list.setUniformItemSizes(True)
+        self.task_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.task_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.task_list.customContextMenuRequested.connect(self.open_context_menu)
 
@@ -71,41 +93,13 @@ class TasksView(QWidget):
     # -------------------------
 
     def load_tasks(self):
-        self.task_list.clear()
-
-        filter_mode = self.filter_box.currentText()
-        today = QDate.currentDate()
-
-        all_tasks = self.task_manager.get_all_tasks(include_completed=True)
-
-        # Filter
-        if filter_mode == "Active":
-            tasks = [t for t in all_tasks if t["completed"] == 0]
-
-        elif filter_mode == "Completed":
-            tasks = [t for t in all_tasks if t["completed"] == 1]
-
-        elif filter_mode == "Due Today":
-            tasks = []
-            for t in all_tasks:
-                if t.get("due_date"):
-                    due = QDate.fromString(t["due_date"], "yyyy-MM-dd")
-                    if due == today and t["completed"] == 0:
-                        tasks.append(t)
-        else:
-            tasks = all_tasks
+        self.queries.submit("tasks", self.task_manager.get_all_tasks, True)
 
-        # Sort by nearest due date (None dates go last)
-        def sort_key(task):
-            if task.get("due_date"):
-                due = QDate.fromString(task["due_date"], "yyyy-MM-dd")
-                return due.toJulianDay()
-            return 999999999  # push no-date tasks to bottom
+    def show_tasks(self, key, tasks):
+        self.model.set_tasks(tasks)
 
-        tasks.sort(key=sort_key)
-
-        for task in tasks:
-            self._create_task_widget(task)
+    def show_error(self, key, message):
+        QMessageBox.critical(self, "Error", f"Could not load tasks: {message}")
 
     # -------------------------
     # ADD TASK
@@ -147,100 +141,24 @@ class TasksView(QWidget):
         due_date = date_dialog.date().toString("yyyy-MM-dd")
 
         try:
-            self.task_manager.create_task(
+            task_id = self.task_manager.create_task(
                 title=title,
                 due_date=due_date,
             )
-            self.load_tasks()
+            self.model.add(task_id)
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
 
-    # -------------------------
-    # CREATE TASK WIDGET
-    # -------------------------
-
-    def _create_task_widget(self, task):
-        item = QListWidgetItem()
-        item.setData(Qt.ItemDataRole.UserRole, task["id"])
-
-        container = QWidget()
-        layout = QVBoxLayout()
-        layout.setContentsMargins(8, 6, 8, 6)
-        container.setLayout(layout)
-
-        # Top Row
-        top_row = QHBoxLayout()
-
-        checkbox = QCheckBox(task["title"])
-        checkbox.setChecked(bool(task["completed"]))
-        checkbox.stateChanged.connect(
-            lambda state, task_id=task["id"]: self.toggle_complete(task_id, state)
-        )
-
-
-        top_row.addWidget(checkbox)
-        top_row.addStretch()
-
-        layout.addLayout(top_row)
-
-        # Meta info
-        meta_parts = [f"Created: {task['created_at']}"]
-
-        today = QDate.currentDate()
-
-        if task.get("due_date"):
-            due = QDate.fromString(task["due_date"], "yyyy-MM-dd")
-            days_remaining = today.daysTo(due)
-
-            if days_remaining > 1:
-                remaining_text = f"{days_remaining} days left"
-            elif days_remaining == 1:
-                remaining_text = "Due tomorrow"
-            elif days_remaining == 0:
-                remaining_text = "Due today"
-            else:
-                remaining_text = f"{abs(days_remaining)} days overdue"
-
-            meta_parts.append(f"Due: {task['due_date']} ({remaining_text})")
-
-        if task["completed"] and task["completed_at"]:
-            meta_parts.append(f"Completed: {task['completed_at']}")
-
-        meta = QLabel(" | ".join(meta_parts))
-        meta.setStyleSheet("font-size: 12px; color: #AAAAAA;")
-
-        # Highlight overdue
-        if task.get("due_date") and not task["completed"]:
-            due = QDate.fromString(task["due_date"], "yyyy-MM-dd")
-            if due < today:
-                meta.setStyleSheet("font-size: 12px; color: #E74C3C;")
-
-        layout.addWidget(meta)
-        item.setSizeHint(container.sizeHint())
-        self.task_list.addItem(item)
-        self.task_list.setItemWidget(item, container)
-
-    # -------------------------
-    # COMPLETE TOGGLE
-    # -------------------------
-
-    def toggle_complete(self, task_id, state):
-        if state == Qt.CheckState.Checked.value:
-            self.task_manager.mark_completed(task_id)
-        else:
-            self.task_manager.mark_incomplete(task_id)
-        self.load_tasks()
-
     # -------------------------
     # RIGHT CLICK MENU
     # -------------------------
 
     def open_context_menu(self, position):
-        item = self.task_list.itemAt(position)
-        if not item:
+        index = self.task_list.indexAt(position)
+        if not index.isValid():
             return
 
-        task_id = item.data(Qt.ItemDataRole.UserRole)
+        task_id = index.data(TaskIdRole)
 
         menu = QMenu()
 
@@ -260,16 +178,14 @@ class TasksView(QWidget):
     # -------------------------
 
     def delete_task(self, task_id):
-        self.task_manager.delete_task(task_id)
-        self.load_tasks()
+        self.model.remove([task_id])
 
     # -------------------------
     # EDIT
     # -------------------------
 
     def edit_task(self, task_id):
-        tasks = self.task_manager.get_all_tasks(True)
-        task = next((t for t in tasks if t["id"] == task_id), None)
+        task = self.task_manager.get_task(task_id)
         if not task:
             return
 
@@ -339,7 +255,7 @@ class TasksView(QWidget):
             due_date=new_due_date,
         )
 
-        self.load_tasks()
+        self.model.update(task_id)
 
     # -------------------------
     # DELETE KEY SUPPORT
@@ -347,10 +263,11 @@ class TasksView(QWidget):
 
     def keyPressEvent(self, a0: QKeyEvent | None) -> None:
         if a0 and a0.key() == Qt.Key.Key_Delete:
-            selected_items = self.task_list.selectedItems()
-            for item in selected_items:
-                task_id = item.data(Qt.ItemDataRole.UserRole)
-                self.task_manager.delete_task(task_id)
-            self.load_tasks()
+            task_ids = [
+                index.data(TaskIdRole)
+                for index in self.task_list.selectionModel().selectedIndexes()
+            ]
+            if task_ids:
+                self.model.remove(task_ids)
         else:
             super().keyPressEvent(a0)
\ No newline at end of file